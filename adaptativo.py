@@ -0,0 +1,234 @@
+import bisect
+import math
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+# ----------------------------------------------------------------------
+#         MODO ADAPTATIVO: DIFICULDADE NA MEDIDA DE CADA EQUIPE
+# ----------------------------------------------------------------------
+# Cada equipe tem uma habilidade e cada pergunta uma dificuldade, na mesma
+# escala (logits): a chance de acerto é 1 / (1 + e^(dificuldade - habilidade)).
+# A dificuldade de uma pergunta parte do nível (aproveitamento presumido) e
+# vai se aproximando do aproveitamento real dela no histórico, conforme as
+# respostas se acumulam. A habilidade começa em 0 e anda a cada resposta,
+# como num Elo: sobe mais ao acertar uma difícil, desce mais ao errar uma fácil.
+#
+# A próxima pergunta é sorteada perto da dificuldade em que a equipe da vez
+# acerta ALVO_ACERTO das vezes. As perguntas ficam ordenadas por dificuldade
+# e os pesos delas numa árvore de Fenwick: achar a faixa é uma busca
+# binária e sortear dentro dela, com peso, é O(log n); registrar uma
+# resposta muda o peso da pergunta em O(log n). Perguntas com pouco
+# histórico pesam mais, para a dificuldade delas ser conhecida logo.
+# Com rodízio, uma pergunta já vista pelo grupo só sai depois que o nível
+# dela se esgota: se os sorteios com peso não acham uma livre, sai uma
+# livre qualquer da faixa mais larga, sem peso.
+#
+# Um modelo por banco (ou visão temática) e combinação de níveis, relido do
+# histórico a cada VALIDADE segundos; entre uma leitura e outra, as
+# respostas deste processo atualizam os pesos na hora.
+
+ALVO_ACERTO = 0.65
+DISPERSAO = 0.5        # Desvio do alvo sorteado a cada pergunta (variedade)
+JANELA = 0.25          # Meia-largura da faixa em torno do alvo; dobra a cada tentativa
+TENTATIVAS = 8
+PASSO_HABILIDADE = 0.4  # Quanto uma resposta move a habilidade (o K do Elo)
+EXPLORACAO = 2.0       # Peso extra de uma pergunta nunca respondida (o normal é 1)
+VALIDADE = 600         # Segundos até reler o histórico e reordenar as perguntas
+MAX_MODELOS = 32
+
+# Aproveitamento presumido de cada nível, antes de a pergunta ter histórico,
+# e quantas respostas o histórico precisa para pesar tanto quanto o nível
+ACERTO_NIVEL = {'FÁCIL': 0.8, 'MÉDIO': 0.6, 'DIFÍCIL': 0.4}
+PESO_NIVEL = 10
+
+
+def _logit(p):
+    return math.log(p / (1 - p))
+
+
+def probabilidade(habilidade, dificuldade):
+    return 1 / (1 + math.exp(dificuldade - habilidade))
+
+
+def dificuldade(nivel, respostas=0, acertos=0):
+    p = (acertos + PESO_NIVEL * ACERTO_NIVEL.get(nivel, 0.5)) / (respostas + PESO_NIVEL)
+    return -_logit(p)
+
+
+def atualizar_habilidade(habilidade, dificuldade, acertou):
+    return habilidade + PASSO_HABILIDADE * (acertou - probabilidade(habilidade, dificuldade))
+
+
+def _peso(respostas):
+    return 1 + EXPLORACAO / (1 + respostas)
+
+
+class ArvoreFenwick:
+    # Somas de prefixo de pesos com atualização em O(log n); o sorteio desce
+    # a árvore pelo bit mais alto, sem busca binária sobre as somas
+    __slots__ = ("n", "pesos", "_arvore", "_topo")
+
+    def __init__(self, pesos):
+        self.n = len(pesos)
+        self.pesos = array("d", pesos)
+        arvore = array("d", bytes(8 * (self.n + 1)))
+        for i in range(1, self.n + 1):  # montagem em O(n)
+            arvore[i] += self.pesos[i - 1]
+            pai = i + (i & -i)
+            if pai <= self.n:
+                arvore[pai] += arvore[i]
+        self._arvore = arvore
+        self._topo = 1 << self.n.bit_length() if self.n else 0
+
+    def prefixo(self, i):
+        # Soma dos pesos [0, i)
+        arvore = self._arvore
+        soma = 0.0
+        while i > 0:
+            soma += arvore[i]
+            i &= i - 1
+        return soma
+
+    def total(self):
+        return self.prefixo(self.n)
+
+    def atualizar(self, i, peso):
+        delta = peso - self.pesos[i]
+        self.pesos[i] = peso
+        arvore = self._arvore
+        i += 1
+        while i <= self.n:
+            arvore[i] += delta
+            i += i & -i
+
+    def localizar(self, x):
+        # Menor i com prefixo(i + 1) > x
+        arvore = self._arvore
+        pos = 0
+        passo = self._topo
+        while passo:
+            proximo = pos + passo
+            if proximo <= self.n and arvore[proximo] <= x:
+                pos = proximo
+                x -= arvore[proximo]
+            passo >>= 1
+        return pos
+
+    def sortear(self, inicio, fim):
+        # Índice em [inicio, fim) com chance proporcional ao peso; None se a faixa não pesa nada
+        base = self.prefixo(inicio)
+        soma = self.prefixo(fim) - base
+        if soma <= 0:
+            return None
+        i = self.localizar(base + random.random() * soma)
+        return min(max(i, inicio), fim - 1)  # arredondamento nas bordas
+
+
+class Modelo:
+    # Perguntas de um banco, nos níveis do jogo, em ordem de dificuldade
+    __slots__ = ("banco", "dificuldades", "perguntas", "posicao", "respostas", "arvore", "criado", "_lock")
+
+    def __init__(self, banco, niveis, aproveitamento):
+        self.banco = banco
+        ordem = []
+        for p in banco.elegiveis(niveis):
+            respostas, acertos = aproveitamento.get(p.id, (0, 0))
+            ordem.append((dificuldade(p.nome_nivel, respostas, acertos), p, respostas))
+        ordem.sort(key=lambda t: t[0])
+        self.dificuldades = [d for d, _, _ in ordem]
+        self.perguntas = tuple(p for _, p, _ in ordem)
+        self.posicao = {p.id: i for i, p in enumerate(self.perguntas)}
+        self.respostas = array("I", (r for _, _, r in ordem))
+        self.arvore = ArvoreFenwick([_peso(r) for r in self.respostas])
+        self.criado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.perguntas)
+
+    def dificuldade(self, p):
+        i = self.posicao.get(p.id)
+        return self.dificuldades[i] if i is not None else dificuldade(p.nome_nivel)
+
+    def _livre(self, p, excluir, rodizio):
+        # Fora deste jogo e, com rodízio, ainda não vista (ou com o nível esgotado)
+        if p.id in excluir:
+            return False
+        return rodizio is None or not rodizio.usada(p.id) or rodizio.restantes(self.banco, p.nome_nivel) <= 0
+
+    def sortear(self, habilidade, excluir=(), rodizio=None):
+        # excluir: IDs que já saíram neste jogo
+        if not self.perguntas:
+            return None
+        alvo = habilidade - _logit(ALVO_ACERTO)
+        with self._lock:
+            for tentativa in range(TENTATIVAS):
+                centro = random.gauss(alvo, DISPERSAO)
+                meia = JANELA * 2 ** tentativa
+                inicio = bisect.bisect_left(self.dificuldades, centro - meia)
+                fim = bisect.bisect_right(self.dificuldades, centro + meia)
+                if inicio >= fim:
+                    continue
+                i = self.arvore.sortear(inicio, fim)
+                if i is None:
+                    continue
+                p = self.perguntas[i]
+                if self._livre(p, excluir, rodizio):
+                    return p
+
+        # Os sorteios com peso só acharam vistas: uma livre qualquer da faixa mais larga
+        meia = JANELA * 2 ** (TENTATIVAS - 1)
+        inicio = bisect.bisect_left(self.dificuldades, alvo - meia)
+        fim = bisect.bisect_right(self.dificuldades, alvo + meia)
+        livres = [i for i in range(inicio, fim) if self._livre(self.perguntas[i], excluir, rodizio)]
+        if livres:
+            return self.perguntas[random.choice(livres)]
+
+        # Faixa toda já no jogo: a mais próxima do alvo que ainda não saiu
+        n = len(self.perguntas)
+        direita = bisect.bisect_left(self.dificuldades, alvo)
+        esquerda = direita - 1
+        while esquerda >= 0 or direita < n:
+            if direita >= n or (esquerda >= 0 and alvo - self.dificuldades[esquerda] < self.dificuldades[direita] - alvo):
+                i, esquerda = esquerda, esquerda - 1
+            else:
+                i, direita = direita, direita + 1
+            if self._livre(self.perguntas[i], excluir, rodizio):
+                return self.perguntas[i]
+        return None
+
+    def registrar(self, p, habilidade, acertou):
+        # Devolve a nova habilidade da equipe; a pergunta ganha uma resposta
+        # (e perde peso de exploração) até a próxima leitura do histórico
+        with self._lock:
+            i = self.posicao.get(p.id)
+            if i is None:
+                return atualizar_habilidade(habilidade, dificuldade(p.nome_nivel), acertou)
+            self.respostas[i] += 1
+            self.arvore.atualizar(i, _peso(self.respostas[i]))
+            return atualizar_habilidade(habilidade, self.dificuldades[i], acertou)
+
+
+_modelos = OrderedDict()  # (banco, níveis) -> Modelo, o menos usado primeiro
+_lock = threading.Lock()
+
+
+def modelo(banco, niveis, aproveitamento=None):
+    # aproveitamento: função que devolve {id: (respostas, acertos)}, chamada
+    # só ao (re)montar o modelo
+    chave = (banco, frozenset(niveis))
+    with _lock:
+        m = _modelos.get(chave)
+        if m is not None and time.monotonic() - m.criado < VALIDADE:
+            _modelos.move_to_end(chave)
+            return m
+    m = Modelo(banco, niveis, aproveitamento() if aproveitamento else {})
+    with _lock:
+        _modelos[chave] = m
+        _modelos.move_to_end(chave)
+        while len(_modelos) > MAX_MODELOS:
+            _modelos.popitem(last=False)
+    return m
@@ -0,0 +1,614 @@
+import base64
+import itertools
+from array import array
+import os
+import random
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import referencias
+
+# ----------------------------------------------------------------------
+#             BANCO DE PERGUNTAS COMPARTILHADO PELO PROCESSO
+# ----------------------------------------------------------------------
+# A planilha é lida uma única vez, na subida do servidor. Todas as sessões
+# recebem o MESMO banco de registros somente-leitura, então conectar um novo
+# navegador não custa parsing nem memória extra.
+#
+# Os editores continuam mantendo o .xlsx, mas o servidor lê uma versão
+# compilada (binária, lida e decodificada de uma vez) gerada a partir dele.
+# O compilado é refeito automaticamente sempre que a planilha for mais nova.
+#
+# Com o servidor no ar, uma thread vigia a planilha: ao detectar edição, o
+# compilado é refeito num subprocesso (sem disputar o GIL com as sessões) e
+# o novo banco substitui o antigo numa troca atômica de referência. Jogos em
+# andamento continuam com as perguntas que já sortearam.
+#
+# Cada pergunta é um registro compacto (Pergunta, com __slots__): strings
+# internadas (cada texto repetido, como "Moisés" nas opções, é um objeto só),
+# nível como código e a resposta correta como índice da opção. As sessões
+# guardam só um array de posições no banco de onde o jogo foi sorteado.
+#
+# Na carga também são montados índices por nível e por combinação de níveis,
+# para que sortear um jogo custe O(k) no número de perguntas pedidas, e não
+# O(n) no tamanho do banco.
+#
+# No modo rodízio (Rodizio), o grupo só revê uma pergunta depois de esgotar
+# as do nível; o que já saiu é um bitset sobre os IDs, que sobrevive a
+# recargas do banco (IDs novos entram como não usados). Por isso, na carga,
+# IDs repetidos ou fora de 1..MAX_ID são recusados (e avisados).
+#
+# As passagens citadas nas explicações viram um índice invertido livro ->
+# perguntas (referencias.py). Um jogo temático sorteia de uma visão do banco
+# montada pela união das listas dos livros escolhidos; o filtro de nível e
+# o rodízio trabalham sobre ela como sobre o banco inteiro.
+
+COLUNAS = (
+    'ID', 'Pergunta', 'Nível',
+    'Opção A', 'Opção B', 'Opção C', 'Opção D',
+    'Resposta Correta', 'Explicação', 'Imagem'
+)
+
+# --- Formato do arquivo compilado (little-endian) ---
+# cabeçalho | offsets das strings (uint32 x n_strings+1) | bytes UTF-8 das
+# strings | tabela (uint32 x n_perguntas x n_colunas, índice na tabela de
+# strings; VAZIO = célula vazia). As primeiras strings são os nomes das colunas.
+MAGICO = b"QBIB"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sHHII")  # mágico, versão, n_colunas, n_perguntas, n_strings
+VAZIO = 0xFFFFFFFF
+EXTENSAO_COMPILADO = ".bin"
+
+NIVEIS = ('FÁCIL', 'MÉDIO', 'DIFÍCIL')  # ordem do modo Progressivo
+MAX_ID = (1 << 20) - 1  # O rodízio guarda um bit por ID: até 128 KB por grupo
+
+
+class Pergunta:
+    __slots__ = ("id", "texto", "nivel", "opcoes", "correta", "explicacao", "imagem")
+
+    def __init__(self, id, texto, nivel, opcoes, correta, explicacao=None, imagem=None):
+        self.id = id
+        self.texto = texto
+        self.nivel = nivel            # índice em NIVEIS
+        self.opcoes = opcoes          # (A, B, C, D)
+        self.correta = correta        # índice em opcoes
+        self.explicacao = explicacao
+        self.imagem = imagem
+
+    @property
+    def nome_nivel(self):
+        return NIVEIS[self.nivel]
+
+    def __repr__(self):
+        return f"Pergunta({self.id}, {self.texto!r})"
+
+
+class Banco:
+    __slots__ = ("perguntas", "por_nivel", "por_combinacao", "posicao", "mascaras", "por_livro", "_temas", "_lock_temas")
+
+    MAX_TEMAS = 64  # visões temáticas guardadas (cada uma custa o tamanho do tema)
+
+    def __init__(self, perguntas=(), indexar_livros=True):
+        self.perguntas = tuple(perguntas)
+        self._temas = {}
+        self._lock_temas = threading.Lock()
+        # Sessões gravadas guardam os IDs; em memória, posições em `perguntas`
+        self.posicao = {p.id: i for i, p in enumerate(self.perguntas)}
+
+        por_nivel = {}
+        for p in self.perguntas:
+            por_nivel.setdefault(p.nome_nivel, []).append(p)
+        self.por_nivel = {n: tuple(lista) for n, lista in por_nivel.items()}
+        # Bitset dos IDs de cada nível, para contar num AND o que o rodízio já usou
+        self.mascaras = {n: _bitset(p.id for p in lista) for n, lista in self.por_nivel.items()}
+
+        # Uma tupla pronta para cada combinação de níveis (7 para os 3 níveis)
+        niveis = sorted(self.por_nivel)
+        self.por_combinacao = {}
+        for r in range(1, len(niveis) + 1):
+            for comb in itertools.combinations(niveis, r):
+                self.por_combinacao[frozenset(comb)] = tuple(
+                    itertools.chain.from_iterable(self.por_nivel[n] for n in comb)
+                )
+
+        # Índice invertido livro -> perguntas (as visões temáticas não reindexam)
+        por_livro = {}
+        if indexar_livros:
+            for p in self.perguntas:
+                for livro in referencias.livros_citados(p.explicacao):
+                    por_livro.setdefault(livro, []).append(p)
+        self.por_livro = {l: tuple(por_livro[l]) for l in referencias.LIVROS if l in por_livro}
+
+    def __len__(self):
+        return len(self.perguntas)
+
+    def indices(self, perguntas):
+        # Posições (array de uint32) das perguntas neste banco: o que a sessão guarda
+        return array("I", (self.posicao[p.id] for p in perguntas))
+
+    def elegiveis(self, niveis):
+        return self.por_combinacao.get(frozenset(n for n in niveis if n in self.por_nivel), ())
+
+    def tema(self, livros):
+        # Visão do banco só com as perguntas que citam algum dos livros. É a
+        # mesma instância enquanto o tema se repete, para o rodízio reaproveitar
+        # as contagens dele. Sessões pedem o mesmo tema ao mesmo tempo: a visão
+        # é montada sob o lock, uma vez só.
+        chave = frozenset(livros)
+        with self._lock_temas:
+            visao = self._temas.get(chave)
+            if visao is None:
+                vistas = set()
+                perguntas = []
+                for livro in referencias.LIVROS:
+                    if livro in chave:
+                        for p in self.por_livro.get(livro, ()):
+                            if p.id not in vistas:
+                                vistas.add(p.id)
+                                perguntas.append(p)
+                if len(self._temas) >= self.MAX_TEMAS:
+                    self._temas.clear()
+                visao = self._temas[chave] = Banco(perguntas, indexar_livros=False)
+        return visao
+
+
+def _bitset(ids):
+    bits = bytearray()
+    for i in ids:
+        if i >> 3 >= len(bits):
+            bits.extend(bytes((i >> 3) + 1 - len(bits)))
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class Rodizio:
+    # Perguntas já sorteadas para um grupo (bit i = ID i). Testar e marcar é
+    # O(1); quantas já saíram de cada nível é um AND com a máscara do nível,
+    # feito uma vez por banco e depois mantido a cada sorteio.
+    __slots__ = ("usadas", "_livres", "_contagem")
+
+    def __init__(self, usadas=b""):
+        self.usadas = bytearray(usadas)
+        self._livres = {}      # nível -> (banco, lista das que faltam), só no fim do ciclo
+        self._contagem = None  # (banco, {nível: usadas})
+
+    @classmethod
+    def de_texto(cls, texto):
+        return cls(base64.b64decode(texto))
+
+    def texto(self):
+        return base64.b64encode(bytes(self.usadas).rstrip(b"\0")).decode("ascii")
+
+    def usada(self, id):
+        return id >> 3 < len(self.usadas) and self.usadas[id >> 3] >> (id & 7) & 1
+
+    def _marcar(self, id):
+        if id >> 3 >= len(self.usadas):
+            self.usadas.extend(bytes((id >> 3) + 1 - len(self.usadas)))
+        self.usadas[id >> 3] |= 1 << (id & 7)
+
+    def _usadas_por_nivel(self, banco):
+        if self._contagem is None or self._contagem[0] is not banco:
+            bits = int.from_bytes(self.usadas, "little")
+            self._contagem = (banco, {n: (bits & m).bit_count() for n, m in banco.mascaras.items()})
+        return self._contagem[1]
+
+    def restantes(self, banco, nivel):
+        return len(banco.por_nivel.get(nivel, ())) - self._usadas_por_nivel(banco).get(nivel, 0)
+
+    def _recomecar(self, banco, nivel):
+        usadas = int.from_bytes(self.usadas, "little") & ~banco.mascaras.get(nivel, 0)
+        self.usadas = bytearray(usadas.to_bytes(len(self.usadas), "little"))
+        self._usadas_por_nivel(banco)[nivel] = 0
+        self._livres.pop(nivel, None)
+
+    def marcar(self, banco, p):
+        # Pergunta escolhida fora do sortear (modo Adaptativo). Se ela já tinha
+        # saído, é porque o nível se esgotou: recomeça o ciclo dele.
+        nivel = p.nome_nivel
+        if self.usada(p.id):
+            if self.restantes(banco, nivel) > 0:
+                return
+            self._recomecar(banco, nivel)
+        usadas = self._usadas_por_nivel(banco)  # contadas antes de marcar
+        self._marcar(p.id)
+        usadas[nivel] = usadas.get(nivel, 0) + 1
+        self._livres.pop(nivel, None)
+
+    def sortear(self, banco, nivel, k):
+        base = banco.por_nivel.get(nivel, ())
+        k = min(k, len(base))
+        if k <= 0:
+            return []
+        restantes = self.restantes(banco, nivel)
+        usadas = self._usadas_por_nivel(banco)
+        escolhidas = []
+        if restantes < k:
+            # Fim do ciclo: leva as que faltavam e recomeça o nível sem repetir estas
+            cache = self._livres.get(nivel)
+            if cache is not None and cache[0] is banco:
+                escolhidas = cache[1]
+            else:
+                escolhidas = [p for p in base if not self.usada(p.id)]
+            self._recomecar(banco, nivel)
+            for p in escolhidas:
+                self._marcar(p.id)
+            usadas[nivel] = len(escolhidas)
+            k -= len(escolhidas)
+            restantes = len(base) - len(escolhidas)
+        usadas[nivel] += k
+
+        if restantes * 4 >= len(base):
+            # Pelo menos 1/4 livre: sorteio com rejeição, no máximo ~4 tentativas por pergunta
+            while k:
+                p = base[random.randrange(len(base))]
+                if not self.usada(p.id):
+                    self._marcar(p.id)
+                    escolhidas.append(p)
+                    k -= 1
+            return escolhidas
+
+        # Último quarto do ciclo: lista das livres, montada uma vez e consumida aos poucos
+        cache = self._livres.get(nivel)
+        if cache is None or cache[0] is not banco:
+            cache = self._livres[nivel] = (banco, [p for p in base if not self.usada(p.id)])
+        livres = cache[1]
+        for _ in range(k):
+            i = random.randrange(len(livres))
+            livres[i], livres[-1] = livres[-1], livres[i]
+            p = livres.pop()
+            self._marcar(p.id)
+            escolhidas.append(p)
+        return escolhidas
+
+
+def montar_jogo(banco, niveis_sel, qtd_p, modo, rodizio=None):
+    # random.sample sobre as tuplas pré-indexadas é O(k) para k << n
+    if qtd_p <= 0:
+        return []
+    if modo == "Aleatório" and rodizio is not None:
+        # Quantas de cada nível: sorteio proporcional ao que ainda falta ver
+        niveis = [n for n in NIVEIS if n in niveis_sel and n in banco.por_nivel]
+        restantes = {n: rodizio.restantes(banco, n) for n in niveis}
+        quantidades = dict.fromkeys(niveis, 0)
+        if sum(restantes.values()) <= qtd_p:
+            # Fim do ciclo: entram todas as que faltam; o resto sai dos níveis recomeçados
+            quantidades = dict(restantes)
+            qtd_p -= sum(restantes.values())
+            restantes = {n: len(banco.por_nivel[n]) - quantidades[n] for n in niveis}
+        for _ in range(min(qtd_p, sum(restantes.values()))):
+            x = random.randrange(sum(restantes.values()))
+            for n in niveis:
+                if x < restantes[n]:
+                    quantidades[n] += 1
+                    restantes[n] -= 1
+                    break
+                x -= restantes[n]
+        final_perguntas = [p for n in niveis for p in rodizio.sortear(banco, n, quantidades[n])]
+        random.shuffle(final_perguntas)
+        return final_perguntas
+
+    if modo == "Aleatório":
+        base = banco.elegiveis(niveis_sel)
+        final_perguntas = random.sample(base, min(qtd_p, len(base)))
+        random.shuffle(final_perguntas)
+        return final_perguntas
+
+    ordem_niveis = [n for n in NIVEIS if n in niveis_sel]
+    qtd_p = min(qtd_p, len(banco.elegiveis(ordem_niveis)))
+    final_perguntas = []
+    qtd_niveis = len(ordem_niveis)
+    if qtd_niveis > 0:
+        base_por_nivel = qtd_p // qtd_niveis
+        resto = qtd_p % qtd_niveis
+        for i, nivel in enumerate(ordem_niveis):
+            qtd_para_este = base_por_nivel + (1 if i < resto else 0)
+            p_nivel = banco.por_nivel.get(nivel, ())
+            if rodizio is not None:
+                final_perguntas.extend(rodizio.sortear(banco, nivel, qtd_para_este))
+            elif p_nivel:
+                final_perguntas.extend(random.sample(p_nivel, min(len(p_nivel), qtd_para_este)))
+    return final_perguntas
+
+
+_banco = Banco()
+_carregado = False
+_lock = threading.Lock()
+
+tempo_carga = 0.0  # segundos gastos na última carga
+recargas = {"ok": 0, "erro": 0}
+
+
+def caminho_compilado(planilha):
+    return os.path.splitext(planilha)[0] + EXTENSAO_COMPILADO
+
+
+# ========================================================================
+#                       COMPILAÇÃO (xlsx -> binário)
+# ========================================================================
+
+def _texto_celula(valor):
+    # Células vazias viram None; números inteiros ("7", "12") viram texto
+    if valor is None or valor != valor:  # NaN
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor)
+
+
+def _ler_planilha(caminho):
+    # Leitor em streaming só com a biblioteca padrão (sem pandas/openpyxl)
+    import leitor_xlsx
+
+    for registro in leitor_xlsx.ler_registros(caminho):
+        valores = {c: _texto_celula(registro.get(c)) for c in COLUNAS}
+        valores['Nível'] = str(valores['Nível']).upper()
+        yield [valores[c] for c in COLUNAS]
+
+
+def _serializar(planilha):
+    strings = list(COLUNAS)
+    indices = {s: i for i, s in enumerate(strings)}
+    tabela = []
+    n_perguntas = 0
+    for linha in _ler_planilha(planilha):
+        for valor in linha:
+            if valor is None:
+                tabela.append(VAZIO)
+                continue
+            i = indices.get(valor)
+            if i is None:
+                i = indices[valor] = len(strings)
+                strings.append(valor)
+            tabela.append(i)
+        n_perguntas += 1
+
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+
+    return b"".join([
+        CABECALHO.pack(MAGICO, VERSAO, len(COLUNAS), n_perguntas, len(strings)),
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        *blobs,
+        struct.pack(f"<{len(tabela)}I", *tabela),
+    ])
+
+
+def _gravar(dados, destino):
+    # Escrita atômica: quem estiver lendo nunca vê um arquivo pela metade
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, destino)
+
+
+def compilar(planilha, destino=None):
+    destino = destino or caminho_compilado(planilha)
+    _gravar(_serializar(planilha), destino)
+    return destino
+
+
+# ========================================================================
+#                       LEITURA DO COMPILADO
+# ========================================================================
+
+def _decodificar(buf, origem):
+    magico, versao, n_colunas, n_perguntas, n_strings = CABECALHO.unpack_from(buf, 0)
+    if magico != MAGICO or versao != VERSAO:
+        raise ValueError(f"{origem}: formato compilado desconhecido")
+
+    pos = CABECALHO.size
+    offsets = struct.unpack_from(f"<{n_strings + 1}I", buf, pos)
+    pos += 4 * (n_strings + 1)
+    strings = [
+        sys.intern(buf[pos + a:pos + b].decode("utf-8"))
+        for a, b in zip(offsets, offsets[1:])
+    ]
+    colunas = tuple(strings[:n_colunas])
+    if colunas != COLUNAS:
+        raise ValueError(f"{origem}: colunas inesperadas {colunas}")
+
+    pos += offsets[-1]
+    tabela = struct.unpack_from(f"<{n_perguntas * n_colunas}I", buf, pos)
+
+    perguntas = []
+    ignoradas = 0
+    vistos = set()
+    repetidos = []
+    fora = []
+    for i in range(0, len(tabela), n_colunas):
+        registro = {
+            c: (None if v == VAZIO else strings[v])
+            for c, v in zip(colunas, tabela[i:i + n_colunas])
+        }
+        pergunta = _pergunta(registro)
+        if pergunta is None:
+            ignoradas += 1
+        elif not 1 <= pergunta.id <= MAX_ID:
+            fora.append(pergunta.id)
+        elif pergunta.id in vistos:
+            repetidos.append(pergunta.id)  # Fica a primeira linha com o ID
+        else:
+            vistos.add(pergunta.id)
+            perguntas.append(pergunta)
+    if ignoradas:
+        print(f"Aviso: {origem}: {ignoradas} perguntas ignoradas "
+              f"(ID inválido, nível desconhecido ou resposta fora das opções)")
+    if fora:
+        print(f"Aviso: {origem}: {len(fora)} perguntas ignoradas com ID fora de 1..{MAX_ID}: {_amostra(fora)}")
+    if repetidos:
+        print(f"Aviso: {origem}: {len(repetidos)} perguntas ignoradas com ID repetido: {_amostra(repetidos)}")
+    return tuple(perguntas)
+
+
+def _amostra(ids, limite=10):
+    return ", ".join(map(str, ids[:limite])) + (" ..." if len(ids) > limite else "")
+
+
+def _pergunta(registro):
+    # Sem ID numérico, sem nível conhecido ou sem a resposta entre as opções, a
+    # pergunta não tem como ser jogada; uma linha assim não derruba o banco
+    opcoes = tuple(registro[f'Opção {L}'] for L in "ABCD")
+    if registro['Nível'] not in NIVEIS or registro['Resposta Correta'] not in opcoes:
+        return None
+    try:
+        id = int(registro['ID'])
+    except (TypeError, ValueError):
+        return None
+    return Pergunta(
+        id, registro['Pergunta'], NIVEIS.index(registro['Nível']),
+        opcoes, opcoes.index(registro['Resposta Correta']), registro['Explicação'], registro['Imagem']
+    )
+
+
+def _ler_compilado(caminho):
+    # Tudo vira Pergunta na carga: basta ler o arquivo inteiro (um mmap não
+    # pouparia memória nem tempo, cada byte é decodificado uma vez)
+    with open(caminho, "rb") as f:
+        return _decodificar(f.read(), caminho)
+
+
+def _compilado_atualizado(planilha):
+    compilado = caminho_compilado(planilha)
+    if not os.path.exists(compilado):
+        return False
+    if not os.path.exists(planilha):
+        return True
+    return os.path.getmtime(compilado) >= os.path.getmtime(planilha)
+
+
+def _ler_banco(planilha):
+    compilado = caminho_compilado(planilha)
+    if _compilado_atualizado(planilha):
+        return _ler_compilado(compilado)
+
+    inicio = time.perf_counter()
+    try:
+        dados = _serializar(planilha)
+    except Exception as e:
+        # Planilha com problema: segue com o compilado antigo, se existir
+        print(f"Erro Excel: {e}")
+        if not os.path.exists(compilado):
+            raise
+        return _ler_compilado(compilado)
+
+    try:
+        _gravar(dados, compilado)
+    except OSError as e:
+        # Diretório somente-leitura: usa o compilado direto da memória
+        print(f"Aviso: não foi possível gravar {compilado}: {e}")
+        return _decodificar(dados, planilha)
+
+    print(f"Banco compilado em {(time.perf_counter() - inicio) * 1000:.0f} ms: {compilado}")
+    return _ler_compilado(compilado)
+
+
+def carregar(caminho):
+    global _banco, _carregado, tempo_carga
+    with _lock:
+        if _carregado:
+            return _banco
+
+        inicio = time.perf_counter()
+        try:
+            _banco = Banco(_ler_banco(caminho))
+        except Exception as e:
+            print(f"Erro ao carregar banco: {e}")
+            _banco = Banco()
+        tempo_carga = time.perf_counter() - inicio
+        _carregado = True
+
+        print(f"Banco de perguntas: {len(_banco)} perguntas carregadas em {tempo_carga * 1000:.0f} ms")
+        return _banco
+
+
+def obter():
+    return _banco
+
+
+# ========================================================================
+#                       RECARGA A QUENTE
+# ========================================================================
+
+def _compilar_em_subprocesso(planilha, destino):
+    r = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), planilha, destino],
+        capture_output=True, text=True, timeout=300
+    )
+    if r.returncode != 0:
+        linhas = (r.stderr or r.stdout).strip().splitlines()
+        raise RuntimeError(linhas[-1] if linhas else f"código de saída {r.returncode}")
+
+
+def recarregar(caminho):
+    global _banco, tempo_carga
+    inicio = time.perf_counter()
+    compilado = caminho_compilado(caminho)
+    temporario = f"{compilado}.recarga.{os.getpid()}"
+    try:
+        _compilar_em_subprocesso(caminho, temporario)
+        novo = Banco(_ler_compilado(temporario))
+        if not novo:
+            raise ValueError("planilha sem perguntas")
+        try:
+            os.replace(temporario, compilado)
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar {compilado}: {e}")
+    except Exception as e:
+        print(f"Erro ao recarregar banco (mantendo o anterior): {e}")
+        recargas["erro"] += 1
+        return False
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    with _lock:
+        _banco = novo
+        tempo_carga = time.perf_counter() - inicio
+        recargas["ok"] += 1
+    print(f"Banco de perguntas recarregado: {len(novo)} perguntas em {tempo_carga * 1000:.0f} ms")
+    return True
+
+
+def _assinatura(caminho):
+    try:
+        st = os.stat(caminho)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def monitorar(caminho, intervalo=2.0):
+    def vigiar():
+        atual = _assinatura(caminho)
+        pendente = None
+        while True:
+            time.sleep(intervalo)
+            nova = _assinatura(caminho)
+            if nova is None or nova == atual:
+                pendente = None
+                continue
+            # Só recarrega quando o arquivo parar de mudar (editor terminou de salvar)
+            if nova != pendente:
+                pendente = nova
+                continue
+            recarregar(caminho)
+            atual, pendente = nova, None
+
+    t = threading.Thread(target=vigiar, name="monitor-banco", daemon=True)
+    t.start()
+    return t
+
+
+# Uso: python banco_perguntas.py [planilha.xlsx] [destino.bin]
+if __name__ == "__main__":
+    planilha = sys.argv[1] if len(sys.argv) > 1 else "quiz_biblico.xlsx"
+    destino = sys.argv[2] if len(sys.argv) > 2 else None
+    inicio = time.perf_counter()
+    destino = compilar(planilha, destino)
+    print(f"{planilha} -> {destino} ({os.path.getsize(destino)} bytes) em {(time.perf_counter() - inicio) * 1000:.0f} ms")
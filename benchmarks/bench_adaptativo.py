@@ -0,0 +1,104 @@
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import adaptativo
+import banco_perguntas
+
+# ----------------------------------------------------------------------
+#     BENCHMARK: MODO ADAPTATIVO (ÁRVORE DE FENWICK x VARREDURA)
+# ----------------------------------------------------------------------
+# Bancos sintéticos com dificuldade "verdadeira" por pergunta e um
+# histórico coerente com ela. Para cada tamanho mede:
+#   - montar o modelo (ordenar pelo histórico + árvore), feito a cada
+#     adaptativo.VALIDADE segundos;
+#   - sortear a próxima pergunta pela árvore contra a varredura ingênua
+#     (peso de todas as perguntas para a habilidade da equipe + choices);
+#   - registrar uma resposta (novo peso na árvore).
+# Depois simula equipes de habilidades diferentes: aproveitamento no modo
+# Adaptativo (deve ficar perto de ALVO_ACERTO para todas) e no Aleatório, e
+# o erro da habilidade estimada depois de um jogo.
+#
+# Uso: python benchmarks/bench_adaptativo.py [tamanhos...]
+
+TODOS = list(banco_perguntas.NIVEIS)
+PERGUNTAS_JOGO = 20
+EQUIPES = (-2.0, -1.0, 0.0, 1.0, 2.0)
+
+
+def banco_sintetico(n, rnd):
+    perguntas, verdade, historico = [], {}, {}
+    for i in range(1, n + 1):
+        nivel = rnd.randrange(3)
+        verdade[i] = rnd.gauss((nivel - 1) * 1.2, 0.8)
+        respostas = rnd.randint(0, 40)
+        acertos = sum(rnd.random() < adaptativo.probabilidade(0.5, verdade[i]) for _ in range(respostas))
+        historico[i] = (respostas, acertos)
+        perguntas.append(banco_perguntas.Pergunta(i, f"Pergunta {i}", nivel, ("A", "B", "C", "D"), 0))
+    return banco_perguntas.Banco(perguntas, indexar_livros=False), verdade, historico
+
+
+def varredura(modelo, habilidade, excluir):
+    # Sem estrutura: pesa cada pergunta pela distância ao alvo, a cada sorteio
+    alvo = habilidade - math.log(adaptativo.ALVO_ACERTO / (1 - adaptativo.ALVO_ACERTO))
+    pesos = [0.0 if p.id in excluir else w * math.exp(-(d - alvo) ** 2 / (2 * adaptativo.DISPERSAO ** 2))
+             for p, d, w in zip(modelo.perguntas, modelo.dificuldades, modelo.arvore.pesos)]
+    return random.choices(modelo.perguntas, pesos)[0]
+
+
+def cronometrar(fn, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        fn()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def medir(n, rnd):
+    banco, _, historico = banco_sintetico(n, rnd)
+    inicio = time.perf_counter()
+    modelo = adaptativo.Modelo(banco, TODOS, historico)
+    montagem = time.perf_counter() - inicio
+    excluir = {p.id for p in rnd.sample(banco.perguntas, PERGUNTAS_JOGO)}
+    arvore = cronometrar(lambda: modelo.sortear(rnd.gauss(0, 1), excluir), 2000)
+    ingenuo = cronometrar(lambda: varredura(modelo, rnd.gauss(0, 1), excluir), max(3, 20000 // n))
+    registro = cronometrar(lambda: modelo.registrar(banco.perguntas[rnd.randrange(n)], 0.0, True), 2000)
+    return montagem, arvore, ingenuo, registro
+
+
+def simular(rnd, jogos=200):
+    banco, verdade, historico = banco_sintetico(5000, rnd)
+    modelo = adaptativo.Modelo(banco, TODOS, historico)
+    print(f"\n{'habilidade':>10} {'acerto adaptativo':>18} {'acerto aleatório':>17} {'erro da estimativa':>19}")
+    for habilidade in EQUIPES:
+        acertos_adaptativo = acertos_aleatorio = erro = 0.0
+        for _ in range(jogos):
+            estimada, excluir = 0.0, set()
+            for _ in range(PERGUNTAS_JOGO):
+                p = modelo.sortear(estimada, excluir)
+                excluir.add(p.id)
+                acertou = rnd.random() < adaptativo.probabilidade(habilidade, verdade[p.id])
+                acertos_adaptativo += acertou
+                estimada = adaptativo.atualizar_habilidade(estimada, modelo.dificuldade(p), acertou)
+            erro += abs(estimada - habilidade)
+            for p in rnd.sample(banco.perguntas, PERGUNTAS_JOGO):
+                acertos_aleatorio += rnd.random() < adaptativo.probabilidade(habilidade, verdade[p.id])
+        total = jogos * PERGUNTAS_JOGO
+        print(f"{habilidade:>10.1f} {acertos_adaptativo / total:>18.1%} {acertos_aleatorio / total:>17.1%} "
+              f"{erro / jogos:>19.2f}")
+
+
+def main():
+    tamanhos = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000, 500000]
+    rnd = random.Random(1)
+    print(f"{'perguntas':>9} {'montar ms':>10} {'sorteio árvore µs':>18} {'varredura µs':>13} {'registrar µs':>13}")
+    for n in tamanhos:
+        montagem, arvore, ingenuo, registro = medir(n, rnd)
+        print(f"{n:>9} {montagem * 1000:>10.1f} {arvore:>18.1f} {ingenuo:>13.0f} {registro:>13.1f}")
+    simular(rnd)
+
+
+if __name__ == "__main__":
+    main()
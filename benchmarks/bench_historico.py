@@ -0,0 +1,108 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import historico
+
+# ----------------------------------------------------------------------
+#     BENCHMARK: HISTÓRICO EM SEGUNDO PLANO x GRAVAÇÃO NO CLIQUE
+# ----------------------------------------------------------------------
+# Mede quanto cada resposta custa para a tela (só enfileirar) contra um
+# INSERT com commit feito na hora, quanto tempo a fila leva para chegar ao
+# disco e o tempo das consultas de ranking/aproveitamento pelos agregados
+# comparado a um GROUP BY sobre todas as respostas.
+#
+# Uso: python benchmarks/bench_historico.py [jogos]
+
+JOGADORES = 4
+PERGUNTAS = 10
+BANCO = 400
+
+
+def eventos(jogos):
+    for j in range(jogos):
+        jogo = f"j{j}"
+        # Nomes escolhidos pelas equipes ("Equipe N" fica fora do ranking)
+        nomes = [f"Os {random.randint(1, 200)}" for _ in range(JOGADORES)]
+        placar = dict.fromkeys(nomes, 0)
+        for _ in range(PERGUNTAS):
+            for nome in placar:
+                acertou = random.random() < 0.6
+                placar[nome] += 10 * acertou
+                yield ("resposta", jogo, random.randint(1, BANCO), nome, acertou, random.random() < 0.1, random.uniform(1, 20))
+        yield ("jogo", jogo, placar)
+
+
+def medir_fila(caminho, jogos):
+    h = historico.Historico(caminho, "bench")
+    custo = 0.0
+    n = 0
+    comeco = time.perf_counter()
+    for e in eventos(jogos):
+        # Rajada muito acima do real: segura o gerador antes de encher a fila
+        while h.pendentes() > historico.LIMITE_FILA * 0.8:
+            time.sleep(0.001)
+        inicio = time.perf_counter()
+        if e[0] == "resposta":
+            h.registrar_resposta(*e[1:])
+        else:
+            h.registrar_jogo(e[1], "local", "Aleatório", e[2])
+        custo += time.perf_counter() - inicio
+        n += 1
+    inicio = time.perf_counter()
+    h.fechar(timeout=600)
+    fim = time.perf_counter()
+    return n, custo / n, fim - inicio, n / (fim - comeco), h
+
+
+def medir_sincrono(caminho, n):
+    # O que a tela pagaria gravando cada resposta com commit, na thread do clique
+    c = sqlite3.connect(caminho, isolation_level=None)
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("CREATE TABLE r (jogo TEXT, pergunta INTEGER, nome TEXT, acertou INTEGER)")
+    inicio = time.perf_counter()
+    for i in range(n):
+        c.execute("INSERT INTO r VALUES (?, ?, ?, ?)", ("j", i % BANCO, "Equipe", i % 2))
+    return (time.perf_counter() - inicio) / n
+
+
+def cronometrar(fn, repeticoes=200):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        fn()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    jogos = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as pasta:
+        n, por_evento, drenagem, vazao, h = medir_fila(os.path.join(pasta, "h.db"), jogos)
+        print(f"{jogos} jogos, {n} eventos: {h.gravados} gravados, {h.descartados} descartados, "
+              f"{h.lotes} lotes ({h.gravados / h.lotes:.0f} eventos por transação)")
+        print(f"custo na tela: {por_evento * 1e6:.1f} µs por evento (enfileirar)")
+        print(f"restante da fila gravado em {drenagem:.2f}s depois do último evento; vazão {vazao:,.0f} eventos/s")
+        print(f"INSERT + commit na hora: {medir_sincrono(os.path.join(pasta, 's.db'), 2000) * 1e6:.1f} µs por resposta")
+
+        c = sqlite3.connect(os.path.join(pasta, "h.db"))
+        print(f"\n{'consulta':<34} {'agregados':>10} {'varredura':>10}")
+        agregado = cronometrar(lambda: h.ranking(10))
+        varredura = cronometrar(lambda: c.execute(
+            "SELECT r.nome, SUM(r.pontos), COUNT(*) FROM resultados r JOIN jogos j ON j.id = r.jogo"
+            " WHERE j.temporada = 'bench' GROUP BY r.nome ORDER BY 2 DESC LIMIT 10").fetchall(), 5)
+        print(f"{'ranking top 10 (ms)':<34} {agregado:>10.3f} {varredura:>10.1f}")
+        agregado = cronometrar(lambda: h.estatisticas_perguntas(10))
+        varredura = cronometrar(lambda: c.execute(
+            "SELECT pergunta, AVG(acertou) a FROM respostas GROUP BY pergunta"
+            " HAVING COUNT(*) >= 5 ORDER BY a LIMIT 10").fetchall(), 5)
+        print(f"{'10 perguntas mais difíceis (ms)':<34} {agregado:>10.3f} {varredura:>10.1f}")
+        c.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import estaticos
+from PIL import Image, ImageDraw
+
+# ----------------------------------------------------------------------
+#     BENCHMARK: IMAGENS DAS PERGUNTAS (MINIATURAS, CACHE E ANTECIPAÇÃO)
+# ----------------------------------------------------------------------
+# Ilustrações sintéticas do tamanho de uma foto (3000x2000, JPEG) e mede:
+#   - bytes da imagem original contra os da miniatura WebP servida no
+#     endereço com hash;
+#   - gerar uma miniatura (falta no cache) contra achá-la pronta;
+#   - um jogo em que cada pergunta tem imagem: quanto a tela da pergunta
+#     espera pela miniatura sem antecipação e com ela (gerada no servidor e
+#     baixada pelo navegador durante os EXPLICACAO segundos em que a
+#     explicação da anterior fica na tela; depois disso o navegador a tem em
+#     cache e não pede de novo);
+#   - várias sessões pedindo a mesma imagem ao mesmo tempo (uma só geração);
+#   - o cache com limite menor que o total de imagens: os bytes não passam
+#     do limite.
+#
+# Uso: python benchmarks/bench_imagens.py [imagens]
+
+LARGURA = 680        # LARGURA_IMAGEM x DENSIDADE_TELA do main.py
+EXPLICACAO = 1.5
+SESSOES = 40
+
+
+def gerar_imagens(pasta, n, rnd):
+    nomes = []
+    for i in range(n):
+        im = Image.new("RGB", (3000, 2000), tuple(rnd.randrange(256) for _ in range(3)))
+        desenho = ImageDraw.Draw(im)
+        for _ in range(300):
+            x, y = rnd.randrange(3000), rnd.randrange(2000)
+            desenho.ellipse((x, y, x + rnd.randrange(20, 400), y + rnd.randrange(20, 400)),
+                            fill=tuple(rnd.randrange(256) for _ in range(3)))
+        nome = f"ilustracao_{i:03}.jpg"
+        im.save(os.path.join(pasta, nome), "JPEG", quality=90)
+        nomes.append(nome)
+    return nomes
+
+
+def jogo(cache, nomes, antecipar):
+    esperas = []
+    navegador = {}  # endereço -> thread que o baixou (o cache do navegador)
+    for i, nome in enumerate(nomes):
+        inicio = time.perf_counter()
+        endereco = cache.endereco(nome, LARGURA)  # exibir_pergunta
+        if endereco in navegador:
+            navegador[endereco].join()
+        else:
+            cache.servir(endereco)  # o navegador pede a imagem
+        esperas.append(time.perf_counter() - inicio)
+        if antecipar and i + 1 < len(nomes):
+            # processar_resposta -> antecipar_proxima: gera no servidor e a
+            # imagem invisível faz o navegador baixá-la
+            cache.antecipar(nomes[i + 1], LARGURA)
+            proximo = cache.endereco(nomes[i + 1], LARGURA)
+            navegador[proximo] = threading.Thread(target=cache.servir, args=(proximo,))
+            navegador[proximo].start()
+        time.sleep(EXPLICACAO)
+    return esperas
+
+
+def simultaneas(cache, nome):
+    barreira = threading.Barrier(SESSOES)
+    resultados = []
+
+    endereco = cache.endereco(nome, LARGURA)
+
+    def sessao():
+        barreira.wait()
+        resultados.append(cache.servir(endereco)[0])
+
+    threads = [threading.Thread(target=sessao) for _ in range(SESSOES)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - inicio, len({id(r) for r in resultados})
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as pasta:
+        nomes = gerar_imagens(pasta, n, rnd)
+        original = sum(os.path.getsize(os.path.join(pasta, nome)) for nome in nomes) / n
+
+        cache = estaticos.Miniaturas(pasta)
+        inicio = time.perf_counter()
+        miniatura = cache.obter(nomes[0], LARGURA)
+        falta = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for _ in range(10000):
+            cache.obter(nomes[0], LARGURA)
+        acerto = (time.perf_counter() - inicio) / 10000
+        print(f"original {original / 1024:.0f} KB -> miniatura {LARGURA}px {len(miniatura) / 1024:.0f} KB (WebP)")
+        print(f"gerar (falta) {falta * 1000:.0f} ms · achar no cache {acerto * 1e6:.1f} µs")
+
+        print(f"\njogo de {n} perguntas com imagem, {EXPLICACAO}s de explicação entre elas")
+        for rotulo, antecipar in (("sem antecipação", False), ("com antecipação", True)):
+            esperas = jogo(estaticos.Miniaturas(pasta), nomes, antecipar)
+            print(f"{rotulo:<16} espera ao exibir: média {sum(esperas) / n * 1000:>6.1f} ms, "
+                  f"máx {max(esperas) * 1000:>6.1f} ms")
+
+        duracao, distintas = simultaneas(estaticos.Miniaturas(pasta), nomes[-1])
+        print(f"\n{SESSOES} sessões pedindo a mesma imagem: {duracao * 1000:.0f} ms, "
+              f"{distintas} objeto(s) bytes compartilhado(s)")
+
+        limite = len(miniatura) * n // 3
+        cache = estaticos.Miniaturas(pasta, limite)
+        for nome in nomes * 2:
+            cache.obter(nome, LARGURA)
+        print(f"cache limitado a {limite / 1024:.0f} KB: {cache.bytes / 1024:.0f} KB em {cache.entradas()} miniaturas, "
+              f"{cache.faltas} faltas, {cache.descartadas} descartadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import csv
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import importacao
+
+# ----------------------------------------------------------------------
+#     BENCHMARK: IMPORTAÇÃO EM STREAMING + MINHASH x PAR A PAR
+# ----------------------------------------------------------------------
+# Gera fontes CSV sintéticas (começos e palavras das perguntas reais) com
+# duplicadas exatas (caixa/pontuação trocadas), quase duplicadas (palavras
+# trocadas de lugar ou substituídas) e linhas inválidas plantadas. Cada
+# tamanho roda num processo novo, medindo tempo, pico de memória (RSS) e
+# quantas das plantadas foram apontadas (uma quase duplicada com palavra
+# curta trocada por uma longa pode ficar abaixo do limiar).
+#
+# Para conferir o que o LSH deixa passar, os tamanhos pequenos também rodam
+# a busca exata par a par (todas contra todas, mesmos trechos e limiar).
+#
+# As mesmas fontes também são convertidas para .xlsx com strings
+# compartilhadas (como o Excel grava) e importadas com a tabela de strings
+# inteira na memória e com ela limitada (leitor_xlsx.LIMITE_STRINGS), que
+# manda o excedente para um SQLite temporário.
+#
+# Uso: python benchmarks/bench_importacao.py [tamanhos...]
+
+PLANILHA = os.path.join(RAIZ, "quiz_biblico.xlsx")
+NIVEIS = ("FÁCIL", "Médio", "dificil")
+
+MEDIR = """
+import json, resource, sys, time
+sys.path.insert(0, {raiz!r})
+import importacao, leitor_xlsx
+if {limite_strings!r} is not None:
+    leitor_xlsx.LIMITE_STRINGS = {limite_strings!r}
+inicio = time.perf_counter()
+r = importacao.importar({fontes!r}, {destino!r}, {relatorio!r})
+r["tempo"] = time.perf_counter() - inicio
+r["pico_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps(r))
+"""
+
+
+def vocabulario():
+    # Começos ("Qual foi o") e palavras das perguntas reais: perguntas
+    # sintéticas tão parecidas entre si quanto as do banco
+    inicios, palavras = set(), set()
+    for _, p in importacao.ler_fonte(PLANILHA):
+        inicios.add(" ".join(p['Pergunta'].split()[:3]))
+        palavras.update(w for w in re.findall(r"\w+", f"{p['Pergunta']} {p['Explicação']}".lower())
+                        if len(w) > 2 and not w.isdigit())
+    return sorted(inicios), sorted(palavras)
+
+
+def pergunta_aleatoria(rnd, inicios, palavras):
+    return f"{rnd.choice(inicios)} {' '.join(rnd.choice(palavras) for _ in range(rnd.randint(4, 8)))}?"
+
+
+def gerar(pasta, n, partes=3):
+    # Devolve as fontes e o que foi plantado nelas
+    rnd = random.Random(n)
+    inicios, palavras = vocabulario()
+    plantadas = {"duplicadas": 0, "semelhantes": 0, "invalidas": 0}
+    ja = []
+    fontes = []
+    por_fonte = n // partes
+    for f in range(partes):
+        caminho = os.path.join(pasta, f"fonte{f}.csv")
+        with open(caminho, "w", encoding="utf-8", newline="") as arq:
+            w = csv.writer(arq, delimiter=";")
+            w.writerow(("ID", "Pergunta", "Nível", "Opção A", "Opção B", "Opção C", "Opção D",
+                        "Resposta Correta", "Explicação"))
+            for i in range(por_fonte):
+                sorteio = rnd.random()
+                if ja and sorteio < 0.05:
+                    texto = rnd.choice(ja).upper().replace("?", " ?")
+                    plantadas["duplicadas"] += 1
+                elif ja and sorteio < 0.10:
+                    # Duas palavras trocadas de lugar, ou uma trocada por outra
+                    original = rnd.choice(ja).rstrip("?").split()
+                    a = rnd.randrange(3, len(original) - 1)
+                    if rnd.random() < 0.5:
+                        original[a], original[a + 1] = original[a + 1], original[a]
+                    else:
+                        original[a] = rnd.choice(palavras)
+                    texto = " ".join(original) + "?"
+                    plantadas["semelhantes"] += 1
+                else:
+                    texto = pergunta_aleatoria(rnd, inicios, palavras)
+                    if len(ja) < 5000:
+                        ja.append(texto)
+                opcoes = [f"Opção {i}-{k}" for k in range(4)]
+                resposta = rnd.choice(opcoes)
+                if rnd.random() < 0.02:
+                    resposta = "nenhuma"
+                    plantadas["invalidas"] += 1
+                w.writerow((i + 1, texto, rnd.choice(NIVEIS), *opcoes, resposta, "(Gênesis 1:1)"))
+        fontes.append(caminho)
+    return fontes, plantadas
+
+
+def para_xlsx(fonte):
+    # Mesmo conteúdo do CSV, com o texto em sharedStrings.xml (como o Excel)
+    caminho = fonte[:-4] + ".xlsx"
+    indices = {}
+    with open(fonte, encoding="utf-8", newline="") as arq, zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as zf:
+        for nome, conteudo in importacao._XLSX_FIXOS.items():
+            zf.writestr(nome, conteudo)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as planilha:
+            planilha.write(b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            for n, linha in enumerate(csv.reader(arq, delimiter=";"), start=1):
+                celulas = []
+                for i, v in enumerate(linha):
+                    ref = f"{chr(65 + i)}{n}"
+                    if v.isdigit():
+                        celulas.append(f'<c r="{ref}"><v>{v}</v></c>')
+                    else:
+                        celulas.append(f'<c r="{ref}" t="s"><v>{indices.setdefault(v, len(indices))}</v></c>')
+                planilha.write(f'<row r="{n}">{"".join(celulas)}</row>'.encode("utf-8"))
+            planilha.write(b"</sheetData></worksheet>")
+        with zf.open("xl/sharedStrings.xml", "w", force_zip64=True) as strings:
+            strings.write(b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">')
+            for texto in indices:
+                strings.write(f"<si><t>{escape(texto)}</t></si>".encode("utf-8"))
+            strings.write(b"</sst>")
+    return caminho
+
+
+def medir(fontes, pasta, limite_strings=None):
+    script = MEDIR.format(raiz=RAIZ, fontes=fontes, destino=os.path.join(pasta, "banco.xlsx"),
+                          relatorio=os.path.join(pasta, "relatorio.csv"), limite_strings=limite_strings)
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def par_a_par(fontes):
+    # Todas contra todas, com os mesmos trechos: o que o MinHash evita
+    textos = [importacao.normalizar(p['Pergunta']) for f in fontes for _, p in importacao.ler_fonte(f)]
+    conjuntos = [importacao.trechos(t) for t in textos]
+    inicio = time.perf_counter()
+    achadas = 0
+    for i, a in enumerate(conjuntos):
+        if any(importacao.semelhanca(a, b) >= importacao.LIMIAR_SEMELHANCA for b in conjuntos[:i]):
+            achadas += 1
+    return len(textos), time.perf_counter() - inicio, achadas
+
+
+def main():
+    tamanhos = [int(a) for a in sys.argv[1:]] or [5000, 20000, 50000]
+    print(f"{'perguntas':>9} {'tempo s':>8} {'linhas/s':>9} {'pico RSS MB':>12} "
+          f"{'duplicadas':>14} {'semelhantes':>14} {'inválidas':>12}")
+    for n in tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            fontes, plantadas = gerar(pasta, n)
+            r = medir(fontes, pasta)
+        print(f"{r['lidas']:>9} {r['tempo']:>8.2f} {r['lidas'] / r['tempo']:>9,.0f} {r['pico_kb'] / 1024:>12.1f} "
+              f"{r['duplicadas']:>6}/{plantadas['duplicadas']:<7} {r['semelhantes']:>6}/{plantadas['semelhantes']:<7} "
+              f"{r['invalidas']:>5}/{plantadas['invalidas']:<6}")
+
+    print(f"\n{'xlsx':>9} {'strings':>12} {'tempo s':>8} {'pico RSS MB':>12}")
+    for n in tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            fontes = [para_xlsx(f) for f in gerar(pasta, n)[0]]
+            for rotulo, limite in (("na memória", 1 << 62), ("limite 64 K", 64 * 1024)):
+                r = medir(fontes, pasta, limite)
+                print(f"{r['lidas']:>9} {rotulo:>12} {r['tempo']:>8.2f} {r['pico_kb'] / 1024:>12.1f}")
+
+    print(f"\n{'perguntas':>9} {'par a par s':>12} {'achadas':>8} {'LSH s':>7} {'achadas':>8}")
+    for n in (1000, 2000, 4000):
+        with tempfile.TemporaryDirectory() as pasta:
+            fontes, _ = gerar(pasta, n)
+            lidas, tempo, achadas = par_a_par(fontes)
+            r = medir(fontes, pasta)
+        # Duplicadas exatas também passam do limiar na busca par a par
+        print(f"{lidas:>9} {tempo:>12.2f} {achadas:>8} {r['tempo']:>7.2f} {r['duplicadas'] + r['semelhantes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ----------------------------------------------------------------------
+#          BENCHMARK DE INICIALIZAÇÃO: IMPORTS + CARGA DO BANCO
+# ----------------------------------------------------------------------
+# Compara o carregamento antigo (pandas.read_excel + to_dict) com o leitor
+# atual (biblioteca padrão + banco compilado). Cada cenário roda num
+# processo novo, medindo tempo de import/carga, tempo total do processo e
+# memória residente (RSS).
+#
+# Uso: python benchmarks/bench_inicializacao.py [repeticoes]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLANILHA = os.path.join(RAIZ, "quiz_biblico.xlsx")
+
+MEDIR = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+{codigo}
+carga = time.perf_counter() - inicio
+rss = 0
+with open("/proc/self/status") as f:
+    for linha in f:
+        if linha.startswith("VmRSS:"):
+            rss = int(linha.split()[1])
+pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"carga": carga, "rss_kb": rss, "pico_kb": pico, "n": n}}))
+"""
+
+ANTES = """
+import pandas as pd
+df = pd.read_excel(PLANILHA)
+df['Nível'] = df['Nível'].astype(str).str.upper()
+n = len(df.to_dict('records'))
+"""
+
+DEPOIS = """
+sys.path.insert(0, RAIZ)
+import banco_perguntas
+n = len(banco_perguntas.carregar(PLANILHA))
+"""
+
+
+def rodar(codigo, planilha, preparar=None):
+    script = f"RAIZ = {RAIZ!r}\nPLANILHA = {planilha!r}\n" + MEDIR.format(codigo=codigo)
+    if preparar:
+        preparar()
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    total = time.perf_counter() - inicio
+    resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+    resultado["total"] = total
+    return resultado
+
+
+def resumir(nome, amostras):
+    carga = statistics.median(a["carga"] for a in amostras) * 1000
+    total = statistics.median(a["total"] for a in amostras) * 1000
+    rss = statistics.median(a["rss_kb"] for a in amostras) / 1024
+    pico = statistics.median(a["pico_kb"] for a in amostras) / 1024
+    print(f"{nome:<32} {carga:>10.1f} {total:>10.1f} {rss:>9.1f} {pico:>9.1f}   ({amostras[0]['n']} perguntas)")
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pasta = tempfile.mkdtemp(prefix="bench_inicializacao_")
+    try:
+        planilha = os.path.join(pasta, "quiz_biblico.xlsx")
+        shutil.copy(PLANILHA, planilha)
+        compilado = os.path.join(pasta, "quiz_biblico.bin")
+
+        def sem_compilado():
+            if os.path.exists(compilado):
+                os.remove(compilado)
+
+        print(f"{'cenário':<32} {'carga ms':>10} {'total ms':>10} {'RSS MB':>9} {'pico MB':>9}")
+        try:
+            resumir("antes: pandas.read_excel", [rodar(ANTES, planilha) for _ in range(repeticoes)])
+        except subprocess.CalledProcessError:
+            print(f"{'antes: pandas.read_excel':<32} (pandas/openpyxl não instalados)")
+        resumir("depois: xlsx -> compilado", [rodar(DEPOIS, planilha, sem_compilado) for _ in range(repeticoes)])
+        resumir("depois: compilado (binário)", [rodar(DEPOIS, planilha) for _ in range(repeticoes)])
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
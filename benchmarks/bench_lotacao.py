@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cliente_flet import ClienteFlet, ServidorLocal
+from teste_carga import ler_proc
+
+# ----------------------------------------------------------------------
+#     BENCHMARK: LOTAÇÃO, SESSÕES ABANDONADAS E MEMÓRIA EM EVENTO LONGO
+# ----------------------------------------------------------------------
+# Sobe o servidor com prazos curtos e mede:
+#   - admissão: abre mais sessões que QUIZ_MAX_SESSOES; as excedentes devem
+#     ver "Servidor cheio" e entrar ao tentar de novo depois que vagas abrem;
+#   - abandono: sessões que começam um jogo e somem sem fechar a página
+#     (como uma aba morta); quanto tempo até as vagas voltarem;
+#   - ociosidade: uma sessão parada vê "Sessão pausada" e retoma o jogo;
+#   - ondas de sessões abandonadas, com e sem recolhedor (sem = prazo de
+#     reconexão de uma hora, o padrão do Flet): páginas vivas e RSS do
+#     servidor a cada onda.
+#
+# Uso: python benchmarks/bench_lotacao.py [ondas] [sessões por onda]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORTA = 8650
+PORTA_METRICAS = 8651
+MAXIMO = 20
+RECONEXAO = 2
+OCIOSA = 6
+INTERVALO_ONDAS = 15  # reconexão + varredura do Flet (a cada 10 s)
+
+
+def metrica(nome):
+    with urllib.request.urlopen(f"http://127.0.0.1:{PORTA_METRICAS}/metrics", timeout=5) as r:
+        for linha in r.read().decode().splitlines():
+            if linha.startswith(nome + " "):
+                return float(linha.split()[1])
+    return None
+
+
+async def abrir(url):
+    # Devolve o cliente e se ele foi admitido
+    c = ClienteFlet(url)
+    await c.conectar()
+    await c.aguardar(lambda: c.achar(text="INICIAR JOGO") or c.texto(("Servidor cheio",)), 60)
+    return c, bool(c.achar(text="INICIAR JOGO"))
+
+
+async def comecar_jogo(c):
+    await c.clicar_texto("INICIAR JOGO")
+    await c.aguardar(lambda: c.achar(label="Tempo (s)"))
+    await c.clicar_texto("AVANÇAR >>")
+    await c.clicar_texto("INICIAR")
+    await c.aguardar(lambda: c.achar(text="VER OPÇÕES"))
+    await c.clicar_texto("VER OPÇÕES")
+    await c.aguardar(lambda: c.texto(("Selecione",)))
+
+
+async def aguardar_vagas(alvo, limite=60):
+    inicio = time.monotonic()
+    while metrica("quiz_sessoes_vagas") != alvo:
+        if time.monotonic() - inicio > limite:
+            raise TimeoutError(f"vagas não chegaram a {alvo}")
+        await asyncio.sleep(0.2)
+    return time.monotonic() - inicio
+
+
+async def admissao(url):
+    abertas = await asyncio.gather(*(abrir(url) for _ in range(MAXIMO + 5)))
+    admitidas = [c for c, ok in abertas if ok]
+    cheias = [c for c, ok in abertas if not ok]
+    print(f"admissão: {len(admitidas)} admitidas, {len(cheias)} viram 'Servidor cheio' "
+          f"(máximo {MAXIMO}, recusadas {metrica('quiz_sessoes_recusadas_total'):.0f})")
+
+    # Metade das admitidas começa um jogo e some sem fechar a página
+    await asyncio.gather(*(comecar_jogo(c) for c in admitidas[:MAXIMO // 2]))
+    for c in admitidas[:MAXIMO // 2]:
+        await c.fechar()
+    espera = await aguardar_vagas(MAXIMO - MAXIMO // 2)
+    print(f"abandono: {MAXIMO // 2} vagas de volta {espera:.1f}s depois (reconexão {RECONEXAO}s)")
+
+    for c in cheias:
+        await c.clicar_texto("TENTAR NOVAMENTE")
+    await asyncio.gather(*(c.aguardar(lambda c=c: c.achar(text="INICIAR JOGO"), 30) for c in cheias))
+    print(f"nova tentativa: as {len(cheias)} recusadas entraram")
+
+    # Uma sessão no meio do jogo fica parada até ser pausada, e retoma
+    parada = cheias[0]
+    await comecar_jogo(parada)
+    inicio = time.monotonic()
+    await parada.aguardar(lambda: parada.texto(("Sessão pausada",)), OCIOSA * 4)
+    print(f"ociosidade: pausada {time.monotonic() - inicio:.1f}s depois (ociosa {OCIOSA}s)")
+    await parada.clicar_texto("CONTINUAR")
+    await parada.aguardar(lambda: parada.texto(("Selecione", "TEMPO ESGOTADO")), 30)
+    print(f"retomada: {parada.texto(('Selecione', 'TEMPO ESGOTADO'))}")
+    for c in admitidas[MAXIMO // 2:] + cheias:
+        await c.fechar()
+
+
+async def ondas(url, pid, n_ondas, por_onda):
+    # Páginas vivas e RSS depois de cada onda. Uma página descartada fica em
+    # ciclos de referência (controles <-> handlers) até a próxima coleta do gc.
+    amostras = []
+    for _ in range(n_ondas):
+        abertas = await asyncio.gather(*(abrir(url) for _ in range(por_onda)))
+        await asyncio.gather(*(comecar_jogo(c) for c, ok in abertas if ok))
+        for c, _ in abertas:
+            await c.fechar()
+        await asyncio.sleep(INTERVALO_ONDAS)
+        amostras.append((metrica("quiz_paginas_em_memoria"), ler_proc(pid)[1]))
+    return amostras
+
+
+def main():
+    n_ondas = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    por_onda = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    env = {"QUIZ_MAX_SESSOES": str(MAXIMO), "QUIZ_RECONEXAO_S": str(RECONEXAO), "QUIZ_OCIOSA_S": str(OCIOSA),
+           "QUIZ_METRICAS_PORTA": str(PORTA_METRICAS), "QUIZ_HISTORICO": ""}
+    with ServidorLocal(RAIZ, PORTA, env) as s:
+        asyncio.run(admissao(s.url))
+
+    print(f"\n{n_ondas} ondas de {por_onda} sessões abandonadas no meio do jogo")
+    for nome, reconexao in (("com recolhedor", RECONEXAO), ("sem (Flet: 1 hora)", 3600)):
+        env = {"QUIZ_MAX_SESSOES": "0", "QUIZ_RECONEXAO_S": str(reconexao), "QUIZ_METRICAS_PORTA": str(PORTA_METRICAS),
+               "QUIZ_HISTORICO": ""}
+        with ServidorLocal(RAIZ, PORTA, env) as s:
+            amostras = asyncio.run(ondas(s.url, s.processo.pid, n_ondas, por_onda))
+        print(f"{nome:<20} páginas vivas: " + " ".join(f"{p:>4.0f}" for p, _ in amostras))
+        print(f"{'':<20} RSS MB:        " + " ".join(f"{r:>4.0f}" for _, r in amostras))
+
+
+if __name__ == "__main__":
+    main()
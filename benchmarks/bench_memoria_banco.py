@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import banco_perguntas
+import importacao
+
+# ----------------------------------------------------------------------
+#     BENCHMARK DE MEMÓRIA: REGISTROS COMPACTOS x DICIONÁRIOS
+# ----------------------------------------------------------------------
+# Compara, em processos novos, a memória residente (RSS) de:
+#   - 10 mil perguntas como dicionários somente-leitura (MappingProxyType,
+#     um por pergunta, com as 10 colunas como chaves) contra registros
+#     Pergunta com __slots__. As strings são internadas nos dois casos.
+#   - 1 mil sessões segurando um jogo de 30 perguntas: lista de referências
+#     aos registros contra um array de posições no banco (memória alocada,
+#     pelo tracemalloc: o RSS não se mexe, ocupado pelo que a decodificação
+#     do banco liberou).
+# O banco sintético repete as 370 perguntas reais com textos distintos e
+# as mesmas opções, como num banco grande com nomes repetidos.
+#
+# Uso: python benchmarks/bench_memoria_banco.py [perguntas] [sessões]
+
+PLANILHA = os.path.join(RAIZ, "quiz_biblico.xlsx")
+PERGUNTAS_JOGO = 30
+
+MEDIR = """
+import gc, json, random, struct, sys, tracemalloc
+from array import array
+from types import MappingProxyType
+sys.path.insert(0, {raiz!r})
+import banco_perguntas
+
+def rss():
+    gc.collect()
+    with open("/proc/self/status") as f:
+        for linha in f:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1])
+
+def dicionarios(caminho):
+    # Como o banco era decodificado antes: um dicionário por pergunta
+    with open(caminho, "rb") as f:
+        buf = f.read()
+    _, _, n_colunas, n_perguntas, n_strings = banco_perguntas.CABECALHO.unpack_from(buf, 0)
+    pos = banco_perguntas.CABECALHO.size
+    offsets = struct.unpack_from(f"<{{n_strings + 1}}I", buf, pos)
+    pos += 4 * (n_strings + 1)
+    strings = [sys.intern(buf[pos + a:pos + b].decode("utf-8")) for a, b in zip(offsets, offsets[1:])]
+    colunas = tuple(strings[:n_colunas])
+    tabela = struct.unpack_from(f"<{{n_perguntas * n_colunas}}I", buf, pos + offsets[-1])
+    del buf
+    perguntas = []
+    for i in range(0, len(tabela), n_colunas):
+        r = {{c: (None if v == banco_perguntas.VAZIO else strings[v]) for c, v in zip(colunas, tabela[i:i + n_colunas])}}
+        r['ID'] = int(r['ID'])
+        perguntas.append(MappingProxyType(r))
+    return tuple(perguntas)
+
+random.seed(1)
+inicio = rss()
+if {compacto}:
+    perguntas = banco_perguntas._ler_compilado({compilado!r})
+else:
+    perguntas = dicionarios({compilado!r})
+banco = rss()
+# As sessões reaproveitam a memória já liberada pela decodificação e o RSS
+# não se mexe; aqui conta o que o Python aloca para elas
+jogos = [random.sample(range(len(perguntas)), {por_jogo}) for _ in range({sessoes})]
+tracemalloc.start()
+sessoes = [array("I", jogo) if {compacto} else [perguntas[i] for i in jogo] for jogo in jogos]
+alocado = tracemalloc.get_traced_memory()[0]
+print(json.dumps({{"n": len(perguntas), "banco_kb": banco - inicio, "sessoes_kb": alocado / 1024}}))
+"""
+
+
+def gerar(pasta, n):
+    reais = list(importacao.ler_fonte(PLANILHA))
+    planilha = os.path.join(pasta, "grande.xlsx")
+    gravador = importacao._GravadorXlsx(planilha)
+    gravador.escrever(banco_perguntas.COLUNAS)
+    for i in range(n):
+        _, p = reais[i % len(reais)]
+        p = dict(p, ID=i + 1, Pergunta=f"{p['Pergunta']} ({i // len(reais) + 1})")
+        gravador.escrever([p[c] for c in banco_perguntas.COLUNAS])
+    gravador.fechar()
+    return banco_perguntas.compilar(planilha)
+
+
+def medir(compilado, compacto, sessoes):
+    script = MEDIR.format(raiz=RAIZ, compilado=compilado, compacto=compacto, sessoes=sessoes,
+                          por_jogo=PERGUNTAS_JOGO)
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    sessoes = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    with tempfile.TemporaryDirectory() as pasta:
+        compilado = gerar(pasta, n)
+        antes = medir(compilado, False, sessoes)
+        depois = medir(compilado, True, sessoes)
+
+    print(f"{'':<42} {'dicionários':>12} {'compacto':>10} {'economia':>10}")
+    por = 10_000 / antes["n"]
+    a, d = antes["banco_kb"] * por / 1024, depois["banco_kb"] * por / 1024
+    print(f"{'RSS por 10 mil perguntas (MB)':<42} {a:>12.2f} {d:>10.2f} {a - d:>10.2f}")
+    por = 1_000 / sessoes
+    a, d = antes["sessoes_kb"] * por / 1024, depois["sessoes_kb"] * por / 1024
+    print(f"{f'1 mil sessões de {PERGUNTAS_JOGO} perguntas (MB alocados)':<42} {a:>12.2f} {d:>10.2f} {a - d:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import banco_perguntas
+import referencias
+
+# ----------------------------------------------------------------------
+#          MICRO-BENCHMARK: MONTAGEM DO JOGO x TAMANHO DO BANCO
+# ----------------------------------------------------------------------
+# Compara a montagem antiga (varredura do banco inteiro a cada "AVANÇAR")
+# com o sorteio direto nos índices por nível/combinação montados na carga.
+# Depois mede o modo rodízio ao longo de um ciclo inteiro (até esgotar os
+# níveis escolhidos): custo médio e pior jogo. Por fim, o jogo temático
+# (livros escolhidos) pelo índice invertido contra a varredura dos registros.
+#
+# Uso: python benchmarks/bench_montagem_jogo.py
+
+TAMANHOS = (500, 5_000, 50_000, 200_000)
+QTDS = (6, 30)
+NIVEIS_SEL = ['FÁCIL', 'MÉDIO']
+LIVROS_TEMA = ('Daniel', 'Jonas', 'Atos')
+
+
+def banco_sintetico(n):
+    return tuple(
+        banco_perguntas.Pergunta(
+            i, f"Pergunta {i}", i % 3, ("A", "B", "C", "D"), 0,
+            f"Explicação {i}. ({referencias.LIVROS[i * 7 % len(referencias.LIVROS)]} {i % 50 + 1}:{i % 30 + 1})",
+        )
+        for i in range(n)
+    )
+
+
+def montar_tema_varredura(bd_perguntas, livros, niveis_sel, qtd_p):
+    # Sem índice: filtrar os registros a cada jogo (o regex das referências por pergunta)
+    base = [p for p in bd_perguntas if p.nome_nivel in niveis_sel
+            and any(l in livros for l in referencias.livros_citados(p.explicacao))]
+    return random.sample(base, min(qtd_p, len(base)))
+
+
+def montar_antigo(bd_perguntas, niveis_sel, qtd_p, modo):
+    base = [p for p in bd_perguntas if p.nome_nivel in niveis_sel]
+    if len(base) < qtd_p: qtd_p = len(base)
+    final_perguntas = []
+    if modo == "Aleatório":
+        final_perguntas = random.sample(base, qtd_p)
+        random.shuffle(final_perguntas)
+    else:
+        p_niveis = {n: [p for p in base if p.nome_nivel == n] for n in niveis_sel}
+        ordem_niveis = [n for n in ['FÁCIL', 'MÉDIO', 'DIFÍCIL'] if n in niveis_sel]
+        base_por_nivel = qtd_p // len(ordem_niveis)
+        resto = qtd_p % len(ordem_niveis)
+        for i, nivel in enumerate(ordem_niveis):
+            qtd_para_este = base_por_nivel + (1 if i < resto else 0)
+            final_perguntas.extend(random.sample(p_niveis[nivel], min(len(p_niveis[nivel]), qtd_para_este)))
+    return final_perguntas
+
+
+def medir(funcao, *args):
+    n, total = timeit.Timer(lambda: funcao(*args)).autorange()
+    return total / n * 1e6  # µs por jogo
+
+
+def medir_rodizio(banco, k, modo):
+    # Joga até passar do fim do ciclo, para incluir o trecho em que sobram poucas
+    rodizio = banco_perguntas.Rodizio()
+    jogos = int(len(banco.elegiveis(NIVEIS_SEL)) * 1.25) // k + 1
+    tempos = []
+    for _ in range(jogos):
+        inicio = time.perf_counter()
+        banco_perguntas.montar_jogo(banco, NIVEIS_SEL, k, modo, rodizio)
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return jogos, sum(tempos) / jogos, max(tempos)
+
+
+def main():
+    print(f"{'perguntas':>9} {'modo':<12} {'k':>3} {'antes µs':>10} {'depois µs':>10} {'ganho':>8}")
+    for n in TAMANHOS:
+        registros = banco_sintetico(n)
+        banco = banco_perguntas.Banco(registros)
+        for modo in ("Aleatório", "Progressivo"):
+            for k in QTDS:
+                antes = medir(montar_antigo, registros, NIVEIS_SEL, k, modo)
+                depois = medir(banco_perguntas.montar_jogo, banco, NIVEIS_SEL, k, modo)
+                print(f"{n:>9} {modo:<12} {k:>3} {antes:>10.1f} {depois:>10.1f} {antes / depois:>7.0f}x")
+
+    print(f"\nRodízio (um ciclo e 1/4):\n{'perguntas':>9} {'modo':<12} {'k':>3} {'jogos':>6} {'médio µs':>10} {'pior µs':>10}")
+    for n in TAMANHOS:
+        banco = banco_perguntas.Banco(banco_sintetico(n))
+        for modo in ("Aleatório", "Progressivo"):
+            for k in QTDS:
+                jogos, medio, pior = medir_rodizio(banco, k, modo)
+                print(f"{n:>9} {modo:<12} {k:>3} {jogos:>6} {medio:>10.1f} {pior:>10.1f}")
+
+    print(f"\nTema {', '.join(LIVROS_TEMA)} (k=10):\n{'perguntas':>9} {'varredura µs':>13} {'1º jogo µs':>11} {'índice µs':>10}")
+    for n in TAMANHOS[:3]:
+        registros = banco_sintetico(n)
+        banco = banco_perguntas.Banco(registros)
+        antes = medir(montar_tema_varredura, registros, LIVROS_TEMA, NIVEIS_SEL, 10)
+        inicio = time.perf_counter()
+        banco.tema(LIVROS_TEMA)  # primeira vez: monta a visão a partir das listas dos livros
+        primeiro = (time.perf_counter() - inicio) * 1e6
+        depois = medir(lambda: banco_perguntas.montar_jogo(banco.tema(LIVROS_TEMA), NIVEIS_SEL, 10, "Aleatório"))
+        print(f"{n:>9} {antes:>13.1f} {primeiro:>11.1f} {depois:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
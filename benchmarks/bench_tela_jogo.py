@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cliente_flet import ClienteFlet, ServidorLocal
+from teste_carga import FIM_DE_JOGO, PREFIXOS_FEEDBACK, TEXTOS_PROXIMA, ler_proc
+
+# ----------------------------------------------------------------------
+#          BENCHMARK: PAYLOAD E CPU POR PERGUNTA NA TELA DE JOGO
+# ----------------------------------------------------------------------
+# Sobe o servidor em localhost, joga uma partida inteira sem pausas e mede,
+# por pergunta, as mensagens/bytes enviados pelo servidor em cada etapa
+# (avançar para a pergunta, revelar as opções, responder) e o tempo de CPU
+# gasto pelo processo do servidor. Rodando com --raiz numa cópia de outra
+# versão (git worktree) dá para comparar as duas.
+#
+# Uso: python benchmarks/bench_tela_jogo.py [--perguntas 30] [--modo Progressivo] [--raiz outra/copia]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ETAPAS = ("avancar", "revelar", "responder")
+
+
+async def jogar(url, pid, perguntas, modo):
+    c = ClienteFlet(url)
+    await c.conectar()
+    totais = {e: [0, 0] for e in ETAPAS}
+
+    async def etapa(nome, texto, condicao):
+        await c.aguardar(lambda: c.achar(text=texto))
+        await c.receber(0.05)
+        mensagens, bytes_ = c.mensagens, c.bytes
+        await c.clicar(c.achar(text=texto)[-1])
+        await c.aguardar(condicao)
+        await c.receber(0.05)  # Recolhe o resto das mensagens da mesma atualização
+        totais[nome][0] += c.mensagens - mensagens
+        totais[nome][1] += c.bytes - bytes_
+
+    try:
+        await c.clicar_texto("INICIAR JOGO")
+        await c.aguardar(lambda: c.achar(label="Tempo (s)"))
+        await c.alterar(c.achar(label="Qtd. Perguntas")[0], value=str(perguntas))
+        await c.alterar(c.achar(label="Tempo (s)")[0], value="60")
+        if modo == "Progressivo":
+            await c.alterar(c.achar("radiogroup")[0], value=modo)
+        await c.clicar_texto("AVANÇAR >>")
+        await c.clicar_texto("INICIAR")
+
+        cpu_antes = ler_proc(pid)[0]
+        respondidas = 0
+        while True:
+            await c.aguardar(lambda: c.achar(text="VER OPÇÕES") or c.achar(text="CONTINUAR >>") or c.texto(FIM_DE_JOGO))
+            if c.texto(FIM_DE_JOGO):
+                break
+            if c.achar(text="CONTINUAR >>"):
+                await c.clicar_texto("CONTINUAR >>")
+
+            await etapa("revelar", "VER OPÇÕES", lambda: c.texto(("Selecione",)))
+            opcao = [b for b in c.achar("outlinedbutton") if b.get("disabled") != "true"][0]
+            await etapa("responder", opcao["text"], lambda: c.texto(PREFIXOS_FEEDBACK))
+            respondidas += 1
+
+            await c.aguardar(lambda: any(c.achar(text=t) for t in TEXTOS_PROXIMA))
+            texto = next(t for t in TEXTOS_PROXIMA if c.achar(text=t))
+            await etapa("avancar", texto,
+                        lambda: c.achar(text="VER OPÇÕES") or c.achar(text="CONTINUAR >>") or c.texto(FIM_DE_JOGO))
+        cpu = ler_proc(pid)[0] - cpu_antes
+        return respondidas, totais, cpu
+    finally:
+        await c.fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--perguntas", type=int, default=30)
+    parser.add_argument("--modo", choices=("Aleatório", "Progressivo"), default="Aleatório")
+    parser.add_argument("--raiz", default=RAIZ, help="cópia do projeto a medir (ex.: git worktree de outra versão)")
+    parser.add_argument("--porta", type=int, default=8651)
+    args = parser.parse_args()
+
+    with ServidorLocal(args.raiz, args.porta) as servidor:
+        n, totais, cpu = asyncio.run(jogar(servidor.url, servidor.processo.pid, args.perguntas, args.modo))
+
+    print(f"{n} perguntas, modo {args.modo} ({args.raiz})")
+    print(f"{'etapa (por pergunta)':<22} {'mensagens':>10} {'bytes':>9}")
+    for nome in ETAPAS:
+        mensagens, bytes_ = totais[nome]
+        print(f"{nome:<22} {mensagens / n:>10.1f} {bytes_ / n:>9.0f}")
+    mensagens = sum(t[0] for t in totais.values())
+    bytes_ = sum(t[1] for t in totais.values())
+    print(f"{'total':<22} {mensagens / n:>10.1f} {bytes_ / n:>9.0f}")
+    print(f"CPU do servidor: {cpu * 1000 / n:.1f} ms por pergunta")
+
+
+if __name__ == "__main__":
+    main()
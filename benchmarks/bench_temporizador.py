@@ -0,0 +1,70 @@
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import temporizador
+
+# ----------------------------------------------------------------------
+#        BENCHMARK: UMA THREAD POR PERGUNTA x AGENDADOR ÚNICO
+# ----------------------------------------------------------------------
+# Simula N sessões com a contagem regressiva rodando ao mesmo tempo e mede
+# threads vivas, CPU consumida e atraso dos ticks em relação ao previsto.
+#
+# Uso: python benchmarks/bench_temporizador.py [segundos]
+
+SESSOES = (10, 100, 300)
+INTERVALO = 0.1
+
+
+def modelo_antigo(n, duracao, atrasos):
+    # Igual ao contagem_regressiva original: sleep(0.1) em loop, uma thread por sessão
+    def contagem():
+        inicio = time.monotonic()
+        for i in range(int(duracao * 10)):
+            atrasos.append(time.monotonic() - (inicio + i * INTERVALO))
+            time.sleep(INTERVALO)
+
+    for _ in range(n):
+        threading.Thread(target=contagem, daemon=True).start()
+
+
+def modelo_novo(n, duracao, atrasos):
+    for _ in range(n):
+        inicio = time.monotonic()
+        estado = {"tick": 0}
+
+        def tick(contagem, progresso, inicio=inicio, estado=estado):
+            estado["tick"] += 1
+            atrasos.append(time.monotonic() - (inicio + estado["tick"] * INTERVALO))
+
+        temporizador.iniciar_contagem(duracao, tick, None, INTERVALO)
+
+
+def medir(modelo, n, duracao):
+    atrasos = []
+    cpu = time.process_time()
+    modelo(n, duracao, atrasos)
+    time.sleep(duracao / 2)
+    threads = threading.active_count()  # threads vivas no meio da contagem
+    time.sleep(duracao / 2 + 0.3)
+    cpu = time.process_time() - cpu
+    atrasos.sort()
+    p50 = statistics.median(atrasos) * 1000
+    p99 = atrasos[int(len(atrasos) * 0.99)] * 1000
+    return threads, cpu, p50, p99
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'sessões':>7} {'modelo':<10} {'threads':>8} {'CPU s':>7} {'atraso p50 ms':>14} {'p99 ms':>8}")
+    for n in SESSOES:
+        for nome, modelo in (("antigo", modelo_antigo), ("agendador", modelo_novo)):
+            threads, cpu, p50, p99 = medir(modelo, n, duracao)
+            print(f"{n:>7} {nome:<10} {threads:>8} {cpu:>7.2f} {p50:>14.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
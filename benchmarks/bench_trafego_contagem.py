@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cliente_flet import ClienteFlet, ServidorLocal
+
+# ----------------------------------------------------------------------
+#          BENCHMARK: TRÁFEGO DO WEBSOCKET DURANTE UMA PERGUNTA
+# ----------------------------------------------------------------------
+# Sobe o servidor em localhost, joga uma pergunta até o tempo esgotar e
+# conta mensagens/bytes enviados pelo servidor entre "VER OPÇÕES" e o
+# "TEMPO ESGOTADO", para cada modo de contagem.
+#
+# Uso: python benchmarks/bench_trafego_contagem.py [--tempo 10] [--raiz outra/copia]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CENARIOS = (
+    ("servidor 10 Hz", {"QUIZ_CONTAGEM": "servidor", "QUIZ_CONTAGEM_HZ": "10"}),
+    ("servidor 2 Hz", {"QUIZ_CONTAGEM": "servidor", "QUIZ_CONTAGEM_HZ": "2"}),
+    ("cliente (animação local)", {"QUIZ_CONTAGEM": "cliente"}),
+)
+
+
+async def jogar_uma_pergunta(url, tempo):
+    c = ClienteFlet(url)
+    await c.conectar()
+    try:
+        await c.clicar_texto("INICIAR JOGO")
+        await c.aguardar(lambda: c.achar(label="Tempo (s)"))
+        await c.alterar(c.achar(label="Tempo (s)")[0], value=str(tempo))
+        await c.clicar_texto("AVANÇAR >>")
+        await c.clicar_texto("INICIAR")
+        await c.aguardar(lambda: c.achar(text="VER OPÇÕES"))
+        await c.receber(0.3)
+
+        mensagens, bytes_ = c.mensagens, c.bytes
+        await c.clicar(c.achar(text="VER OPÇÕES")[0])
+        await c.aguardar(lambda: c.texto(("TEMPO ESGOTADO",)), timeout=tempo + 10)
+        return c.mensagens - mensagens, c.bytes - bytes_
+    finally:
+        await c.fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tempo", type=int, default=10, help="segundos por pergunta")
+    parser.add_argument("--raiz", default=RAIZ, help="cópia do projeto a medir (ex.: git worktree de outra versão)")
+    parser.add_argument("--porta", type=int, default=8631)
+    args = parser.parse_args()
+
+    print(f"Pergunta de {args.tempo}s, do clique em VER OPÇÕES ao TEMPO ESGOTADO")
+    print(f"{'modo':<26} {'mensagens':>10} {'bytes':>9} {'msg/s':>7}")
+    for nome, env in CENARIOS:
+        with ServidorLocal(args.raiz, args.porta, env) as servidor:
+            mensagens, bytes_ = asyncio.run(jogar_uma_pergunta(servidor.url, args.tempo))
+        print(f"{nome:<26} {mensagens:>10} {bytes_:>9} {mensagens / args.tempo:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import websockets
+
+# ----------------------------------------------------------------------
+#            CLIENTE HEADLESS DO PROTOCOLO WEB DO FLET (WebSocket)
+# ----------------------------------------------------------------------
+# Faz o papel do navegador: registra a sessão, mantém a árvore de controles
+# a partir das mensagens do servidor e envia cliques/alterações. Também
+# responde às chamadas ao client_storage, guardando os valores num dict que
+# pode ser passado para um novo cliente (simula o navegador reconectando).
+# Usado pelos benchmarks que precisam do servidor de verdade rodando em localhost.
+
+
+class ClienteFlet:
+    def __init__(self, url, largura=400, altura=800, armazenamento=None):
+        self.url = url
+        self.largura = largura
+        self.altura = altura
+        self.armazenamento = {} if armazenamento is None else armazenamento
+        self.ws = None
+        self.controles = {}
+        self._chamadas = []  # invokeMethod recebidos e ainda não respondidos
+        self.mensagens = 0
+        self.bytes = 0
+        self.chegadas = []  # (instante monotônico, bytes) de cada mensagem
+
+    async def conectar(self):
+        self.ws = await websockets.connect(self.url, max_size=None, open_timeout=30)
+        await self._enviar("registerWebClient", {
+            "pageName": "", "pageRoute": "/",
+            "pageWidth": str(self.largura), "pageHeight": str(self.altura),
+            "windowWidth": str(self.largura), "windowHeight": str(self.altura),
+            "windowTop": "0", "windowLeft": "0",
+            "isPWA": "false", "isWeb": "true", "isDebug": "false",
+            "platform": "linux", "platformBrightness": "light",
+            "media": "{}", "sessionId": ""
+        })
+
+    async def fechar(self):
+        if self.ws:
+            await self.ws.close()
+
+    async def _enviar(self, acao, payload):
+        await self.ws.send(json.dumps({"action": acao, "payload": payload}))
+
+    # --- Árvore de controles ---
+
+    def _remover(self, id, incluir_raiz):
+        c = self.controles.get(id)
+        if not c:
+            return
+        for filho in list(c.get("c", [])):
+            self._remover(filho, True)
+        if incluir_raiz:
+            self.controles.pop(id, None)
+            pai = self.controles.get(c.get("p"))
+            if pai and id in pai["c"]:
+                pai["c"].remove(id)
+        else:
+            c["c"] = []
+
+    def _aplicar(self, msg):
+        acao, payload = msg["action"], msg["payload"]
+        if acao == "pageControlsBatch":
+            for m in payload:
+                self._aplicar(m)
+        elif acao == "registerWebClient":
+            self.controles.update(payload["session"]["controls"])
+        elif acao == "addPageControls":
+            for c in payload["controls"]:
+                self.controles[c["i"]] = c
+                pai = self.controles.get(c["p"])
+                if pai is not None and c["i"] not in pai["c"]:
+                    if "at" in c:
+                        pai["c"].insert(int(c["at"]), c["i"])
+                    else:
+                        pai["c"].append(c["i"])
+        elif acao == "updateControlProps":
+            for props in payload["props"]:
+                self.controles.setdefault(props["i"], {"c": []}).update(props)
+        elif acao == "cleanControl":
+            for id in payload["ids"]:
+                self._remover(id, False)
+        elif acao == "removeControl":
+            for id in payload["ids"]:
+                self._remover(id, True)
+        elif acao == "invokeMethod":
+            self._chamadas.append(payload)
+
+    def _visivel(self, c):
+        while c:
+            if c.get("visible") == "false":
+                return False
+            c = self.controles.get(c.get("p"))
+        return True
+
+    def achar(self, tipo=None, visivel=True, **props):
+        return [
+            c for c in self.controles.values()
+            if (tipo is None or c.get("t") == tipo)
+            and all(c.get(k) == v for k, v in props.items())
+            and (not visivel or self._visivel(c))
+        ]
+
+    def texto(self, prefixos):
+        for c in self.achar("text"):
+            v = c.get("value", "")
+            if v.startswith(prefixos):
+                return v
+        return None
+
+    # --- Recepção ---
+
+    async def receber(self, timeout):
+        # Processa mensagens até ficar `timeout` segundos sem receber nada
+        while True:
+            try:
+                m = await asyncio.wait_for(self.ws.recv(), timeout)
+            except asyncio.TimeoutError:
+                return
+            self._registrar(m)
+
+    def _registrar(self, m):
+        self.mensagens += 1
+        self.bytes += len(m)
+        self.chegadas.append((time.monotonic(), len(m)))
+        self._aplicar(json.loads(m))
+        while self._chamadas:
+            asyncio.get_running_loop().create_task(self._responder(self._chamadas.pop(0)))
+
+    async def _responder(self, chamada):
+        # Só o client_storage é emulado; o resto responde "null"
+        metodo, args = chamada["methodName"], chamada.get("arguments") or {}
+        resultado = None
+        if metodo == "clientStorage:set":
+            self.armazenamento[args["key"]] = args["value"]
+            resultado = "true"
+        elif metodo == "clientStorage:get" and args["key"] in self.armazenamento:
+            resultado = json.dumps(self.armazenamento[args["key"]])
+        elif metodo == "clientStorage:remove":
+            resultado = "true" if self.armazenamento.pop(args["key"], None) is not None else "false"
+        await self._enviar("pageEventFromWeb", {
+            "eventTarget": "page", "eventName": "invoke_method_result",
+            "eventData": json.dumps({"method_id": chamada["methodId"], "result": resultado, "error": ""})
+        })
+
+    async def aguardar(self, condicao, timeout=30):
+        # Processa mensagens até condicao() ser verdadeira; devolve o instante
+        limite = time.monotonic() + timeout
+        while not condicao():
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise TimeoutError("condição não atingida")
+            m = await asyncio.wait_for(self.ws.recv(), restante)
+            self._registrar(m)
+        return time.monotonic()
+
+    # --- Eventos ---
+
+    async def clicar(self, controle):
+        await self._enviar("pageEventFromWeb", {
+            "eventTarget": controle["i"], "eventName": "click", "eventData": ""
+        })
+
+    async def clicar_texto(self, texto, timeout=30):
+        await self.aguardar(lambda: self.achar(text=texto), timeout)
+        # O servidor só indexa o controle depois de enviá-lo: dá um respiro
+        await self.receber(0.05)
+        await self.clicar(self.achar(text=texto)[-1])
+
+    async def alterar(self, controle, **props):
+        await self._enviar("updateControlProps", {"props": [{"i": controle["i"], **props}]})
+        controle.update(props)
+
+
+# ----------------------------------------------------------------------
+#                  SERVIDOR LOCAL PARA OS BENCHMARKS
+# ----------------------------------------------------------------------
+
+class ServidorLocal:
+    def __init__(self, raiz, porta, env=None):
+        self.raiz = raiz
+        self.porta = porta
+        self.env = env or {}
+        self.processo = None
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.porta}/ws"
+
+    def __enter__(self):
+        env = dict(os.environ, PORT=str(self.porta), FLET_FORCE_WEB_SERVER="1", QUIZ_RECARGA_S="0")
+        env.update(self.env)
+        self.processo = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=self.raiz, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            try:
+                with socket.create_connection(("127.0.0.1", self.porta), timeout=0.5):
+                    return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError(f"servidor não subiu na porta {self.porta}")
+
+    def __exit__(self, *exc):
+        if self.processo:
+            self.processo.terminate()
+            try:
+                self.processo.wait(10)
+            except Exception:
+                self.processo.kill()
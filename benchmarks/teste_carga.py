@@ -0,0 +1,373 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cliente_flet import ClienteFlet, ServidorLocal
+
+# ----------------------------------------------------------------------
+#              TESTE DE CARGA: N JOGADORES SIMULADOS EM LOCALHOST
+# ----------------------------------------------------------------------
+# Sobe o servidor (ou usa um já rodando via --url) e abre N sessões
+# headless pelo protocolo WebSocket do Flet. Cada sessão percorre
+# abertura -> configuração -> resumo -> jogo -> placar, revelando as opções
+# e respondendo com tempos de reflexão configuráveis (algumas perguntas
+# deixam o tempo esgotar de propósito).
+#
+# Mede a latência evento -> atualização (do clique até a tela mudar), o
+# jitter do temporizador (quando chega o "TEMPO ESGOTADO" em relação ao
+# prazo) e CPU/RSS/threads do processo do servidor. Com --limite-* vira um
+# portão de release: sai com código 1 se algum limite for estourado.
+#
+# Com --salas, testa o modo multijogador: cada sala tem um telão e
+# --jogadores celulares. Mede a difusão (do clique do telão até cada celular
+# ver a pergunta) e a resposta (do toque até a confirmação na tela). Na sala
+# a contagem só começa depois que todos recebem a pergunta, então o jitter
+# dos celulares inclui o tempo da difusão para os demais.
+#
+# Uso: python benchmarks/teste_carga.py --sessoes 300 --perguntas 6 --tempo 10
+#      python benchmarks/teste_carga.py --salas 4 --jogadores 50
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXTOS_PROXIMA = ("PRÓXIMA PERGUNTA", "IR PARA ÚLTIMA PERGUNTA", "VER PLACAR FINAL")
+PREFIXOS_FEEDBACK = ("CORRETO", "ERRADO", "TEMPO ESGOTADO")
+FIM_DE_JOGO = ("🏆 FIM DE JOGO",)
+
+
+class Resultados:
+    def __init__(self):
+        self.latencias = {}   # evento -> [segundos]
+        self.jitter = []      # atraso do "TEMPO ESGOTADO" em relação ao prazo
+        self.concluidas = 0
+        self.falhas = []
+        self.amostras = []    # (instante, cpu %, rss MB, threads) do servidor
+
+    def latencia(self, evento, valor):
+        self.latencias.setdefault(evento, []).append(valor)
+
+
+# ========================================================================
+#                       JOGADOR SIMULADO
+# ========================================================================
+
+async def pensar(args, limite=None):
+    t = random.uniform(args.pensar_min, args.pensar_max)
+    if limite is not None:
+        t = min(t, limite)
+    await asyncio.sleep(t)
+
+
+async def clicar_e_medir(c, res, evento, texto, condicao, timeout=30):
+    await c.aguardar(lambda: c.achar(text=texto), timeout)
+    await c.receber(0.05)
+    inicio = time.monotonic()
+    await c.clicar(c.achar(text=texto)[-1])
+    fim = await c.aguardar(condicao, timeout)
+    res.latencia(evento, fim - inicio)
+    return fim
+
+
+def opcoes(c):
+    return [b for b in c.achar("outlinedbutton") if b.get("disabled") != "true"]
+
+
+async def jogar(args, res, n):
+    await asyncio.sleep(args.rampa * n / max(1, args.sessoes))
+    c = ClienteFlet(args.url)
+    try:
+        inicio = time.monotonic()
+        await c.conectar()
+        await c.aguardar(lambda: c.achar(text="INICIAR JOGO"), 60)
+        res.latencia("conectar", time.monotonic() - inicio)
+
+        # Abertura -> Configuração
+        await pensar(args)
+        await clicar_e_medir(c, res, "abertura", "INICIAR JOGO", lambda: c.achar(label="Tempo (s)"))
+        await c.alterar(c.achar(label="Qtd. Perguntas")[0], value=str(args.perguntas))
+        await c.alterar(c.achar(label="Tempo (s)")[0], value=str(args.tempo))
+        if args.modo != "Aleatório":
+            await c.alterar(c.achar("radiogroup")[0], value=args.modo)
+
+        # Configuração -> Resumo -> Jogo
+        await pensar(args)
+        await clicar_e_medir(c, res, "configuracao", "AVANÇAR >>", lambda: c.achar(text="INICIAR"))
+        await pensar(args)
+        await clicar_e_medir(c, res, "resumo", "INICIAR",
+                             lambda: c.achar(text="VER OPÇÕES") or c.achar(text="CONTINUAR >>"))
+
+        while True:
+            await c.aguardar(lambda: c.achar(text="VER OPÇÕES") or c.achar(text="CONTINUAR >>") or c.texto(FIM_DE_JOGO))
+            if c.texto(FIM_DE_JOGO):
+                break
+            if c.achar(text="CONTINUAR >>"):
+                await pensar(args)
+                await clicar_e_medir(c, res, "transicao", "CONTINUAR >>", lambda: c.achar(text="VER OPÇÕES"))
+
+            # Revela as opções
+            await pensar(args)
+            revelou = await clicar_e_medir(c, res, "revelar", "VER OPÇÕES",
+                                           lambda: c.texto(("Selecione",)) and opcoes(c))
+
+            # Responde ou deixa o tempo esgotar
+            if random.random() < args.prob_esgotar:
+                chegou = await c.aguardar(lambda: c.texto(("TEMPO ESGOTADO",)), args.tempo + 30)
+                res.jitter.append(chegou - revelou - args.tempo)
+            else:
+                await pensar(args, limite=args.tempo * 0.5)
+                escolha = random.choice(opcoes(c))
+                inicio = time.monotonic()
+                await c.clicar(escolha)
+                fim = await c.aguardar(lambda: c.texto(PREFIXOS_FEEDBACK), args.tempo + 30)
+                res.latencia("responder", fim - inicio)
+
+            # Próxima pergunta / placar
+            await c.aguardar(lambda: any(c.achar(text=t) for t in TEXTOS_PROXIMA))
+            texto = next(t for t in TEXTOS_PROXIMA if c.achar(text=t))
+            await pensar(args)
+            await clicar_e_medir(c, res, "avancar", texto,
+                                 lambda: c.achar(text="VER OPÇÕES") or c.achar(text="CONTINUAR >>") or c.texto(FIM_DE_JOGO))
+
+        res.concluidas += 1
+    except Exception as e:
+        res.falhas.append(f"sessão {n}: {type(e).__name__}: {e}")
+    finally:
+        await c.fechar()
+
+
+# ========================================================================
+#                       SALAS: TELÃO + CELULARES
+# ========================================================================
+
+async def celular(args, res, sala, n):
+    c = ClienteFlet(args.url)
+    try:
+        await c.conectar()
+        await c.clicar_texto("JOGAR EM SALA", 60)
+        await c.aguardar(lambda: c.achar(label="Código da sala"))
+        codigo = await sala["codigo"]
+        await c.alterar(c.achar(label="Código da sala")[0], value=codigo)
+        await c.alterar(c.achar(label="Nome da equipe")[0], value=f"Equipe {n}")
+        await clicar_e_medir(c, res, "entrar_sala", "ENTRAR", lambda: c.texto(("Aguardando",)), 60)
+        sala["prontos"] += 1
+
+        for k in range(1, args.perguntas + 1):
+            chegou = await c.aguardar(lambda: c.texto((f"Pergunta {k}/",)) and opcoes(c), args.tempo + 60)
+            res.latencia("difusao", chegou - sala["clique"])
+            if random.random() >= args.prob_esgotar:
+                await pensar(args, limite=args.tempo * 0.5)
+                inicio = time.monotonic()
+                await c.clicar(random.choice(opcoes(c)))
+                fim = await c.aguardar(lambda: c.texto(("Resposta enviada",) + PREFIXOS_FEEDBACK))
+                res.latencia("responder", fim - inicio)
+                await c.aguardar(lambda: c.texto(PREFIXOS_FEEDBACK), args.tempo + 30)
+            else:
+                esgotou = await c.aguardar(lambda: c.texto(("TEMPO ESGOTADO",)), args.tempo + 30)
+                res.jitter.append(esgotou - chegou - args.tempo)
+        await c.aguardar(lambda: c.texto(FIM_DE_JOGO), 60)
+        res.concluidas += 1
+    except Exception as e:
+        res.falhas.append(f"sala {sala['n']} jogador {n}: {type(e).__name__}: {e}")
+    finally:
+        await c.fechar()
+
+
+async def telao(args, res, sala):
+    c = ClienteFlet(args.url, largura=1280, altura=800)
+    try:
+        await c.conectar()
+        await c.clicar_texto("JOGAR EM SALA", 60)
+        await c.aguardar(lambda: c.achar(label="Tempo (s)"))
+        await c.alterar(c.achar(label="Qtd. Perguntas")[0], value=str(args.perguntas))
+        await c.alterar(c.achar(label="Tempo (s)")[0], value=str(args.tempo))
+        await clicar_e_medir(c, res, "abrir_sala", "ABRIR SALA", lambda: c.texto(("SALA ",)), 60)
+        sala["codigo"].set_result(c.texto(("SALA ",)).split()[1])
+
+        await c.aguardar(lambda: c.texto((f"{args.jogadores} equipes",)), 120)
+        texto = "COMEÇAR"
+        for k in range(1, args.perguntas + 1):
+            await c.receber(0.05)
+            sala["clique"] = time.monotonic()
+            await c.clicar(c.achar(text=texto)[-1])
+            await c.aguardar(lambda: c.texto((f"Pergunta {k}/",)), 30)
+            await c.aguardar(lambda: any(c.achar(text=t) for t in TEXTOS_PROXIMA), args.tempo + 60)
+            texto = next(t for t in TEXTOS_PROXIMA if c.achar(text=t))
+        await clicar_e_medir(c, res, "placar_sala", texto, lambda: c.achar(text="SAIR"))
+        res.concluidas += 1
+    except Exception as e:
+        res.falhas.append(f"telão da sala {sala['n']}: {type(e).__name__}: {e}")
+        if not sala["codigo"].done():
+            sala["codigo"].set_exception(e)
+    finally:
+        await c.fechar()
+
+
+async def jogar_sala(args, res, s):
+    await asyncio.sleep(args.rampa * s / max(1, args.salas))
+    sala = {"n": s, "codigo": asyncio.get_running_loop().create_future(), "prontos": 0, "clique": 0.0}
+    await asyncio.gather(telao(args, res, sala), *(celular(args, res, sala, n) for n in range(args.jogadores)))
+
+
+# ========================================================================
+#                       MONITOR DO SERVIDOR (/proc)
+# ========================================================================
+
+def ler_proc(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        campos = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+    rss = threads = 0
+    with open(f"/proc/{pid}/status") as f:
+        for linha in f:
+            if linha.startswith("VmRSS:"):
+                rss = int(linha.split()[1]) / 1024
+            elif linha.startswith("Threads:"):
+                threads = int(linha.split()[1])
+    return cpu, rss, threads
+
+
+async def monitorar(pid, res, intervalo=0.5):
+    if not pid or not os.path.exists(f"/proc/{pid}"):
+        return
+    cpu_antes, _, _ = ler_proc(pid)
+    t_antes = time.monotonic()
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            cpu, rss, threads = ler_proc(pid)
+        except OSError:
+            return
+        agora = time.monotonic()
+        res.amostras.append((agora, 100 * (cpu - cpu_antes) / (agora - t_antes), rss, threads))
+        cpu_antes, t_antes = cpu, agora
+
+
+# ========================================================================
+#                       RELATÓRIO
+# ========================================================================
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+def relatorio(args, res, duracao):
+    if args.salas:
+        args.sessoes = args.salas * (args.jogadores + 1)
+    resumo = {
+        "sessoes": args.sessoes,
+        "concluidas": res.concluidas,
+        "falhas": len(res.falhas),
+        "duracao_s": round(duracao, 1),
+        "latencia_ms": {},
+        "jitter_ms": {},
+        "servidor": {},
+    }
+
+    print(f"\n{args.sessoes} sessões, {res.concluidas} concluídas, {len(res.falhas)} falhas, {duracao:.1f}s")
+    for falha in res.falhas[:5]:
+        print(f"  ! {falha}")
+
+    print(f"\n{'evento -> atualização':<22} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8}")
+    todas = []
+    for evento, valores in res.latencias.items():
+        if evento != "conectar":
+            todas.extend(valores)
+        linha = {p: percentil(valores, p) * 1000 for p in (50, 95, 99, 100)}
+        resumo["latencia_ms"][evento] = {f"p{p}": round(v, 1) for p, v in linha.items()}
+        print(f"{evento:<22} {len(valores):>6} {linha[50]:>8.1f} {linha[95]:>8.1f} {linha[99]:>8.1f} {linha[100]:>8.1f}")
+    geral = {p: percentil(todas, p) * 1000 for p in (50, 95, 99, 100)}
+    resumo["latencia_ms"]["geral"] = {f"p{p}": round(v, 1) for p, v in geral.items()}
+    print(f"{'(todos os eventos)':<22} {len(todas):>6} {geral[50]:>8.1f} {geral[95]:>8.1f} {geral[99]:>8.1f} {geral[100]:>8.1f}")
+
+    jitter = {p: percentil(res.jitter, p) * 1000 for p in (50, 95, 99, 100)}
+    resumo["jitter_ms"] = {f"p{p}": round(v, 1) for p, v in jitter.items()}
+    print(f"\njitter do temporizador ({len(res.jitter)} esgotamentos): "
+          f"p50 {jitter[50]:.1f} ms, p95 {jitter[95]:.1f} ms, p99 {jitter[99]:.1f} ms, máx {jitter[100]:.1f} ms")
+
+    if res.amostras:
+        cpus = [a[1] for a in res.amostras]
+        rss = [a[2] for a in res.amostras]
+        threads = [a[3] for a in res.amostras]
+        resumo["servidor"] = {
+            "cpu_medio_pct": round(sum(cpus) / len(cpus), 1), "cpu_max_pct": round(max(cpus), 1),
+            "rss_max_mb": round(max(rss), 1), "threads_max": max(threads),
+        }
+        print(f"servidor: CPU média {resumo['servidor']['cpu_medio_pct']}% (máx {resumo['servidor']['cpu_max_pct']}%), "
+              f"RSS máx {max(rss):.1f} MB, threads máx {max(threads)}")
+    return resumo
+
+
+def portao(args, resumo):
+    problemas = []
+    if resumo["falhas"]:
+        problemas.append(f"{resumo['falhas']} sessões falharam")
+    p99 = resumo["latencia_ms"]["geral"]["p99"]
+    if args.limite_p99_ms and p99 > args.limite_p99_ms:
+        problemas.append(f"latência p99 {p99} ms > {args.limite_p99_ms} ms")
+    jitter = resumo["jitter_ms"].get("p99", 0)
+    if args.limite_jitter_ms and jitter == jitter and jitter > args.limite_jitter_ms:
+        problemas.append(f"jitter p99 {jitter} ms > {args.limite_jitter_ms} ms")
+    for p in problemas:
+        print(f"REPROVADO: {p}")
+    return 1 if problemas else 0
+
+
+async def executar(args, pid):
+    res = Resultados()
+    monitor = asyncio.create_task(monitorar(pid, res))
+    inicio = time.monotonic()
+    if args.salas:
+        await asyncio.gather(*(jogar_sala(args, res, s) for s in range(args.salas)))
+    else:
+        await asyncio.gather(*(jogar(args, res, n) for n in range(args.sessoes)))
+    duracao = time.monotonic() - inicio
+    monitor.cancel()
+    return res, duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do quiz em localhost")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--perguntas", type=int, default=4)
+    parser.add_argument("--tempo", type=int, default=8, help="segundos por pergunta")
+    parser.add_argument("--salas", type=int, default=0, help="testa salas multijogador em vez de jogos individuais")
+    parser.add_argument("--jogadores", type=int, default=50, help="celulares por sala (com --salas)")
+    parser.add_argument("--modo", choices=("Aleatório", "Progressivo", "Adaptativo"), default="Aleatório")
+    parser.add_argument("--pensar-min", type=float, default=0.3, help="reflexão mínima entre ações (s)")
+    parser.add_argument("--pensar-max", type=float, default=1.5, help="reflexão máxima entre ações (s)")
+    parser.add_argument("--prob-esgotar", type=float, default=0.2, help="chance de deixar o tempo esgotar")
+    parser.add_argument("--rampa", type=float, default=5.0, help="segundos para abrir todas as sessões")
+    parser.add_argument("--url", help="servidor já rodando (ex.: ws://127.0.0.1:8080/ws)")
+    parser.add_argument("--porta", type=int, default=8640)
+    parser.add_argument("--env", action="append", default=[], help="VAR=valor para o servidor")
+    parser.add_argument("--limite-p99-ms", type=float, help="reprova se a latência p99 passar disso")
+    parser.add_argument("--limite-jitter-ms", type=float, help="reprova se o jitter p99 passar disso")
+    parser.add_argument("--json", help="grava o resumo neste arquivo")
+    parser.add_argument("--semente", type=int)
+    args = parser.parse_args()
+    random.seed(args.semente)
+
+    if args.url:
+        res, duracao = asyncio.run(executar(args, None))
+    else:
+        env = dict(v.split("=", 1) for v in args.env)
+        with ServidorLocal(RAIZ, args.porta, env) as servidor:
+            args.url = servidor.url
+            res, duracao = asyncio.run(executar(args, servidor.processo.pid))
+
+    resumo = relatorio(args, res, duracao)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, indent=2, ensure_ascii=False)
+    sys.exit(portao(args, resumo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,597 @@
+import gzip
+import hashlib
+import importlib.metadata
+import io
+import json
+import mimetypes
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ----------------------------------------------------------------------
+#                 ARQUIVOS ESTÁTICOS (IMAGENS E BUNDLE WEB)
+# ----------------------------------------------------------------------
+# Só a pasta assets/ é publicada (antes era a raiz do projeto inteira).
+#
+# Etapa de build (python estaticos.py, ou automática na subida quando as
+# fontes mudarem): cada imagem vira variantes redimensionadas em AVIF, WebP
+# e no formato original, com o hash do conteúdo no nome; os arquivos de
+# texto do bundle web do Flet (main.dart.js tem ~8 MB) ganham cópias
+# pré-comprimidas em gzip (e brotli, se o módulo estiver instalado).
+# Tudo vai para assets/gerados/, descrito por um manifesto.
+#
+# Na hora de servir, uma camada ASGI na frente do app do Flet:
+#   - negocia o formato da imagem pelo cabeçalho Accept (AVIF só quando o
+#     navegador declara, WebP também para "*/*") e manda cache de 1 ano,
+#     imutável, já que o nome muda quando o conteúdo muda;
+#   - entrega a cópia pré-comprimida conforme o Accept-Encoding;
+#   - nos demais arquivos, força revalidação (ETag) em vez de cache cego.
+# Sem o manifesto (ou sem Pillow no build) tudo cai nos arquivos originais.
+#
+# As imagens das perguntas (coluna Imagem, arquivos em assets/perguntas/)
+# não passam pelo build: são muitas e mudam com a planilha. A miniatura de
+# cada uma ganha um endereço em miniaturas/ com a largura, o nome e o hash
+# do arquivo (nome, mtime, tamanho) e da largura; é gerada na primeira vez
+# que o navegador a pede, fica num cache LRU limitado em bytes e sai com o
+# mesmo cache imutável das variantes do build. O endereço se confere sozinho
+# (qualquer worker refaz o hash a partir do arquivo): um endereço cujo
+# arquivo mudou depois responde 404 (o cliente já terá recebido o novo).
+#
+# Com ?v=<visitante> no endereço, a camada anota quando a miniatura acabou
+# de ser enviada àquele navegador: o ft.Image não avisa quando carregou, e é
+# por essa anotação que o jogo espera a imagem antes de começar a contagem.
+
+PASTA_GERADOS = "gerados"
+MANIFESTO = "manifesto.json"
+
+# Larguras (px reais) geradas para cada imagem, limitadas à largura da fonte
+IMAGENS = {
+    "open_00.jpg": (300, 450, 675, 900),
+    "icon_00.png": (32, 64, 192),
+}
+QUALIDADE = {"avif": 55, "webp": 80, "jpeg": 82}
+
+# Endereços fixos do Flet atendidos com uma variante nossa (sem hash no nome)
+APELIDOS = {
+    "favicon.png": ("icon_00.png", 64),
+}
+
+# Bundle web: só vale comprimir texto; imagens e fontes woff2 já vêm comprimidas
+COMPRIMIVEIS = (".js", ".mjs", ".json", ".wasm", ".html", ".css", ".svg", ".otf", ".ttf", ".txt")
+NAO_COMPRIMIR = ("index.html", "manifest.json")  # o Flet reescreve esses dois na subida
+TAMANHO_MINIMO = 1024
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+# Miniaturas das imagens das perguntas
+PASTA_PERGUNTAS = "perguntas"
+PASTA_MINIATURAS = "miniaturas"       # Endereços servidos pela camada ASGI, sem arquivo em disco
+LIMITE_MINIATURAS = 32 * 1024 * 1024  # Bytes de miniaturas no cache
+TRABALHADORES_MINIATURAS = 2          # Threads que geram miniaturas antecipadas
+LARGURA_MAXIMA_MINIATURA = 4096
+MAX_VISITANTES = 10000                # Navegadores com entregas anotadas (os mais antigos saem)
+ENTREGAS_POR_VISITANTE = 4
+
+_manifesto = {"imagens": {}, "variantes": {}, "apelidos": {}, "comprimidos": {}}
+_pasta = None
+cache_miniaturas = None
+
+
+# ========================================================================
+#                       BUILD
+# ========================================================================
+
+def _pasta_web():
+    import flet_web
+    return flet_web.get_package_web_dir(), importlib.metadata.version("flet-web")
+
+
+def _assinatura_fontes(pasta):
+    fontes = {}
+    for nome in IMAGENS:
+        try:
+            st = os.stat(os.path.join(pasta, nome))
+        except FileNotFoundError:
+            continue
+        fontes[nome] = [st.st_mtime_ns, st.st_size]
+    return {
+        "fontes": fontes,
+        "larguras": {n: list(l) for n, l in IMAGENS.items()},
+        "qualidade": QUALIDADE,
+        "pillow": Image is not None,
+        "brotli": brotli is not None,
+        "flet_web": _pasta_web()[1],
+    }
+
+
+def _salvar(im, destino, formato):
+    if formato == "jpeg":
+        im.convert("RGB").save(destino, "JPEG", quality=QUALIDADE["jpeg"], optimize=True, progressive=True)
+    elif formato == "png":
+        im.save(destino, "PNG", optimize=True)
+    elif formato == "webp":
+        im.save(destino, "WEBP", quality=QUALIDADE["webp"], method=6)
+    else:
+        im.save(destino, "AVIF", quality=QUALIDADE["avif"])
+
+
+def _gerar_imagem(pasta, nome, larguras, gerados):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    original = Image.open(caminho)
+    original = original.convert("RGBA" if original.mode in ("P", "LA", "RGBA") else "RGB")
+    formato_original = "png" if original.mode == "RGBA" else "jpeg"
+    extensao = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "avif": ".avif"}
+    formatos = [formato_original, "webp"]
+    if ".avif" in Image.registered_extensions():
+        formatos.insert(0, "avif")
+
+    base = os.path.splitext(nome)[0]
+    resultado = {}
+    for largura in sorted({min(l, original.width) for l in larguras}):
+        altura = round(original.height * largura / original.width)
+        im = original if largura == original.width else original.resize((largura, altura), Image.LANCZOS)
+        h = hashlib.sha256(dados + repr((largura, QUALIDADE)).encode()).hexdigest()[:10]
+        variantes = {}
+        for formato in formatos:
+            rel = f"{PASTA_GERADOS}/{base}-{largura}.{h}{extensao[formato]}"
+            _salvar(im, os.path.join(pasta, rel), formato)
+            variantes[mimetypes.guess_type(rel)[0]] = rel
+            gerados.add(rel)
+        # O nome no formato original é o que vai no src; os outros são alternativas
+        resultado[largura] = (variantes[mimetypes.guess_type("x" + extensao[formato_original])[0]], variantes)
+    return resultado
+
+
+def _comprimir(origem, rel, pasta, gerados):
+    with open(origem, "rb") as f:
+        dados = f.read()
+    if len(dados) < TAMANHO_MINIMO:
+        return {}
+    codificados = {"gzip": (".gz", lambda d: gzip.compress(d, 9, mtime=0))}
+    if brotli is not None:
+        codificados["br"] = (".br", lambda d: brotli.compress(d, quality=11))
+    saida = {}
+    for codificacao, (sufixo, funcao) in codificados.items():
+        comprimido = funcao(dados)
+        if len(comprimido) > len(dados) * 0.9:
+            continue
+        destino_rel = f"{PASTA_GERADOS}/comprimidos/{rel}{sufixo}"
+        destino = os.path.join(pasta, destino_rel)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(destino, "wb") as f:
+            f.write(comprimido)
+        saida[codificacao] = destino_rel
+        gerados.add(destino_rel)
+    return saida
+
+
+def construir(pasta="assets"):
+    inicio = time.perf_counter()
+    destino = os.path.join(pasta, PASTA_GERADOS)
+    os.makedirs(destino, exist_ok=True)
+    manifesto = {"assinatura": _assinatura_fontes(pasta), "imagens": {}, "variantes": {}, "apelidos": {}, "comprimidos": {}}
+    gerados = set()
+
+    if Image is None:
+        print("Aviso: Pillow não instalado; imagens serão servidas no tamanho original")
+    else:
+        for nome, larguras in IMAGENS.items():
+            if not os.path.exists(os.path.join(pasta, nome)):
+                continue
+            por_largura = {}
+            for largura, (canonico, variantes) in _gerar_imagem(pasta, nome, larguras, gerados).items():
+                por_largura[largura] = canonico
+                manifesto["variantes"][canonico] = variantes
+            manifesto["imagens"][nome] = por_largura
+        for apelido, (nome, largura) in APELIDOS.items():
+            if nome in manifesto["imagens"]:
+                manifesto["apelidos"][apelido] = _escolher(manifesto["imagens"][nome], largura)
+
+    pasta_web = _pasta_web()[0]
+    for raiz, _, arquivos in os.walk(pasta_web):
+        for arquivo in arquivos:
+            if not arquivo.endswith(COMPRIMIVEIS) and arquivo != "NOTICES":
+                continue
+            origem = os.path.join(raiz, arquivo)
+            rel = os.path.relpath(origem, pasta_web).replace(os.sep, "/")
+            if rel in NAO_COMPRIMIR:
+                continue
+            codificados = _comprimir(origem, rel, pasta, gerados)
+            if codificados:
+                manifesto["comprimidos"][rel] = codificados
+
+    # Remove o que sobrou de builds anteriores
+    for raiz, _, arquivos in os.walk(destino):
+        for arquivo in arquivos:
+            rel = os.path.relpath(os.path.join(raiz, arquivo), pasta).replace(os.sep, "/")
+            if rel not in gerados and arquivo != MANIFESTO:
+                os.remove(os.path.join(raiz, arquivo))
+
+    temporario = os.path.join(destino, MANIFESTO + ".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=1, ensure_ascii=False)
+    os.replace(temporario, os.path.join(destino, MANIFESTO))
+    print(f"Estáticos gerados em {(time.perf_counter() - inicio) * 1000:.0f} ms: "
+          f"{len(manifesto['variantes'])} imagens, {len(manifesto['comprimidos'])} arquivos comprimidos")
+    return manifesto
+
+
+# Lê o manifesto, refazendo o build se as fontes (ou a versão do Flet) mudaram
+def carregar(pasta="assets", limite_miniaturas=LIMITE_MINIATURAS):
+    global _manifesto, _pasta, cache_miniaturas
+    _pasta = os.path.abspath(pasta)
+    cache_miniaturas = Miniaturas(os.path.join(_pasta, PASTA_PERGUNTAS), limite_miniaturas)
+    caminho = os.path.join(pasta, PASTA_GERADOS, MANIFESTO)
+    manifesto = None
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if manifesto is None or manifesto.get("assinatura") != _assinatura_fontes(pasta):
+        try:
+            manifesto = construir(pasta)
+        except Exception as e:
+            print(f"Erro ao gerar estáticos (servindo os originais): {e}")
+            manifesto = manifesto or {"imagens": {}, "variantes": {}, "apelidos": {}, "comprimidos": {}}
+    _manifesto = manifesto
+
+
+def _escolher(por_largura, largura):
+    larguras = sorted(por_largura, key=int)
+    for l in larguras:
+        if int(l) >= largura:
+            return por_largura[l]
+    return por_largura[larguras[-1]]
+
+
+# Caminho da menor variante com pelo menos `largura` px (ou a maior que houver)
+def imagem(nome, largura):
+    por_largura = _manifesto["imagens"].get(nome)
+    if not por_largura:
+        return nome
+    return _escolher(por_largura, largura)
+
+
+# ========================================================================
+#                       IMAGENS DAS PERGUNTAS
+# ========================================================================
+
+class Miniaturas:
+    # Cache LRU (nome, largura) -> bytes, limitado pela soma dos tamanhos.
+    # Cada entrada guarda o mtime/tamanho do arquivo e é refeita se ele
+    # mudar. Quem pede uma miniatura que outra thread já está gerando
+    # espera por ela em vez de gerar de novo.
+    def __init__(self, pasta, limite=LIMITE_MINIATURAS):
+        self.pasta = pasta
+        self.limite = limite
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.descartadas = 0
+        self._cache = OrderedDict()  # (nome, largura) -> (assinatura, bytes), a menos usada primeiro
+        self._gerando = {}           # (nome, largura) -> Future
+        self._entregas = OrderedDict()  # visitante -> últimos endereços enviados a ele
+        self._lock = threading.Lock()
+        self._fila = []
+        self._trabalhadores = 0
+        self._tem_fila = threading.Condition(self._lock)
+        self._entregou = threading.Condition(self._lock)
+
+    def _caminho(self, nome):
+        # Só arquivos dentro da pasta das perguntas (o nome vem da planilha)
+        caminho = os.path.normpath(os.path.join(self.pasta, nome))
+        if not caminho.startswith(os.path.join(self.pasta, "")):
+            return None
+        return caminho
+
+    def _gerar(self, caminho, largura):
+        if Image is None:
+            with open(caminho, "rb") as f:
+                return f.read()  # Sem Pillow vai o original
+        with Image.open(caminho) as im:
+            im.draft("RGB", (largura, largura))  # JPEG: decodifica já reduzido
+            im = ImageOps.exif_transpose(im)  # Fotos de celular vêm deitadas
+            im = im.convert("RGBA" if im.mode in ("P", "LA", "RGBA") else "RGB")
+            im.thumbnail((largura, largura), Image.LANCZOS)  # Também limita a altura
+            saida = io.BytesIO()
+            im.save(saida, "WEBP", quality=QUALIDADE["webp"], method=4)
+            return saida.getvalue()
+
+    def _assinatura(self, nome):
+        # (caminho, assinatura) do arquivo, ou None se ele não existe
+        caminho = self._caminho(nome)
+        if caminho is None:
+            return None
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        return caminho, (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _hash(nome, largura, assinatura):
+        return hashlib.sha256(repr((nome, largura, assinatura, QUALIDADE)).encode()).hexdigest()[:16]
+
+    def endereco(self, nome, largura):
+        # Endereço da miniatura (sem gerá-la), ou None se o arquivo não existe:
+        # miniaturas/<largura>/<nome>.<hash>.<ext>, como as variantes do build
+        encontrado = self._assinatura(nome)
+        if encontrado is None:
+            return None
+        h = self._hash(nome, largura, encontrado[1])
+        extensao = "webp" if Image is not None else os.path.splitext(nome)[1].lower().lstrip(".")
+        return f"{PASTA_MINIATURAS}/{largura}/{quote(nome)}.{h}.{extensao}"
+
+    def servir(self, endereco):
+        # Bytes e tipo da miniatura de um endereço dado por endereco() (já
+        # decodificado, sem a query), ou None se ele não confere com o arquivo
+        # atual. Não depende de nada guardado: serve endereços de outro worker.
+        try:
+            _, largura, resto = endereco.split("/", 2)
+            nome, h, _ = resto.rsplit(".", 2)
+        except ValueError:
+            return None
+        if not largura.isdigit() or not 0 < int(largura) <= LARGURA_MAXIMA_MINIATURA:
+            return None
+        largura = int(largura)
+        encontrado = self._assinatura(nome)
+        if encontrado is None or self._hash(nome, largura, encontrado[1]) != h:
+            return None
+        dados = self.obter(nome, largura, encontrado[1])
+        if dados is None:
+            return None
+        return dados, mimetypes.guess_type(resto)[0] or "application/octet-stream"
+
+    def obter(self, nome, largura, esperada=None):
+        # Bytes da miniatura com até `largura` px de lado, ou None se o
+        # arquivo não existe, não é uma imagem ou (com `esperada`) não tem
+        # mais essa assinatura. O mesmo objeto bytes é devolvido a todos os
+        # pedidos enquanto estiver no cache.
+        encontrado = self._assinatura(nome)
+        if encontrado is None:
+            return None
+        caminho, assinatura = encontrado
+        chave = (nome, largura)
+        if esperada is not None and tuple(esperada) != assinatura:
+            return None
+        with self._lock:
+            entrada = self._cache.get(chave)
+            if entrada is not None and entrada[0] == assinatura:
+                self._cache.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            futuro = self._gerando.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = self._gerando[chave] = Future()
+                self.faltas += 1
+        if not dono:
+            return futuro.result()
+
+        try:
+            dados = self._gerar(caminho, largura)
+        except Exception as e:
+            print(f"Erro ao gerar miniatura de {nome}: {e}")
+            dados = None
+        with self._lock:
+            del self._gerando[chave]
+            if dados is not None:
+                antiga = self._cache.pop(chave, None)
+                if antiga is not None:
+                    self.bytes -= len(antiga[1])
+                self._cache[chave] = (assinatura, dados)
+                self.bytes += len(dados)
+                while self.bytes > self.limite and len(self._cache) > 1:
+                    _, (_, descartada) = self._cache.popitem(last=False)
+                    self.bytes -= len(descartada)
+                    self.descartadas += 1
+        futuro.set_result(dados)
+        return dados
+
+    def antecipar(self, nome, largura):
+        # Gera em segundo plano a miniatura que vai ser pedida em seguida
+        with self._lock:
+            entrada = self._cache.get((nome, largura))
+            if entrada is not None or (nome, largura) in self._gerando:
+                return
+            self._fila.append((nome, largura))
+            if self._trabalhadores < TRABALHADORES_MINIATURAS:
+                self._trabalhadores += 1
+                threading.Thread(target=self._executar, name="miniaturas", daemon=True).start()
+            else:
+                self._tem_fila.notify()
+
+    def _executar(self):
+        while True:
+            with self._lock:
+                while not self._fila:
+                    self._tem_fila.wait()
+                nome, largura = self._fila.pop(0)
+            self.obter(nome, largura)
+
+    def entregue(self, visitante, endereco):
+        # A camada ASGI acabou de enviar `endereco` ao navegador `visitante`
+        with self._lock:
+            enviados = self._entregas.pop(visitante, None) or deque(maxlen=ENTREGAS_POR_VISITANTE)
+            enviados.append(endereco)
+            self._entregas[visitante] = enviados
+            while len(self._entregas) > MAX_VISITANTES:
+                self._entregas.popitem(last=False)
+            self._entregou.notify_all()
+
+    def aguardar_entrega(self, visitante, endereco, limite):
+        # True quando o navegador já recebeu a miniatura, False se o limite
+        # acabou antes (pedido perdido, ou atendido por outro worker)
+        with self._lock:
+            return self._entregou.wait_for(lambda: endereco in self._entregas.get(visitante, ()), limite)
+
+    def entradas(self):
+        return len(self._cache)
+
+
+# Endereço da miniatura de uma imagem das perguntas, para o src do ft.Image.
+# Com `visitante` (um por página), a entrega ao navegador fica anotada.
+def miniatura(nome, largura, visitante=None):
+    if not nome or cache_miniaturas is None:
+        return None
+    endereco = cache_miniaturas.endereco(nome, largura)
+    if endereco is not None and visitante:
+        endereco += f"?v={visitante}"
+    return endereco
+
+
+# Espera (até `limite` s) o navegador receber a miniatura de um endereço dado
+# por miniatura(..., visitante); sem visitante não há o que esperar
+def aguardar_miniatura(endereco, limite):
+    if not endereco or cache_miniaturas is None:
+        return True
+    partes = urlsplit(endereco)
+    visitante = parse_qs(partes.query).get("v")
+    if not visitante:
+        return True
+    # A camada ASGI anota o caminho já decodificado, como chega no scope
+    return cache_miniaturas.aguardar_entrega(visitante[0], unquote(partes.path), limite)
+
+
+def antecipar(nome, largura):
+    if nome and cache_miniaturas is not None:
+        cache_miniaturas.antecipar(nome, largura)
+
+
+# Gera a miniatura (ou a acha pronta) na thread de quem chama
+def gerar_miniatura(nome, largura):
+    if nome and cache_miniaturas is not None:
+        cache_miniaturas.obter(nome, largura)
+
+
+# ========================================================================
+#                       CAMADA ASGI
+# ========================================================================
+
+def _aceita(cabecalho, valor):
+    for item in cabecalho.split(","):
+        partes = [p.strip() for p in item.split(";")]
+        if partes[0] != valor:
+            continue
+        for p in partes[1:]:
+            if not p.startswith("q="):
+                continue
+            try:
+                q = float(p[2:] or 0)
+            except ValueError:
+                q = 0  # q inválido (ex.: "q=x") vale como recusa, não como erro 500
+            if q == 0:
+                return False
+        return True
+    return False
+
+
+def _arquivo(rel, scope, media_type, cabecalhos):
+    caminho = os.path.join(_pasta, rel)
+    try:
+        st = os.stat(caminho)
+    except FileNotFoundError:
+        # Apagado (ou ainda não gravado) depois que o manifesto foi lido
+        return PlainTextResponse("Not Found", status_code=404)
+    # Com o stat em mãos o FileResponse já monta o ETag, que a revalidação (304) compara
+    resposta = FileResponse(caminho, media_type=media_type, headers=cabecalhos, stat_result=st)
+    if_none_match = Headers(scope=scope).get("if-none-match")
+    if if_none_match and resposta.headers["etag"] in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return NotModifiedResponse(resposta.headers)
+    return resposta
+
+
+class Estaticos:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or _pasta is None:
+            await self.app(scope, receive, send)
+            return
+
+        rel = scope["path"].lstrip("/")
+        pedido = Headers(scope=scope)
+
+        if rel.startswith(PASTA_MINIATURAS + "/") and cache_miniaturas is not None:
+            # Gerar a miniatura leva dezenas de ms: fora do loop de eventos
+            servida = await run_in_threadpool(cache_miniaturas.servir, rel)
+            if servida is None:
+                resposta = PlainTextResponse("Not Found", status_code=404)
+            else:
+                dados, tipo = servida
+                resposta = Response(dados, media_type=tipo, headers={"Cache-Control": CACHE_IMUTAVEL})
+            await resposta(scope, receive, send)
+            visitante = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v")
+            if servida is not None and visitante and scope["method"] == "GET":
+                cache_miniaturas.entregue(visitante[0], rel)
+            return
+
+        apelido = _manifesto.get("apelidos", {}).get(rel)
+        variantes = _manifesto["variantes"].get(apelido or rel)
+        if variantes:
+            accept = pedido.get("accept", "")
+            tipo = mimetypes.guess_type(rel)[0]
+            if "image/avif" in variantes and _aceita(accept, "image/avif"):
+                tipo = "image/avif"
+            elif "image/webp" in variantes and (_aceita(accept, "image/webp") or _aceita(accept, "*/*") or not accept):
+                tipo = "image/webp"
+            # Com hash no nome o arquivo nunca muda; no apelido o endereço é fixo e precisa revalidar
+            cache = CACHE_REVALIDAR if apelido else CACHE_IMUTAVEL
+            resposta = _arquivo(variantes[tipo], scope, tipo, {"Cache-Control": cache, "Vary": "Accept"})
+            await resposta(scope, receive, send)
+            return
+
+        comprimidos = _manifesto["comprimidos"].get(rel)
+        if comprimidos:
+            accept_encoding = pedido.get("accept-encoding", "")
+            for codificacao in ("br", "gzip"):
+                if codificacao in comprimidos and _aceita(accept_encoding, codificacao):
+                    cabecalhos = {
+                        "Content-Encoding": codificacao,
+                        "Vary": "Accept-Encoding",
+                        "Cache-Control": CACHE_REVALIDAR,
+                    }
+                    tipo = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+                    resposta = _arquivo(comprimidos[codificacao], scope, tipo, cabecalhos)
+                    await resposta(scope, receive, send)
+                    return
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = MutableHeaders(scope=mensagem)
+                if "cache-control" not in cabecalhos:
+                    cabecalhos["Cache-Control"] = CACHE_REVALIDAR
+                if comprimidos:
+                    cabecalhos.add_vary_header("Accept-Encoding")
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
+
+
+# Uso: python estaticos.py [pasta_assets]
+if __name__ == "__main__":
+    construir(sys.argv[1] if len(sys.argv) > 1 else "assets")
@@ -0,0 +1,270 @@
+import atexit
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+
+# ----------------------------------------------------------------------
+#          HISTÓRICO DE JOGOS: GRAVAÇÃO EM SEGUNDO PLANO (SQLITE)
+# ----------------------------------------------------------------------
+# Cada resposta e cada jogo terminado viram um evento numa fila em memória;
+# as telas só enfileiram (nada de disco no clique). Uma thread grava a fila
+# em lotes, um lote por transação, num SQLite em modo WAL.
+#
+# O ranking da temporada e o aproveitamento de cada pergunta são tabelas de
+# agregados atualizadas na mesma transação que grava os eventos: as
+# consultas leem poucas linhas por índice, sem varrer o histórico.
+#
+# O resultado de cada jogo fica por (jogo, nome). O ranking da temporada
+# soma pelo nome, então nomes padrão ("Equipe 1", "Jogador 2"), que grupos
+# diferentes usam sem mudar, ficam fora dele; e só conta vitória o jogo com
+# pelo menos MINIMO_VITORIA participantes (jogar sozinho não é vencer).
+#
+# Se o disco não acompanhar e a fila passar do limite, os eventos novos são
+# descartados (e contados) em vez de atrasar o jogo. Ao encerrar o processo
+# a fila é esvaziada.
+#
+# Consulta rápida: python historico.py [historico.db] [temporada]
+
+TAMANHO_LOTE = 1000
+INTERVALO_GRAVACAO = 0.2    # Espera mínima entre lotes (junta mais eventos por transação)
+LIMITE_FILA = 50000
+MINIMO_VITORIA = 2
+NOME_PADRAO = re.compile(r"(equipe|jogador)\s*\d+", re.IGNORECASE)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS jogos (
+    id TEXT PRIMARY KEY, temporada TEXT NOT NULL, origem TEXT NOT NULL,
+    modo TEXT, participantes INTEGER NOT NULL, fim REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS resultados (
+    jogo TEXT NOT NULL, nome TEXT NOT NULL, pontos INTEGER NOT NULL, posicao INTEGER NOT NULL,
+    PRIMARY KEY (jogo, nome));
+CREATE TABLE IF NOT EXISTS respostas (
+    jogo TEXT NOT NULL, pergunta INTEGER NOT NULL, nome TEXT NOT NULL, acertou INTEGER NOT NULL,
+    tempo_esgotado INTEGER NOT NULL, tempo_resposta REAL, instante REAL NOT NULL);
+
+-- Agregados mantidos a cada lote
+CREATE TABLE IF NOT EXISTS ranking (
+    temporada TEXT NOT NULL, nome TEXT NOT NULL,
+    pontos INTEGER NOT NULL DEFAULT 0, jogos INTEGER NOT NULL DEFAULT 0, vitorias INTEGER NOT NULL DEFAULT 0,
+    respostas INTEGER NOT NULL DEFAULT 0, acertos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (temporada, nome));
+CREATE INDEX IF NOT EXISTS ranking_pontos ON ranking (temporada, pontos DESC);
+CREATE TABLE IF NOT EXISTS perguntas (
+    pergunta INTEGER PRIMARY KEY, respostas INTEGER NOT NULL, acertos INTEGER NOT NULL,
+    esgotadas INTEGER NOT NULL, soma_tempo REAL NOT NULL);
+"""
+
+
+class Historico:
+    def __init__(self, caminho, temporada):
+        self.caminho = caminho
+        self.temporada = temporada
+        self.gravados = 0
+        self.descartados = 0
+        self.lotes = 0
+        self._fila = queue.Queue(LIMITE_FILA)
+        # Duas conexões: a da thread de gravação e a das consultas (WAL deixa
+        # as leituras correrem durante um lote)
+        self._escrita = self._conectar()
+        self._escrita.executescript(ESQUEMA)
+        self._leitura = self._conectar()
+        self._lock_leitura = threading.Lock()
+        self._thread = threading.Thread(target=self._executar, name="historico", daemon=True)
+        self._thread.start()
+        atexit.register(self.fechar)
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=10, isolation_level=None, check_same_thread=False)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    # --- Eventos (chamados pelas telas: só enfileiram) ---
+
+    def registrar_resposta(self, jogo, pergunta, nome, acertou, tempo_esgotado, tempo_resposta=None):
+        self._enfileirar(("resposta", jogo, pergunta, nome, bool(acertou), bool(tempo_esgotado),
+                          tempo_resposta, time.time()))
+
+    def registrar_jogo(self, jogo, origem, modo, placar):
+        # placar: nome -> pontos finais
+        self._enfileirar(("jogo", jogo, origem, modo, dict(placar), time.time()))
+
+    def _enfileirar(self, evento):
+        try:
+            self._fila.put_nowait(evento)
+        except queue.Full:
+            self.descartados += 1
+
+    def pendentes(self):
+        return self._fila.qsize()
+
+    # --- Gravação ---
+
+    def _executar(self):
+        ultimo = 0.0
+        while True:
+            lote = [self._fila.get()]
+            # Pouco movimento: espera um pouco para juntar mais eventos no commit.
+            # Com a fila cheia grava direto; o lote já sai completo.
+            espera = ultimo + INTERVALO_GRAVACAO - time.monotonic()
+            if espera > 0 and lote[0] is not None and self._fila.qsize() < TAMANHO_LOTE:
+                time.sleep(espera)
+            while len(lote) < TAMANHO_LOTE and lote[-1] is not None:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            fim = lote[-1] is None
+            if fim:
+                lote.pop()
+            if lote:
+                try:
+                    self._gravar(lote)
+                    self.gravados += len(lote)
+                    self.lotes += 1
+                except Exception:
+                    # Lote perdido não derruba a thread (disco cheio, banco travado...)
+                    self.descartados += len(lote)
+                    traceback.print_exc()
+            ultimo = time.monotonic()
+            if fim:
+                return
+
+    def _gravar(self, lote):
+        respostas = []
+        perguntas = {}    # pergunta -> [respostas, acertos, esgotadas, soma_tempo]
+        jogadores = {}    # nome -> [respostas, acertos]
+        jogos = []
+        for evento in lote:
+            if evento[0] == "resposta":
+                _, jogo, pergunta, nome, acertou, esgotado, tempo, instante = evento
+                respostas.append((jogo, pergunta, nome, acertou, esgotado, tempo, instante))
+                p = perguntas.setdefault(pergunta, [0, 0, 0, 0.0])
+                p[0] += 1
+                p[1] += acertou
+                p[2] += esgotado
+                p[3] += tempo or 0.0
+                if not nome_padrao(nome):
+                    j = jogadores.setdefault(nome, [0, 0])
+                    j[0] += 1
+                    j[1] += acertou
+            else:
+                jogos.append(evento)
+
+        c = self._escrita
+        c.execute("BEGIN")
+        try:
+            c.executemany("INSERT INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?)", respostas)
+            # Agregados: uma linha por pergunta/jogador do lote, não uma por evento
+            c.executemany(
+                "INSERT INTO perguntas VALUES (?, ?, ?, ?, ?) ON CONFLICT (pergunta) DO UPDATE SET"
+                " respostas = respostas + excluded.respostas, acertos = acertos + excluded.acertos,"
+                " esgotadas = esgotadas + excluded.esgotadas, soma_tempo = soma_tempo + excluded.soma_tempo",
+                [(p, *v) for p, v in perguntas.items()]
+            )
+            c.executemany(
+                "INSERT INTO ranking (temporada, nome, respostas, acertos) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (temporada, nome) DO UPDATE SET"
+                " respostas = respostas + excluded.respostas, acertos = acertos + excluded.acertos",
+                [(self.temporada, n, *v) for n, v in jogadores.items()]
+            )
+            for _, jogo, origem, modo, placar, instante in jogos:
+                novo = c.execute(
+                    "INSERT OR IGNORE INTO jogos VALUES (?, ?, ?, ?, ?, ?)",
+                    (jogo, self.temporada, origem, modo, len(placar), instante)
+                ).rowcount
+                if not novo:
+                    continue  # Jogo já gravado (ex.: placar reenviado): não soma de novo
+                maximo = max(placar.values(), default=0)
+                disputado = len(placar) >= MINIMO_VITORIA
+                ordem = sorted(placar.items(), key=lambda x: -x[1])
+                c.executemany("INSERT INTO resultados VALUES (?, ?, ?, ?)",
+                              [(jogo, nome, pts, i + 1) for i, (nome, pts) in enumerate(ordem)])
+                c.executemany(
+                    "INSERT INTO ranking (temporada, nome, pontos, jogos, vitorias) VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT (temporada, nome) DO UPDATE SET pontos = pontos + excluded.pontos,"
+                    " jogos = jogos + 1, vitorias = vitorias + excluded.vitorias",
+                    [(self.temporada, nome, pts, int(disputado and pts == maximo and pts > 0))
+                     for nome, pts in placar.items() if not nome_padrao(nome)]
+                )
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+
+    def fechar(self, timeout=5):
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+    # --- Consultas (só agregados) ---
+
+    def _consultar(self, sql, parametros):
+        with self._lock_leitura:
+            return self._leitura.execute(sql, parametros).fetchall()
+
+    def ranking(self, limite=10, temporada=None):
+        linhas = self._consultar(
+            "SELECT nome, pontos, jogos, vitorias, respostas, acertos FROM ranking"
+            " WHERE temporada = ? AND jogos > 0 ORDER BY pontos DESC LIMIT ?",
+            (temporada or self.temporada, limite)
+        )
+        return [dict(zip(("nome", "pontos", "jogos", "vitorias", "respostas", "acertos"), l)) for l in linhas]
+
+    def estatisticas_perguntas(self, limite=10, minimo_respostas=5, mais_dificeis=True):
+        # A tabela tem uma linha por pergunta do banco (centenas), não por resposta
+        linhas = self._consultar(
+            "SELECT pergunta, respostas, acertos, esgotadas, soma_tempo FROM perguntas WHERE respostas >= ?"
+            f" ORDER BY CAST(acertos AS REAL) / respostas {'ASC' if mais_dificeis else 'DESC'} LIMIT ?",
+            (minimo_respostas, limite)
+        )
+        return [self._estatistica(l) for l in linhas]
+
+    def estatistica_pergunta(self, pergunta):
+        linhas = self._consultar(
+            "SELECT pergunta, respostas, acertos, esgotadas, soma_tempo FROM perguntas WHERE pergunta = ?",
+            (pergunta,)
+        )
+        return self._estatistica(linhas[0]) if linhas else None
+
+    def aproveitamento_perguntas(self):
+        # {pergunta: (respostas, acertos)} de todas, para o modo Adaptativo
+        linhas = self._consultar("SELECT pergunta, respostas, acertos FROM perguntas", ())
+        return {pergunta: (respostas, acertos) for pergunta, respostas, acertos in linhas}
+
+    @staticmethod
+    def _estatistica(linha):
+        pergunta, respostas, acertos, esgotadas, soma_tempo = linha
+        return {
+            "pergunta": pergunta, "respostas": respostas, "acertos": acertos, "esgotadas": esgotadas,
+            "aproveitamento": acertos / respostas if respostas else 0.0,
+            "tempo_medio": soma_tempo / respostas if respostas else 0.0,
+        }
+
+
+def nome_padrao(nome):
+    # Nome que o jogo sugere e ninguém trocou: não identifica uma equipe
+    return NOME_PADRAO.fullmatch(nome.strip()) is not None
+
+
+def criar(caminho, temporada):
+    # Caminho vazio desliga o histórico
+    return Historico(caminho, temporada) if caminho else None
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "historico.db"
+    temporada = sys.argv[2] if len(sys.argv) > 2 else time.strftime("%Y")
+    h = Historico(caminho, temporada)
+    print(f"Ranking da temporada {temporada}:")
+    for i, r in enumerate(h.ranking(20)):
+        print(f"{i+1:>3}º {r['nome']:<30} {r['pontos']:>6} pts  {r['jogos']:>3} jogos  {r['vitorias']:>3} vitórias  "
+              f"{r['acertos']}/{r['respostas']} acertos")
+    print("\nPerguntas mais difíceis:")
+    for e in h.estatisticas_perguntas(20):
+        print(f"  ID {e['pergunta']:>5}: {e['aproveitamento']:.0%} de acerto em {e['respostas']} respostas, "
+              f"{e['esgotadas']} esgotadas, {e['tempo_medio']:.1f}s em média")
@@ -0,0 +1,447 @@
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import sys
+import time
+import unicodedata
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+import banco_perguntas
+import leitor_xlsx
+
+# ----------------------------------------------------------------------
+#        IMPORTAÇÃO EM LOTE: JUNTAR BANCOS DE PERGUNTAS DA COMUNIDADE
+# ----------------------------------------------------------------------
+# Lê várias fontes (.xlsx ou .csv) registro a registro, valida cada
+# pergunta e grava o banco unificado (.xlsx no formato de quiz_biblico.xlsx,
+# ou .csv) também em streaming. Nenhuma fonte é carregada inteira.
+#
+# Validação: campos obrigatórios preenchidos, nível conhecido, quatro
+# opções diferentes e Resposta Correta igual a uma delas. Resposta dada só
+# pela letra ("B") ou com outra caixa/acentuação vira o texto exato da
+# opção, que é o que o jogo compara.
+#
+# Duplicadas: o texto da Pergunta é normalizado (sem acento, caixa e
+# pontuação). Texto igual a um já importado é descartado. Texto parecido
+# é apontado no relatório (e mantido, a não ser com --descartar-semelhantes)
+# pela semelhança de Jaccard estimada com MinHash sobre trechos de 3
+# caracteres: uma assinatura de 64 valores por pergunta, dividida em 10
+# faixas (LSH). Só quem cai na mesma faixa de alguma pergunta já importada
+# é comparado, em vez de todos contra todos, e esses poucos candidatos são
+# conferidos pela semelhança exata dos trechos (a estimativa com 64 valores
+# varia uns 6 pontos, o bastante para confundir perguntas do mesmo molde).
+#
+# Textos, faixas e IDs usados ficam num SQLite temporário em disco com
+# cache limitado, então a memória não cresce com o tamanho da entrada.
+#
+# Uso: python importacao.py destino.xlsx fonte1.xlsx fonte2.csv ...
+#          [--relatorio problemas.csv] [--descartar-semelhantes]
+
+OBRIGATORIAS = (
+    'Pergunta', 'Nível', 'Opção A', 'Opção B', 'Opção C', 'Opção D', 'Resposta Correta'
+)
+LETRAS = "ABCD"
+
+TAMANHO_TRECHO = 3          # caracteres por trecho (shingle)
+NUM_VALORES = 64            # tamanho da assinatura MinHash
+# 10 faixas x 6 valores (os 4 últimos ficam de fora): um par com 75% de
+# semelhança vira candidato em 86% das vezes, com 85% em 99%. Faixas de 4
+# valores achariam mais, mas as perguntas que só dividem o começo ("Qual foi
+# o...") virariam centenas de candidatas por linha.
+BANDAS = 10
+VALORES_BANDA = 6
+LIMIAR_SEMELHANCA = 0.75    # no banco atual, perguntas distintas do mesmo molde ficam abaixo de 0.7
+MAX_CANDIDATOS = 50         # perguntas-modelo ("Quem escreveu o livro de X?") lotam uma faixa
+CACHE_INDICE_KB = 16 * 1024
+
+_BITS_VALOR = 26            # 32 bits do hash: 6 escolhem a posição, 26 são o valor
+_ASSINATURA = struct.Struct(f"<{NUM_VALORES}Q")
+_CARACTERES_INVALIDOS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")  # proibidos no XML
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar(texto):
+    sem_acento = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("ascii")
+    return _NAO_ALFANUMERICO.sub(" ", sem_acento.casefold()).strip()
+
+
+_NIVEIS = {normalizar(n): n for n in banco_perguntas.NIVEIS}
+
+
+# ========================================================================
+#                       LEITURA DAS FONTES
+# ========================================================================
+
+def _ler_csv(caminho):
+    # Excel em português costuma gravar CSV com ";"
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.DictReader(f, dialect=dialeto)
+
+
+def _mapear_colunas(cabecalho, origem):
+    # Aceita "Opcao A", "nivel"... : coluna do banco -> nome na fonte
+    por_chave = {normalizar(c).replace(" ", ""): c for c in cabecalho if c}
+    mapa = {c: por_chave.get(normalizar(c).replace(" ", "")) for c in banco_perguntas.COLUNAS}
+    faltando = [c for c in OBRIGATORIAS if mapa[c] is None]
+    if faltando:
+        raise ValueError(f"{origem}: faltam as colunas {', '.join(faltando)}")
+    return mapa
+
+
+def ler_fonte(caminho):
+    # Gera (número do registro, pergunta) com as colunas do banco
+    if caminho.lower().endswith(".csv"):
+        registros = _ler_csv(caminho)
+    else:
+        registros = leitor_xlsx.ler_registros(caminho)
+    mapa = None
+    for n, registro in enumerate(registros, start=1):
+        if mapa is None:
+            mapa = _mapear_colunas(registro.keys(), caminho)
+        pergunta = {}
+        for coluna, origem in mapa.items():
+            valor = banco_perguntas._texto_celula(registro.get(origem)) if origem else None
+            pergunta[coluna] = (valor.strip() or None) if valor is not None else None
+        yield n, pergunta
+
+
+def validar(p):
+    # Motivo da rejeição, ou None. Ajusta nível e resposta para a forma do banco.
+    faltando = [c for c in OBRIGATORIAS if not p[c]]
+    if faltando:
+        return f"campos vazios: {', '.join(faltando)}"
+
+    nivel = _NIVEIS.get(normalizar(p['Nível']))
+    if nivel is None:
+        return f"nível desconhecido: {p['Nível']}"
+    p['Nível'] = nivel
+
+    opcoes = [p[f'Opção {L}'] for L in LETRAS]
+    if len({normalizar(o) for o in opcoes}) < len(opcoes):
+        return "opções repetidas"
+
+    resposta = p['Resposta Correta']
+    if resposta in opcoes:
+        return None
+    letra = resposta.upper().rstrip(").")
+    if len(letra) == 1 and letra in LETRAS:
+        p['Resposta Correta'] = p[f'Opção {letra}']
+        return None
+    iguais = [o for o in opcoes if normalizar(o) == normalizar(resposta)]
+    if len(iguais) == 1:
+        p['Resposta Correta'] = iguais[0]
+        return None
+    return f"Resposta Correta não está entre as opções: {resposta}"
+
+
+# ========================================================================
+#                       MINHASH (UMA PASSADA DE HASH)
+# ========================================================================
+
+def assinatura(texto_normalizado):
+    # MinHash de uma permutação: cada trecho é "hasheado" uma vez; os bits
+    # altos escolhem uma das 64 posições e cada posição guarda o menor valor.
+    # Posições vazias (texto curto) copiam a próxima preenchida, deslocada
+    # pela distância, para não virarem coincidências artificiais.
+    dados = texto_normalizado.encode("ascii")
+    mascara = (1 << _BITS_VALOR) - 1
+    vazio = 1 << 63
+    minimos = [vazio] * NUM_VALORES
+    for i in range(max(1, len(dados) - TAMANHO_TRECHO + 1)):
+        h = (zlib.crc32(dados[i:i + TAMANHO_TRECHO]) * 0x9E3779B1) & 0xFFFFFFFF
+        posicao, valor = h >> _BITS_VALOR, h & mascara
+        if valor < minimos[posicao]:
+            minimos[posicao] = valor
+    if vazio in minimos:
+        originais = list(minimos)
+        for i in range(NUM_VALORES):
+            if originais[i] == vazio:
+                distancia = 1
+                while originais[(i + distancia) % NUM_VALORES] == vazio:
+                    distancia += 1
+                minimos[i] = originais[(i + distancia) % NUM_VALORES] + (distancia << _BITS_VALOR)
+    return minimos
+
+
+def trechos(texto_normalizado):
+    t = texto_normalizado
+    return {t[i:i + TAMANHO_TRECHO] for i in range(max(1, len(t) - TAMANHO_TRECHO + 1))}
+
+
+def semelhanca(a, b):
+    # Jaccard entre dois conjuntos de trechos
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _chaves_faixas(minimos):
+    # Uma chave de 64 bits por faixa (a faixa entra no hash: faixas diferentes não colidem)
+    dados = _ASSINATURA.pack(*minimos)
+    passo = VALORES_BANDA * 8
+    return [
+        int.from_bytes(hashlib.blake2b(dados[b * passo:(b + 1) * passo] + bytes((b,)), digest_size=8).digest(),
+                       "little", signed=True)
+        for b in range(BANDAS)
+    ]
+
+
+def _chave_exata(texto_normalizado):
+    return int.from_bytes(hashlib.blake2b(texto_normalizado.encode("ascii"), digest_size=8).digest(),
+                          "little", signed=True)
+
+
+# ========================================================================
+#                       ÍNDICE TEMPORÁRIO (SQLITE)
+# ========================================================================
+
+class _Indice:
+    def __init__(self):
+        # "" = banco temporário em disco, apagado ao fechar; o cache é o teto de memória
+        self.c = sqlite3.connect("", isolation_level=None)
+        self.c.execute(f"PRAGMA cache_size = -{CACHE_INDICE_KB}")
+        self.c.execute("PRAGMA journal_mode = OFF")
+        self.c.execute("PRAGMA synchronous = OFF")
+        self.c.executescript("""
+            CREATE TABLE ids (id INTEGER PRIMARY KEY);
+            CREATE TABLE exatas (chave INTEGER PRIMARY KEY, id INTEGER NOT NULL);
+            CREATE TABLE perguntas (
+                id INTEGER PRIMARY KEY, texto TEXT NOT NULL, normalizado TEXT NOT NULL, trechos INTEGER NOT NULL);
+            CREATE TABLE faixas (chave INTEGER NOT NULL, id INTEGER NOT NULL);
+            CREATE INDEX faixas_chave ON faixas (chave);
+        """)
+        self.c.execute("BEGIN")
+        self.maior_id = 0
+        self.menor_livre = 1  # Nenhum ID abaixo deste está livre (IDs só são reservados)
+
+    def id_livre(self, id):
+        return self.c.execute("SELECT 1 FROM ids WHERE id = ?", (id,)).fetchone() is None
+
+    def reservar_id(self, id=None):
+        # ID novo: o seguinte ao maior, para não tomar o ID que uma linha
+        # adiante traz; depois de MAX_ID, o menor livre; sem nenhum, erro (o
+        # carregador recusaria a linha calado)
+        if id is None:
+            if self.maior_id < banco_perguntas.MAX_ID:
+                id = self.maior_id + 1
+            else:
+                while self.menor_livre <= banco_perguntas.MAX_ID and not self.id_livre(self.menor_livre):
+                    self.menor_livre += 1
+                if self.menor_livre > banco_perguntas.MAX_ID:
+                    raise ValueError(f"IDs esgotados: o banco comporta no máximo {banco_perguntas.MAX_ID} perguntas")
+                id = self.menor_livre
+        self.c.execute("INSERT INTO ids VALUES (?)", (id,))
+        self.maior_id = max(self.maior_id, id)
+        return id
+
+    def exata(self, chave):
+        linha = self.c.execute("SELECT id FROM exatas WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def mais_parecida(self, chaves, meus, limiar):
+        # Jaccard >= limiar exige tamanhos próximos: o resto nem sai do banco
+        linhas = self.c.execute(
+            "SELECT id, texto, normalizado FROM perguntas WHERE trechos BETWEEN ? AND ? AND id IN ("
+            f" SELECT id FROM faixas WHERE chave IN ({','.join('?' * len(chaves))})"
+            " GROUP BY id ORDER BY COUNT(*) DESC LIMIT ?)",
+            (len(meus) * limiar, len(meus) / limiar, *chaves, MAX_CANDIDATOS)
+        ).fetchall()
+        melhor = (0.0, None, None)
+        for id, texto, normalizado in linhas:
+            s = semelhanca(meus, trechos(normalizado))
+            if s > melhor[0]:
+                melhor = (s, id, texto)
+        return melhor
+
+    def adicionar(self, id, chave, chaves, texto, normalizado, n_trechos):
+        self.c.execute("INSERT INTO exatas VALUES (?, ?)", (chave, id))
+        self.c.execute("INSERT INTO perguntas VALUES (?, ?, ?, ?)", (id, texto, normalizado, n_trechos))
+        self.c.executemany("INSERT INTO faixas VALUES (?, ?)", [(k, id) for k in chaves])
+
+    def fechar(self):
+        self.c.close()
+
+
+# ========================================================================
+#                       GRAVAÇÃO DO BANCO UNIFICADO
+# ========================================================================
+
+_XLSX_FIXOS = {
+    "[Content_Types].xml":
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>',
+    "_rels/.rels":
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>',
+    "xl/workbook.xml":
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Perguntas" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    "xl/_rels/workbook.xml.rels":
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>',
+}
+
+
+class _GravadorXlsx:
+    # Planilha com strings inline, escrita linha a linha direto no zip
+    def __init__(self, caminho):
+        self._zip = zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED)
+        for nome, conteudo in _XLSX_FIXOS.items():
+            self._zip.writestr(nome, conteudo)
+        self._planilha = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._planilha.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        )
+        self._linha = 0
+
+    def escrever(self, valores):
+        self._linha += 1
+        celulas = []
+        for i, v in enumerate(valores):
+            if v is None:
+                continue
+            ref = f"{chr(65 + i)}{self._linha}"
+            if isinstance(v, int):
+                celulas.append(f'<c r="{ref}"><v>{v}</v></c>')
+            else:
+                texto = escape(_CARACTERES_INVALIDOS.sub("", v))
+                celulas.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>')
+        self._planilha.write(f'<row r="{self._linha}">{"".join(celulas)}</row>'.encode("utf-8"))
+
+    def fechar(self):
+        self._planilha.write(b"</sheetData></worksheet>")
+        self._planilha.close()
+        self._zip.close()
+
+
+class _GravadorCsv:
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, "w", encoding="utf-8-sig", newline="")
+        self._csv = csv.writer(self._arquivo)
+
+    def escrever(self, valores):
+        self._csv.writerow(valores)
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+# ========================================================================
+#                       IMPORTAÇÃO
+# ========================================================================
+
+def importar(fontes, destino, relatorio=None, descartar_semelhantes=False, limiar=LIMIAR_SEMELHANCA):
+    resumo = dict.fromkeys(("lidas", "importadas", "invalidas", "duplicadas", "semelhantes", "ids_novos"), 0)
+    # Escrita atômica: o destino pode ser uma das fontes (ex.: quiz_biblico.xlsx)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    gravador = (_GravadorCsv if destino.lower().endswith(".csv") else _GravadorXlsx)(temporario)
+    gravador.escrever(banco_perguntas.COLUNAS)
+    problemas = None
+    if relatorio:
+        arquivo_relatorio = open(relatorio, "w", encoding="utf-8-sig", newline="")
+        problemas = csv.writer(arquivo_relatorio)
+        problemas.writerow(("Fonte", "Registro", "ID", "Problema", "Detalhe", "ID parecido", "Pergunta parecida"))
+    indice = _Indice()
+
+    def apontar(fonte, n, id, problema, detalhe="", parecido=None, texto=None):
+        if problemas:
+            problemas.writerow((fonte, n, id, problema, detalhe, parecido, texto))
+
+    ok = False
+    try:
+        for fonte in fontes:
+            for n, p in ler_fonte(fonte):
+                resumo["lidas"] += 1
+                motivo = validar(p)
+                if motivo:
+                    resumo["invalidas"] += 1
+                    apontar(fonte, n, p['ID'], "inválida", motivo)
+                    continue
+
+                texto = normalizar(p['Pergunta'])
+                chave = _chave_exata(texto)
+                igual = indice.exata(chave)
+                if igual is not None:
+                    resumo["duplicadas"] += 1
+                    apontar(fonte, n, p['ID'], "duplicada", "", igual)
+                    continue
+
+                meus = trechos(texto)
+                chaves = _chaves_faixas(assinatura(texto))
+                s, parecido, texto_parecido = indice.mais_parecida(chaves, meus, limiar)
+                if s >= limiar:
+                    resumo["semelhantes"] += 1
+                    apontar(fonte, n, p['ID'], "semelhante", f"{s:.0%}", parecido, texto_parecido)
+                    if descartar_semelhantes:
+                        continue
+
+                # Mantém o ID da fonte se for válido e ainda livre; senão, um novo
+                try:
+                    id = int(p['ID'])
+                except (TypeError, ValueError):
+                    id = None
+                if id is None or not 0 < id <= banco_perguntas.MAX_ID or not indice.id_livre(id):
+                    id = None
+                    resumo["ids_novos"] += 1
+                p['ID'] = id = indice.reservar_id(id)
+
+                indice.adicionar(id, chave, chaves, p['Pergunta'], texto, len(meus))
+                gravador.escrever([p[c] for c in banco_perguntas.COLUNAS])
+                resumo["importadas"] += 1
+        ok = True
+    finally:
+        gravador.fechar()
+        indice.fechar()
+        if problemas:
+            arquivo_relatorio.close()
+        if ok:
+            os.replace(temporario, destino)
+        else:
+            os.remove(temporario)
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Junta bancos de perguntas (.xlsx/.csv) num só")
+    parser.add_argument("destino", help="banco unificado (.xlsx ou .csv)")
+    parser.add_argument("fontes", nargs="+")
+    parser.add_argument("--relatorio", help="CSV com inválidas, duplicadas e semelhantes")
+    parser.add_argument("--descartar-semelhantes", action="store_true")
+    parser.add_argument("--limiar", type=float, default=LIMIAR_SEMELHANCA)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    try:
+        r = importar(args.fontes, args.destino, args.relatorio, args.descartar_semelhantes, args.limiar)
+    except (OSError, ValueError) as e:
+        print(f"Erro na importação: {e}")
+        sys.exit(1)
+    print(f"{r['importadas']} perguntas gravadas em {args.destino} ({r['lidas']} lidas em "
+          f"{time.perf_counter() - inicio:.1f}s): {r['invalidas']} inválidas, {r['duplicadas']} duplicadas, "
+          f"{r['semelhantes']} semelhantes, {r['ids_novos']} com ID novo")
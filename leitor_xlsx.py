@@ -0,0 +1,207 @@
+import functools
+import os
+import posixpath
+import sqlite3
+import tempfile
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+# ----------------------------------------------------------------------
+#                 LEITOR DE XLSX SÓ COM A BIBLIOTECA PADRÃO
+# ----------------------------------------------------------------------
+# Lê a primeira planilha de um .xlsx em streaming (zipfile + iterparse),
+# linha a linha, sem pandas/openpyxl. As linhas são descartadas assim que
+# entregues. A tabela de strings compartilhadas (onde o Excel guarda todo
+# texto das células) fica na memória até LIMITE_STRINGS caracteres; numa
+# planilha maior, vai para um SQLite temporário em disco, consultado com um
+# cache pequeno, e a memória continua limitada.
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+LIMITE_STRINGS = 8 * 1024 * 1024  # caracteres das strings compartilhadas na memória
+LOTE_STRINGS = 10_000
+CACHE_STRINGS = 4096
+
+
+def _texto(elem):
+    # <si>/<is> podem ter <t> direto ou vários trechos formatados <r><t>
+    return "".join(t.text or "" for t in elem.iter(f"{NS}t"))
+
+
+class _StringsEmDisco:
+    # Lista de strings num SQLite temporário, indexada como a da memória
+    def __init__(self, pasta):
+        self._conexao = sqlite3.connect(os.path.join(pasta, "strings.db"))
+        self._conexao.execute("PRAGMA journal_mode=OFF")
+        self._conexao.execute("PRAGMA synchronous=OFF")
+        self._conexao.execute("CREATE TABLE strings (i INTEGER PRIMARY KEY, s TEXT)")
+        self._n = 0
+        self._buscar = functools.lru_cache(CACHE_STRINGS)(self._ler)
+
+    def estender(self, strings):
+        self._conexao.executemany("INSERT INTO strings VALUES (?, ?)", enumerate(strings, self._n))
+        self._conexao.commit()
+        self._n += len(strings)
+
+    def _ler(self, i):
+        linha = self._conexao.execute("SELECT s FROM strings WHERE i = ?", (i,)).fetchone()
+        if linha is None:
+            raise IndexError(i)
+        return linha[0]
+
+    def __getitem__(self, i):
+        return self._buscar(i)
+
+    def __len__(self):
+        return self._n
+
+    def fechar(self):
+        self._conexao.close()
+
+
+def _strings_compartilhadas(zf, pasta_temporaria):
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    caracteres = 0
+    em_disco = None
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{NS}si":
+                texto = _texto(elem)
+                elem.clear()
+                strings.append(texto)
+                if em_disco is not None:
+                    if len(strings) >= LOTE_STRINGS:
+                        em_disco.estender(strings)
+                        strings = []
+                    continue
+                caracteres += len(texto)
+                if caracteres > LIMITE_STRINGS:
+                    em_disco = _StringsEmDisco(pasta_temporaria())
+                    em_disco.estender(strings)
+                    strings = []
+    if em_disco is None:
+        return strings
+    em_disco.estender(strings)
+    return em_disco
+
+
+def _primeira_planilha(zf):
+    with zf.open("xl/workbook.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{NS}sheet":
+                rid = elem.get(f"{NS_REL}id")
+                break
+        else:
+            raise ValueError("Pasta de trabalho sem planilhas")
+
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{NS_PKG}Relationship" and elem.get("Id") == rid:
+                alvo = elem.get("Target")
+                if alvo.startswith("/"):
+                    return alvo.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", alvo))
+    raise ValueError(f"Planilha {rid} não encontrada")
+
+
+def _coluna(ref):
+    # "AB12" -> 27 (base 0)
+    n = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + (ord(ch.upper()) - 64)
+    return n - 1
+
+
+def _numero(texto):
+    try:
+        return int(texto)
+    except ValueError:
+        valor = float(texto)
+        return int(valor) if valor.is_integer() else valor
+
+
+def _valor(c, strings):
+    tipo = c.get("t", "n")
+    if tipo == "inlineStr":
+        elem = c.find(f"{NS}is")
+        return _texto(elem) if elem is not None else None
+
+    v = c.find(f"{NS}v")
+    if v is None or v.text is None:
+        return None
+    if tipo == "s":
+        return strings[int(v.text)]
+    if tipo == "b":
+        return v.text == "1"
+    if tipo in ("str", "e"):
+        return v.text
+    return _numero(v.text)
+
+
+class _PastaTemporaria:
+    # Só cria a pasta se alguém pedir (planilhas pequenas não tocam no disco)
+    def __init__(self):
+        self._pasta = None
+
+    def __call__(self):
+        if self._pasta is None:
+            self._pasta = tempfile.TemporaryDirectory(prefix="leitor_xlsx_")
+        return self._pasta.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pasta is not None:
+            self._pasta.cleanup()
+
+
+def _linhas(zf, strings):
+    with zf.open(_primeira_planilha(zf)) as f:
+        dados = None
+        for evento, elem in iterparse(f, events=("start", "end")):
+            if evento == "start":
+                if elem.tag == f"{NS}sheetData":
+                    dados = elem
+                continue
+            if elem.tag != f"{NS}row":
+                continue
+            linha = []
+            for i, c in enumerate(elem.iter(f"{NS}c")):
+                ref = c.get("r")
+                col = _coluna(ref) if ref else i
+                if col >= len(linha):
+                    linha.extend([None] * (col + 1 - len(linha)))
+                linha[col] = _valor(c, strings)
+            # Solta a linha já lida para a memória não crescer com o arquivo
+            elem.clear()
+            if dados is not None:
+                dados.remove(elem)
+            yield linha
+
+
+# Gera cada linha da primeira planilha como lista de valores
+def ler_linhas(caminho):
+    with zipfile.ZipFile(caminho) as zf, _PastaTemporaria() as pasta:
+        strings = _strings_compartilhadas(zf, pasta)
+        try:
+            yield from _linhas(zf, strings)
+        finally:
+            if isinstance(strings, _StringsEmDisco):
+                strings.fechar()
+
+
+# Gera cada linha como dict, usando a primeira linha como cabeçalho
+def ler_registros(caminho):
+    linhas = ler_linhas(caminho)
+    cabecalho = [str(c).strip() if c is not None else "" for c in next(linhas, [])]
+    for linha in linhas:
+        if not any(v is not None and v != "" for v in linha):
+            continue
+        yield {c: (linha[i] if i < len(linha) else None) for i, c in enumerate(cabecalho) if c}
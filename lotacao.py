@@ -0,0 +1,152 @@
+import threading
+import time
+import traceback
+import weakref
+
+# ----------------------------------------------------------------------
+#             LOTAÇÃO DO PROCESSO E SESSÕES ABANDONADAS
+# ----------------------------------------------------------------------
+# Cada página aberta ocupa uma vaga: o estado do jogo, a árvore de controles
+# e, no meio de uma pergunta, uma contagem no agendador. Uma aba fechada sem
+# aviso só é descartada pelo Flet quando vence o prazo de reconexão dele, e
+# sem chamar on_close. Aqui:
+#   - há no máximo `maximo` vagas (0 = sem limite); quem chega além disso vê
+#     uma página leve de "servidor cheio", sem nada do jogo montado;
+#   - uma página desconectada há mais de `reconexao` segundos, ou sem nenhum
+#     evento do navegador há mais de `ociosa` segundos, é recolhida: a vaga
+#     volta e a sessão recebe ao_recolher(motivo) para parar a contagem,
+#     sair da sala e soltar a tela. O jogo continua gravado no armazém de
+#     sessões e é retomado se o jogador voltar.
+#
+# Uma única thread varre as vagas a cada `intervalo` segundos. Os eventos do
+# navegador são contados direto no Page.on_event_async do Flet.
+
+MAXIMO_PADRAO = 500
+OCIOSA_PADRAO = 1800
+RECONEXAO_PADRAO = 120
+INTERVALO = 15
+
+_EVENTOS_CONEXAO = ("connect", "disconnect", "close")  # não contam como atividade
+
+
+class Vaga:
+    __slots__ = ("ao_recolher", "ultimo_evento", "desconectada_em")
+
+    def __init__(self, ao_recolher):
+        self.ao_recolher = ao_recolher
+        self.ultimo_evento = time.monotonic()
+        self.desconectada_em = None
+
+
+class Lotacao:
+    def __init__(self, maximo=MAXIMO_PADRAO, ociosa=OCIOSA_PADRAO, reconexao=RECONEXAO_PADRAO, intervalo=INTERVALO):
+        self.maximo = maximo
+        self.ociosa = ociosa
+        self.reconexao = reconexao
+        self.intervalo = intervalo
+        self._vagas = {}  # página -> Vaga
+        self._paginas = weakref.WeakSet()  # todas ainda vivas no processo, com vaga ou não
+        self._lock = threading.Lock()
+        self._thread = None
+        self.recusadas = 0
+        self.recolhidas = {"ociosa": 0, "desconectada": 0}
+
+    def _garantir_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name="recolhedor-sessoes", daemon=True)
+            self._thread.start()
+
+    def admitir(self, pagina, ao_recolher):
+        # False = processo lotado. Uma página que já tem vaga troca de ao_recolher.
+        with self._lock:
+            self._paginas.add(pagina)
+            if pagina not in self._vagas and self.maximo and len(self._vagas) >= self.maximo:
+                self.recusadas += 1
+                return False
+            self._vagas[pagina] = Vaga(ao_recolher)
+            self._garantir_thread()
+        return True
+
+    def liberar(self, pagina):
+        with self._lock:
+            self._vagas.pop(pagina, None)
+
+    def tocar(self, pagina):
+        vaga = self._vagas.get(pagina)
+        if vaga is not None:
+            vaga.ultimo_evento = time.monotonic()
+
+    def desconectou(self, pagina):
+        vaga = self._vagas.get(pagina)
+        if vaga is not None:
+            vaga.desconectada_em = time.monotonic()
+
+    def reconectou(self, pagina):
+        # False se a vaga já foi recolhida: a página precisa ser admitida de novo
+        vaga = self._vagas.get(pagina)
+        if vaga is None:
+            return False
+        vaga.desconectada_em = None
+        vaga.ultimo_evento = time.monotonic()
+        return True
+
+    def ativas(self):
+        return len(self._vagas)
+
+    def em_memoria(self):
+        # Páginas que o Flet (ou alguém) ainda segura: deve acompanhar ativas()
+        with self._lock:
+            return len(self._paginas)
+
+    def conectadas(self):
+        with self._lock:
+            return sum(1 for v in self._vagas.values() if v.desconectada_em is None)
+
+    def varrer(self, agora=None):
+        # Tira as vagas vencidas sob o lock e avisa as sessões fora dele
+        agora = time.monotonic() if agora is None else agora
+        vencidas = []
+        with self._lock:
+            for pagina, vaga in list(self._vagas.items()):
+                if vaga.desconectada_em is not None and agora - vaga.desconectada_em > self.reconexao:
+                    motivo = "desconectada"
+                elif self.ociosa and agora - vaga.ultimo_evento > self.ociosa:
+                    motivo = "ociosa"
+                else:
+                    continue
+                del self._vagas[pagina]
+                self.recolhidas[motivo] += 1
+                vencidas.append((vaga, motivo))
+        for vaga, motivo in vencidas:
+            try:
+                vaga.ao_recolher(motivo)
+            except Exception:
+                # Uma sessão com problema (ex.: página já descartada) não para o recolhedor
+                traceback.print_exc()
+        return len(vencidas)
+
+    def _executar(self):
+        while True:
+            time.sleep(self.intervalo)
+            self.varrer()
+
+
+def _instrumentar_flet(lotacao):
+    # Todo evento vindo do navegador (clique, digitação...) passa por aqui
+    import flet as ft
+
+    original = ft.Page.on_event_async
+
+    async def on_event_async(self, e):
+        if e.name not in _EVENTOS_CONEXAO:
+            lotacao.tocar(self)
+        return await original(self, e)
+
+    ft.Page.on_event_async = on_event_async
+
+
+def criar(maximo=MAXIMO_PADRAO, ociosa=OCIOSA_PADRAO, reconexao=RECONEXAO_PADRAO):
+    # Prazos curtos (testes) pedem varreduras mais frequentes
+    lotacao = Lotacao(maximo, ociosa, reconexao, min(INTERVALO, max(0.5, reconexao / 4)))
+    _instrumentar_flet(lotacao)
+    return lotacao
@@ -1,16 +1,77 @@
+import asyncio
 import flet as ft
-import pandas as pd
 import random
+from array import array
 import os
-import time
 import threading
+import time
+import uuid
+
+import uvicorn
+
+import adaptativo
+import banco_perguntas
+import estaticos
+import historico
+import lotacao
+import metricas
+import referencias
+import salas
+import sessoes
+import temporizador
 
 # ----------------------------------------------------------------------
 #                       CONFIGURAÇÕES GERAIS
 # ----------------------------------------------------------------------
 ARQUIVO_PERGUNTAS = "quiz_biblico.xlsx"
+PASTA_ASSETS = "assets"            # Única pasta publicada pelo servidor web
 IMG_ABERTURA = "open_00.jpg"
 IMG_ICONE = "icon_00.png"
+DENSIDADE_TELA = 2                 # Pixels reais por pixel lógico ao escolher o tamanho das imagens
+LARGURA_IMAGEM = 340               # Imagem da pergunta (coluna Imagem), em pixels lógicos
+LARGURA_IMAGEM_TELAO = 600
+ESPERA_IMAGEM = float(os.environ.get("QUIZ_ESPERA_IMAGEM_S", 3))  # Máximo que a contagem espera a imagem chegar
+CACHE_IMAGENS_MB = float(os.environ.get("QUIZ_CACHE_IMAGENS_MB", 32))  # Miniaturas prontas na memória
+INTERVALO_RECARGA = float(os.environ.get("QUIZ_RECARGA_S", 2))  # 0 = sem recarga a quente
+
+# --- Contagem Regressiva ---
+# "cliente": o navegador anima a barra sozinho; o servidor só envia a troca de
+# cor (alerta) e o fim do tempo. "servidor": o servidor atualiza só a barra,
+# QUIZ_CONTAGEM_HZ vezes por segundo.
+MODO_CONTAGEM = os.environ.get("QUIZ_CONTAGEM", "cliente")
+TAXA_CONTAGEM_HZ = float(os.environ.get("QUIZ_CONTAGEM_HZ", 2))
+if TAXA_CONTAGEM_HZ <= 0:
+    print(f"Aviso: QUIZ_CONTAGEM_HZ={TAXA_CONTAGEM_HZ:g} inválido (precisa ser > 0); usando 2")
+    TAXA_CONTAGEM_HZ = 2.0
+LIMIAR_ALERTA = 0.3                # Fração de tempo restante em que a barra fica vermelha
+LARGURA_BARRA = 300
+
+# --- Sessões ---
+# Onde o jogo de cada navegador é guardado para poder ser retomado:
+# "memoria" (padrão, um só processo) ou "sqlite:caminho.db" (vários workers
+# atrás de um balanceador, na mesma máquina).
+ARMAZEM_SESSOES = os.environ.get("QUIZ_SESSOES", "memoria")
+CHAVE_SESSAO = "quiz_biblico.sessao"   # Chave no client_storage do navegador
+SUFIXO_RODIZIO = ":rodizio"            # Perguntas já vistas pelo grupo, ao lado da sessão
+
+# --- Lotação ---
+# Máximo de sessões neste processo (0 = sem limite); quem chega além disso vê
+# "servidor cheio". Sessões sem nenhum evento do navegador há QUIZ_OCIOSA_S
+# segundos, ou desconectadas há QUIZ_RECONEXAO_S, são recolhidas (o jogo
+# continua no armazém de sessões e é retomado se o jogador voltar).
+MAX_SESSOES = int(os.environ.get("QUIZ_MAX_SESSOES", lotacao.MAXIMO_PADRAO))
+TEMPO_OCIOSA = float(os.environ.get("QUIZ_OCIOSA_S", lotacao.OCIOSA_PADRAO))
+TEMPO_RECONEXAO = float(os.environ.get("QUIZ_RECONEXAO_S", lotacao.RECONEXAO_PADRAO))
+
+# --- Histórico ---
+# Resultados e respostas de todos os jogos, gravados em segundo plano para o
+# ranking da temporada e o aproveitamento das perguntas. Vazio desliga.
+ARQUIVO_HISTORICO = os.environ.get("QUIZ_HISTORICO", "historico.db")
+TEMPORADA = os.environ.get("QUIZ_TEMPORADA", time.strftime("%Y"))
+
+# --- Métricas (Prometheus) ---
+# Desligadas por padrão. Ex.: QUIZ_METRICAS_PORTA=8081 -> http://127.0.0.1:8081/metrics
+METRICAS_PORTA = os.environ.get("QUIZ_METRICAS_PORTA")
 
 # --- Cores ---
 COR_PRIMARY = "#2980B9"            # Azul Principal
@@ -29,6 +90,10 @@ CORES_NIVEL = {
     'DIFÍCIL': "#FF0000"
 }
 
+# Tema do jogo (além dos testamentos, em referencias.py)
+TEMA_BIBLIA = "Toda a Bíblia"
+TEMA_LIVROS = "Escolher livros..."
+
 # Pontuação
 PONTOS = {
     'FÁCIL': 5,
@@ -36,19 +101,20 @@ PONTOS = {
     'DIFÍCIL': 15
 }
 
-def carregar_perguntas():
-    try:
-        try:
-            d = os.path.dirname(os.path.abspath(__file__))
-            os.chdir(d)
-        except: pass
-
-        df = pd.read_excel(ARQUIVO_PERGUNTAS)
-        df['Nível'] = df['Nível'].astype(str).str.upper() 
-        return df.to_dict('records')
-    except Exception as e:
-        print(f"Erro Excel: {e}")
-        return []
+# Página leve para quem chega com o processo lotado: nada do jogo é montado
+def mostrar_lotado(page):
+    page.clean()
+    page.add(ft.Container(
+        content=ft.Column([
+            ft.Icon(name="hourglass_empty", color=COR_PRIMARY, size=60),
+            ft.Text("Servidor cheio", size=25, weight=ft.FontWeight.BOLD, color=COR_PRIMARY),
+            ft.Text("Muitos jogadores agora. Tente de novo em instantes.", size=16, text_align=ft.TextAlign.CENTER),
+            ft.Container(height=20),
+            ft.ElevatedButton("TENTAR NOVAMENTE", bgcolor=COR_PRIMARY, color="white", width=250, height=50,
+                              on_click=lambda e: main(page))
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+        padding=30, bgcolor=COR_CARD, border_radius=20, width=380
+    ))
 
 def main(page: ft.Page):
     # --- Configurações da Página ---
@@ -65,22 +131,48 @@ def main(page: ft.Page):
     
     page.favicon = IMG_ICONE 
 
+    # --- Lotação (lotacao.py) ---
+    # Também chamado de novo na mesma página: "TENTAR NOVAMENTE", "CONTINUAR"
+    # depois de recolhida, ou reconexão de uma página já recolhida
+    if not controle_lotacao.admitir(page, lambda motivo: recolher(motivo)):
+        mostrar_lotado(page)
+        return
+
+    def ao_reconectar(e):
+        if not controle_lotacao.reconectou(page):
+            main(page)  # Vaga recolhida enquanto esteve fora: monta de novo e retoma o jogo
+
+    page.on_disconnect = lambda e: controle_lotacao.desconectou(page)
+    page.on_connect = ao_reconectar
+
     # --- Variáveis de Estado ---
     estado = {
-        "perguntas_selecionadas": [],
+        "banco": None,             # Banco (ou visão temática) de onde o jogo foi sorteado
+        "perguntas": array("I"),   # Posições das perguntas do jogo em estado["banco"]
+        "total_perguntas": 0,      # No modo Adaptativo as perguntas saem uma a uma
+        "niveis": [],
+        "livros": None,            # Tema do jogo (None = toda a Bíblia)
+        "habilidades": {},         # Modo Adaptativo: habilidade estimada de cada equipe
         "indice_atual": 0,
         "placar": {}, 
         "participantes": [], 
         "vez_index": 0,
         "tempo_limite": 30,
-        "timer_rodando": False,
+        "contagem": None,          # Contagem da pergunta atual (prazo + resolução única)
+        "respostas": [],           # Tempo de resposta e latência do servidor, por pergunta
         "pontos_rodada": 0,
         "ultimo_nivel_mostrado": None,
-        "modo_jogo": "Aleatório"
+        "modo_jogo": "Aleatório",
+        "tela": None,              # "transicao", "jogo" ou "placar" durante uma partida
+        "opcoes": [],              # Índices em pergunta.opcoes, na ordem sorteada
+        "prazo": None,             # Fim do tempo da pergunta atual (relógio de parede)
+        "resposta": None,          # {"valor" (índice da opção), "tempo_esgotado"} depois de respondida
+        "jogo": None               # Identificador da partida no histórico
     }
+    lock_contagem = threading.Lock()  # Dois cliques em VER OPÇÕES, cada um numa thread do pool
+    visitante = uuid.uuid4().hex      # Nas miniaturas: o servidor anota quando este navegador as recebeu
 
-    bd_perguntas = carregar_perguntas()
-    if not bd_perguntas:
+    if not banco_perguntas.obter():
         page.add(ft.Text("ERRO CRÍTICO: Arquivo Excel não encontrado.", color="red", size=20))
         return
 
@@ -90,20 +182,34 @@ def main(page: ft.Page):
     
     def mostrar_tela_abertura():
         page.clean()
+        largura_abertura = min(page.width or 450, 450)
         
-        # Botão Iniciar Translúcido
+        # Botões Translúcidos: jogo num só aparelho ou sala com celulares
         btn_entrar = ft.Container(
-            content=ft.ElevatedButton(
-                "INICIAR JOGO", 
-                color="white",
-                bgcolor=COR_TRANSLUCIDO, 
-                width=220, 
-                height=60,
-                style=ft.ButtonStyle(
-                    shape=ft.RoundedRectangleBorder(radius=30),
+            content=ft.Column([
+                ft.ElevatedButton(
+                    "INICIAR JOGO", 
+                    color="white",
+                    bgcolor=COR_TRANSLUCIDO, 
+                    width=220, 
+                    height=60,
+                    style=ft.ButtonStyle(
+                        shape=ft.RoundedRectangleBorder(radius=30),
+                    ),
+                    on_click=lambda e: mostrar_tela_config()
                 ),
-                on_click=lambda e: mostrar_tela_config()
-            ),
+                ft.ElevatedButton(
+                    "JOGAR EM SALA", 
+                    color="white",
+                    bgcolor=COR_TRANSLUCIDO, 
+                    width=220, 
+                    height=50,
+                    style=ft.ButtonStyle(
+                        shape=ft.RoundedRectangleBorder(radius=30),
+                    ),
+                    on_click=lambda e: mostrar_tela_salas()
+                ),
+            ], tight=True, spacing=10, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
             padding=ft.padding.only(bottom=50),
             alignment=ft.alignment.bottom_center
         )
@@ -112,7 +218,7 @@ def main(page: ft.Page):
         stack_abertura = ft.Stack(
             [
                 ft.Image(
-                    src=IMG_ABERTURA,
+                    src=estaticos.imagem(IMG_ABERTURA, largura_abertura * DENSIDADE_TELA),
                     width=450, # Ocupa largura simulada
                     height=700, # Altura fixa para garantir que o botão apareça dentro
                     fit=ft.ImageFit.COVER,
@@ -146,8 +252,35 @@ def main(page: ft.Page):
     cb_dificil = ft.Checkbox(label="Difícil", value=True)
     rg_modo = ft.RadioGroup(content=ft.Row([
         ft.Radio(value="Aleatório", label="Aleatório"),
-        ft.Radio(value="Progressivo", label="Progressivo")
+        ft.Radio(value="Progressivo", label="Progressivo"),
+        ft.Radio(value="Adaptativo", label="Adaptativo")
     ]), value="Aleatório")
+    cb_rodizio = ft.Checkbox(label="Não repetir perguntas entre jogos", value=True)
+    dd_tema = ft.Dropdown(
+        label="Tema", width=250, value=TEMA_BIBLIA,
+        options=[ft.dropdown.Option(t) for t in (TEMA_BIBLIA, referencias.ANTIGO, referencias.NOVO, TEMA_LIVROS)],
+        on_change=lambda e: atualizar_livros()
+    )
+    row_livros = ft.Row(wrap=True, spacing=0, visible=False, alignment=ft.MainAxisAlignment.CENTER)
+
+    def atualizar_livros():
+        # Só livros citados em alguma pergunta do banco vigente (com a contagem)
+        if dd_tema.value == TEMA_LIVROS:
+            marcados = {c.data for c in row_livros.controls if c.value}
+            row_livros.controls = [
+                ft.Checkbox(label=f"{livro} ({len(perguntas)})", data=livro, value=livro in marcados)
+                for livro, perguntas in banco_perguntas.obter().por_livro.items()
+            ]
+        row_livros.visible = dd_tema.value == TEMA_LIVROS
+        page.update()
+
+    def livros_escolhidos():
+        # None = sem filtro de livro
+        if dd_tema.value in referencias.POR_TESTAMENTO:
+            return referencias.POR_TESTAMENTO[dd_tema.value]
+        if dd_tema.value == TEMA_LIVROS:
+            return [c.data for c in row_livros.controls if c.value]
+        return None
 
     def atualizar_campos_nomes():
         col_nomes.controls.clear()
@@ -159,6 +292,7 @@ def main(page: ft.Page):
     def mostrar_tela_config():
         page.clean()
         atualizar_campos_nomes() 
+        atualizar_livros()
         
         # Cabeçalho com Botão Voltar
         header = ft.Row(
@@ -184,8 +318,11 @@ def main(page: ft.Page):
                 ft.Row([tf_qtd_perguntas, tf_tempo], alignment=ft.MainAxisAlignment.CENTER),
                 ft.Text("Níveis:", size=14),
                 ft.Row([cb_facil, cb_medio, cb_dificil], alignment=ft.MainAxisAlignment.CENTER),
+                dd_tema,
+                row_livros,
                 ft.Text("Modo:", size=14),
                 rg_modo,
+                cb_rodizio,
                 ft.Container(height=20),
                 btn_iniciar
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
@@ -195,7 +332,8 @@ def main(page: ft.Page):
             shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
         ))
 
-    def processar_configuracao(e):
+    # Níveis, quantidade, tempo e tema escolhidos (jogo local e sala usam os mesmos campos)
+    def ler_regras():
         niveis_sel = []
         if cb_facil.value: niveis_sel.append('FÁCIL')
         if cb_medio.value: niveis_sel.append('MÉDIO')
@@ -203,53 +341,67 @@ def main(page: ft.Page):
 
         if not niveis_sel:
             page.show_snack_bar(ft.SnackBar(ft.Text("Selecione um nível!")))
-            return
+            return None
 
         try:
             qtd_p = int(tf_qtd_perguntas.value)
             tempo = int(tf_tempo.value)
-            if tempo < 5: raise ValueError
+            if tempo < 5 or qtd_p < 1: raise ValueError
         except:
             page.show_snack_bar(ft.SnackBar(ft.Text("Dados inválidos!")))
+            return None
+
+        livros = livros_escolhidos()
+        if livros is not None and not livros:
+            page.show_snack_bar(ft.SnackBar(ft.Text("Escolha ao menos um livro!")))
+            return None
+        if livros is not None and not banco_perguntas.obter().tema(livros).elegiveis(niveis_sel):
+            page.show_snack_bar(ft.SnackBar(ft.Text("Nenhuma pergunta desse tema nos níveis escolhidos!")))
+            return None
+        return niveis_sel, qtd_p, tempo, livros
+
+    @metricas.cronometrar("processar_configuracao")
+    def processar_configuracao(e):
+        regras = ler_regras()
+        if regras is None:
             return
+        niveis_sel, qtd_p, tempo, livros = regras
 
         nomes = [c.value.strip() for c in col_nomes.controls if c.value.strip()]
         if not nomes:
             page.show_snack_bar(ft.SnackBar(ft.Text("Preencha nomes!")))
             return
 
-        base = [p for p in bd_perguntas if p.get('Nível') in niveis_sel]
-        if len(base) < qtd_p: qtd_p = len(base)
-
-        final_perguntas = []
+        # Cada jogo usa o banco vigente no momento em que foi montado
         modo = rg_modo.value
-
-        if modo == "Aleatório":
-            final_perguntas = random.sample(base, qtd_p)
-            random.shuffle(final_perguntas)
+        if modo == "Adaptativo":
+            # As perguntas saem uma a uma, conforme as equipes respondem
+            banco = banco_do_tema(livros)
+            perguntas = array("I")
+            total = min(qtd_p, len(banco.elegiveis(niveis_sel)))
         else:
-            p_niveis = {n: [p for p in base if p['Nível'] == n] for n in niveis_sel}
-            ordem_niveis = [n for n in ['FÁCIL', 'MÉDIO', 'DIFÍCIL'] if n in niveis_sel]
-            
-            qtd_niveis = len(ordem_niveis)
-            if qtd_niveis > 0:
-                base_por_nivel = qtd_p // qtd_niveis
-                resto = qtd_p % qtd_niveis
-                for i, nivel in enumerate(ordem_niveis):
-                    qtd_para_este = base_por_nivel + (1 if i < resto else 0)
-                    if p_niveis[nivel]:
-                        final_perguntas.extend(random.sample(p_niveis[nivel], min(len(p_niveis[nivel]), qtd_para_este)))
+            banco, final_perguntas = montar_jogo(niveis_sel, qtd_p, modo, livros)
+            perguntas = banco.indices(final_perguntas)
+            total = len(perguntas)
 
         estado.update({
-            "perguntas_selecionadas": final_perguntas,
+            "banco": banco,
+            "perguntas": perguntas,
+            "total_perguntas": total,
+            "niveis": niveis_sel,
+            "livros": livros,
+            "habilidades": {nome: 0.0 for nome in nomes},
             "participantes": nomes,
             "placar": {nome: 0 for nome in nomes},
+            "respostas": [],
             "indice_atual": 0,
             "vez_index": 0,
             "tempo_limite": tempo,
             "modo_jogo": modo,
-            "ultimo_nivel_mostrado": None
+            "ultimo_nivel_mostrado": None,
+            "jogo": uuid.uuid4().hex
         })
+        metricas.contar("quiz_jogos_iniciados_total")
         
         mostrar_tela_resumo()
 
@@ -257,6 +409,12 @@ def main(page: ft.Page):
     #                       TELA 1.5: RESUMO
     # ========================================================================
 
+    def descrever_tema():
+        livros = livros_escolhidos()
+        if livros is None or dd_tema.value in referencias.POR_TESTAMENTO:
+            return dd_tema.value
+        return ", ".join(livros)
+
     def mostrar_tela_resumo():
         page.clean()
         lista_nomes = ft.Column([ft.Text(f"• {n}", size=18) for n in estado["participantes"]])
@@ -272,7 +430,8 @@ def main(page: ft.Page):
                 lista_nomes,
                 ft.Divider(),
                 ft.Text(f"Modo: {estado['modo_jogo']}"),
-                ft.Text(f"Perguntas: {len(estado['perguntas_selecionadas'])}"),
+                ft.Text(f"Tema: {descrever_tema()}", text_align=ft.TextAlign.CENTER),
+                ft.Text(f"Perguntas: {estado['total_perguntas']}"),
                 ft.Text(f"Tempo: {estado['tempo_limite']}s"),
                 ft.Container(height=20),
                 ft.Row([btn_voltar, btn_comecar], alignment=ft.MainAxisAlignment.CENTER)
@@ -286,15 +445,33 @@ def main(page: ft.Page):
 
     txt_vez = ft.Text(value="", size=20, weight=ft.FontWeight.BOLD, color=COR_PRIMARY)
     txt_info_nivel = ft.Text(value="", size=14, color="grey")
-    pb_tempo = ft.ProgressBar(width=300, value=1.0, color="green", bgcolor="#eeeeee")
+    # Barra de tempo: trilho fixo + preenchimento com largura animada no cliente.
+    # A cor fica num filho separado para mudar sem reiniciar a animação.
+    cor_tempo = ft.Container(bgcolor="green")
+    barra_tempo = ft.Container(content=cor_tempo, width=LARGURA_BARRA, height=4)
+    pb_tempo = ft.Container(content=barra_tempo, width=LARGURA_BARRA, height=4, bgcolor="#eeeeee", alignment=ft.alignment.center_left)
     txt_pergunta = ft.Text(value="", size=20, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER)
-    col_opcoes = ft.Column(spacing=10)
-    btn_revelar = ft.ElevatedButton("VER OPÇÕES", icon="visibility", bgcolor=COR_SECONDARY, color="white", width=300, height=60)
+    # A imagem vem de um endereço com hash (cache imutável no navegador). Enquanto
+    # a explicação da pergunta anterior está na tela, img_antecipada (invisível,
+    # 1 px) já carrega a próxima, que aparece junto com o texto. Se ainda assim
+    # chegar atrasada, não come tempo: o VER OPÇÕES só começa a contagem depois
+    # que o navegador recebeu a imagem (até ESPERA_IMAGEM).
+    img_pergunta = ft.Image(width=LARGURA_IMAGEM, fit=ft.ImageFit.CONTAIN, border_radius=10, visible=False)
+    img_antecipada = ft.Image(width=1, height=1, opacity=0, visible=False)
+    # Os quatro botões de opção são criados uma vez; a cada pergunta só o texto e o estilo mudam.
+    # O texto inicial não pode ser vazio: a tela é montada antes da primeira pergunta.
+    btn_opcoes = [
+        ft.OutlinedButton(text=" ", width=300, height=50, on_click=lambda e: processar_resposta(e.control.data))
+        for _ in range(4)
+    ]
+    col_opcoes = ft.Column(btn_opcoes, spacing=10)
+    btn_revelar = ft.ElevatedButton("VER OPÇÕES", icon="visibility", bgcolor=COR_SECONDARY, color="white", width=300, height=60,
+                                    on_click=lambda e: acao_revelar_opcoes())
     txt_feedback = ft.Text(value="", size=18, weight=ft.FontWeight.BOLD)
     txt_explicacao = ft.Text(value="", size=16, color="grey", text_align=ft.TextAlign.CENTER)
     
     # CORREÇÃO: Botão Próxima sempre branco
-    btn_proxima = ft.ElevatedButton("PRÓXIMA", visible=False, color="white")
+    btn_proxima = ft.ElevatedButton("PRÓXIMA", visible=False, color="white", on_click=lambda e: avancar_pergunta())
 
     def confirmar_saida_jogo(e):
         dlg_modal = ft.AlertDialog(
@@ -310,73 +487,125 @@ def main(page: ft.Page):
         page.open(dlg_modal)
 
     def encerrar_jogo_imediato(dlg):
+        if estado["contagem"]:
+            estado["contagem"].resolver()
         page.close(dlg) 
-        mostrar_placar_final() 
+        mostrar_placar_final(abandonado=True)
 
-    def mostrar_tela_jogo():
-        page.clean()
-        
-        header_jogo = ft.Row(
-            [
-                ft.Container(), 
-                ft.IconButton(icon="close", icon_color="red", tooltip="Encerrar Jogo", on_click=confirmar_saida_jogo)
-            ],
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-        )
+    # Telas do jogo: montadas uma vez por partida e reaproveitadas. Trocar de
+    # tela ou de pergunta só envia as propriedades que mudaram, em vez de
+    # derrubar e reconstruir a árvore inteira no navegador.
+    tela_jogo = ft.Container(
+        content=ft.Column([
+            ft.Row(
+                [
+                    ft.Container(), 
+                    ft.IconButton(icon="close", icon_color="red", tooltip="Encerrar Jogo", on_click=confirmar_saida_jogo)
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+            ),
+            ft.Row([txt_vez], alignment=ft.MainAxisAlignment.CENTER),
+            pb_tempo,
+            ft.Divider(),
+            txt_info_nivel,
+            img_pergunta,
+            ft.Container(content=txt_pergunta, padding=10),
+            btn_revelar, 
+            col_opcoes,  
+            ft.Divider(),
+            txt_feedback,
+            txt_explicacao,
+            ft.Container(height=10),
+            btn_proxima,
+            img_antecipada
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+        padding=10,
+        bgcolor=COR_CARD,
+        border_radius=20,
+        width=380,
+        shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
+    )
 
-        game_container = ft.Container(
-            content=ft.Column([
-                header_jogo,
-                ft.Row([txt_vez], alignment=ft.MainAxisAlignment.CENTER),
-                pb_tempo,
-                ft.Divider(),
-                txt_info_nivel,
-                ft.Container(content=txt_pergunta, padding=10),
-                btn_revelar, 
-                col_opcoes,  
-                ft.Divider(),
-                txt_feedback,
-                txt_explicacao,
-                ft.Container(height=10),
-                btn_proxima
-            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            padding=10,
-            bgcolor=COR_CARD,
-            border_radius=20,
-            width=380,
-            shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
-        )
-        page.add(game_container)
+    txt_transicao = ft.Text("", size=50, weight=ft.FontWeight.BOLD, color="white")
+    btn_continuar = ft.ElevatedButton("CONTINUAR >>", bgcolor="white", width=200, height=60, on_click=lambda e: mostrar_tela_jogo())
+    tela_transicao = ft.Container(
+        content=ft.Column([
+            ft.Icon(name="star", color="white", size=80),
+            txt_transicao,
+            ft.Container(height=50),
+            btn_continuar
+        ], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+        width=400, height=800, 
+        alignment=ft.alignment.center,
+        border_radius=20
+    )
+
+    lista_ranking = ft.Column()
+    lista_temporada = ft.Column(visible=False)
+
+    def mostrar_ranking_temporada(e):
+        lista_temporada.controls.clear()
+        lista_temporada.controls.append(ft.Text(f"Ranking da temporada {TEMPORADA}", size=18, weight=ft.FontWeight.BOLD))
+        for i, r in enumerate(registro_historico.ranking(10)):
+            lista_temporada.controls.append(ft.Row([
+                ft.Text(f"{i+1}º {r['nome']}", size=16),
+                ft.Text(f"{r['pontos']} pts · {r['vitorias']}🏆", size=16)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN))
+        lista_temporada.visible = True
+        page.update()
+    tela_placar = ft.Container(
+        content=ft.Column([
+            ft.Text("🏆 FIM DE JOGO 🏆", size=30, weight=ft.FontWeight.BOLD, color=COR_PRIMARY),
+            ft.Divider(),
+            lista_ranking,
+            ft.Divider(),
+            ft.TextButton("Ranking da temporada", visible=bool(registro_historico), on_click=mostrar_ranking_temporada),
+            lista_temporada,
+            ft.ElevatedButton("NOVO JOGO", bgcolor="blue", color="white", width=200, on_click=lambda e: reiniciar_app()),
+            ft.Container(height=10),
+            ft.ElevatedButton("ENCERRAR (IR P/ INÍCIO)", bgcolor="red", color="white", width=250, on_click=lambda e: sair_para_abertura())
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+        padding=30,
+        bgcolor="white",
+        border_radius=20
+    )
+
+    telas_jogo = [tela_transicao, tela_jogo, tela_placar]
+
+    def exibir_tela_jogo(tela):
+        # Monta as três telas na primeira chamada da partida; depois só alterna a visibilidade
+        if page.controls != telas_jogo:
+            page.clean()
+            page.controls.extend(telas_jogo)
+        for t in telas_jogo:
+            t.visible = t is tela
+
+    def mostrar_tela_jogo():
+        exibir_tela_jogo(tela_jogo)
         preparar_proxima_pergunta()
 
     def mostrar_tela_transicao(nivel):
-        page.clean()
         cor_fundo = CORES_NIVEL.get(nivel, "grey")
-        
-        def ir_para_jogo(e):
-            mostrar_tela_jogo()
+        txt_transicao.value = f"NÍVEL {nivel}"
+        btn_continuar.color = cor_fundo
+        tela_transicao.bgcolor = cor_fundo
+        exibir_tela_jogo(tela_transicao)
+        page.update()
+        estado["tela"] = "transicao"
+        salvar_sessao()
 
-        conteudo_transicao = ft.Container(
-            content=ft.Column([
-                ft.Icon(name="star", color="white", size=80),
-                ft.Text(f"NÍVEL {nivel}", size=50, weight=ft.FontWeight.BOLD, color="white"),
-                ft.Container(height=50),
-                ft.ElevatedButton("CONTINUAR >>", color=cor_fundo, bgcolor="white", width=200, height=60, on_click=ir_para_jogo)
-            ], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            bgcolor=cor_fundo,
-            width=400, height=800, 
-            alignment=ft.alignment.center,
-            border_radius=20
-        )
-        page.add(conteudo_transicao)
+    def pergunta_atual():
+        return estado["banco"].perguntas[estado["perguntas"][estado["indice_atual"]]]
 
     def verificar_transicao_e_iniciar():
-        if estado["indice_atual"] >= len(estado["perguntas_selecionadas"]):
+        if estado["indice_atual"] >= estado["total_perguntas"]:
+            mostrar_placar_final()
+            return
+        if estado["modo_jogo"] == "Adaptativo" and not sortear_adaptativa(estado["indice_atual"]):
             mostrar_placar_final()
             return
 
-        prox_pergunta = estado["perguntas_selecionadas"][estado["indice_atual"]]
-        novo_nivel = prox_pergunta['Nível']
+        novo_nivel = pergunta_atual().nome_nivel
 
         deve_mostrar = False
         if estado["modo_jogo"] == "Progressivo":
@@ -391,95 +620,192 @@ def main(page: ft.Page):
         else:
             mostrar_tela_jogo()
 
-    def contagem_regressiva():
-        tempo_total = estado["tempo_limite"]
-        for i in range(tempo_total * 10, -1, -1):
-            if not estado["timer_rodando"]: return
-            progresso = i / (tempo_total * 10)
-            pb_tempo.value = progresso
-            if progresso < 0.3: pb_tempo.color = "red"
-            else: pb_tempo.color = "green"
-            page.update()
-            time.sleep(0.1)
-        
-        if estado["timer_rodando"]:
-            estado["timer_rodando"] = False
-            processar_resposta(None, time_out=True)
+    # Chamados pelo agendador único de contagens (temporizador.py)
+    def atualizar_tempo(contagem, progresso):
+        if contagem.resolvida: return
+        cor_tempo.bgcolor = "red" if progresso <= LIMIAR_ALERTA else "green"
+        if MODO_CONTAGEM == "cliente":
+            cor_tempo.update()  # Único tick do modo cliente: o alerta
+            return
+        barra_tempo.width = LARGURA_BARRA * progresso
+        barra_tempo.update()
 
+    def tempo_esgotado(contagem):
+        # Na thread do agendador fica só a resolução; o resto (modelo do
+        # Adaptativo, SQLite, page.update) vai para o pool da página, para uma
+        # sessão lenta não atrasar as contagens das outras
+        if contagem is estado["contagem"] and contagem.resolver():
+            page.run_thread(concluir_resposta, None, True, contagem, contagem.prazo)
+
+    @metricas.cronometrar("preparar_proxima_pergunta")
     def preparar_proxima_pergunta():
-        if estado["indice_atual"] >= len(estado["perguntas_selecionadas"]):
+        if estado["indice_atual"] >= len(estado["perguntas"]):
             mostrar_placar_final()
             return
 
-        pergunta = estado["perguntas_selecionadas"][estado["indice_atual"]]
-        nivel = pergunta['Nível']
+        pergunta = pergunta_atual()
+        nivel = pergunta.nome_nivel
+        estado["pontos_rodada"] = PONTOS.get(nivel, 5)
+        metricas.contar("quiz_perguntas_servidas_total", nivel=nivel)
+
+        opcoes = list(range(len(pergunta.opcoes)))
+        random.shuffle(opcoes)
+        estado.update({"tela": "jogo", "opcoes": opcoes, "prazo": None, "resposta": None})
+
+        exibir_pergunta()
+        salvar_sessao()
+
+    # Desenha a pergunta atual a partir do estado (também usado ao retomar a sessão)
+    def exibir_pergunta():
+        pergunta = pergunta_atual()
+        nivel = pergunta.nome_nivel
 
         nome_jogador = estado["participantes"][estado["vez_index"]]
         txt_vez.value = f"VEZ DE: {nome_jogador.upper()}"
         
-        txt_info_nivel.value = f"Pergunta {estado['indice_atual']+1}/{len(estado['perguntas_selecionadas'])} - Nível: {nivel}"
+        txt_info_nivel.value = f"Pergunta {estado['indice_atual']+1}/{estado['total_perguntas']} - Nível: {nivel}"
         txt_info_nivel.color = CORES_NIVEL.get(nivel, "black")
-        txt_pergunta.value = pergunta['Pergunta']
-        
-        estado["pontos_rodada"] = PONTOS.get(nivel, 5)
+        txt_pergunta.value = pergunta.texto
+        imagem = estaticos.miniatura(pergunta.imagem, LARGURA_IMAGEM * DENSIDADE_TELA, visitante)
+        img_pergunta.src = imagem
+        img_pergunta.visible = imagem is not None
 
-        col_opcoes.controls.clear()
         col_opcoes.visible = False 
         btn_revelar.visible = True 
-        btn_revelar.on_click = lambda e: acao_revelar_opcoes()
-
-        opcoes = [pergunta[f'Opção {L}'] for L in ['A','B','C','D']]
-        random.shuffle(opcoes)
         
-        for op in opcoes:
-            col_opcoes.controls.append(ft.OutlinedButton(
-                text=op, width=300, height=50,
-                on_click=lambda e, r=op: processar_resposta(r)
-            ))
+        for btn, i in zip(btn_opcoes, estado["opcoes"]):
+            btn.text = pergunta.opcoes[i]
+            btn.data = i
+            btn.disabled = False
+            btn.style = None
 
         txt_feedback.value = ""
         txt_explicacao.value = ""
         btn_proxima.visible = False
-        pb_tempo.value = 1.0
+        barra_tempo.animate = ft.animation.Animation(0, ft.AnimationCurve.LINEAR)
+        barra_tempo.width = LARGURA_BARRA
+        cor_tempo.bgcolor = "green"
         
         page.update()
 
-    def acao_revelar_opcoes():
-        btn_revelar.visible = False
-        col_opcoes.visible = True
-        txt_feedback.value = "Selecione a resposta CORRETA!"
-        txt_feedback.color = "#00BFFF" 
+    # decorrido > 0 ao retomar uma pergunta cujo tempo já estava correndo
+    def acao_revelar_opcoes(decorrido=0.0):
+        tempo = estado["tempo_limite"]
+        restante = max(0.0, tempo - decorrido)
+        intervalo = tempo * (1 - LIMIAR_ALERTA) if MODO_CONTAGEM == "cliente" else 1 / TAXA_CONTAGEM_HZ
+        if not decorrido and img_pergunta.visible:
+            # A imagem faz parte da pergunta: o tempo só corre com ela na tela
+            estaticos.aguardar_miniatura(img_pergunta.src, ESPERA_IMAGEM)
+        # Duplo clique em VER OPÇÕES: a contagem é conferida e criada antes de
+        # qualquer I/O (page.update, sessão), senão o segundo clique chega
+        # enquanto o primeiro ainda espera e começa outra contagem
+        with lock_contagem:
+            atual = estado["contagem"]
+            if atual is not None and not atual.resolvida:
+                return
+            btn_revelar.visible = False
+            col_opcoes.visible = True
+            txt_feedback.value = "Selecione a resposta CORRETA!"
+            txt_feedback.color = "#00BFFF"
+            if MODO_CONTAGEM == "cliente" and decorrido:
+                # A barra parte do tempo que ainda resta
+                barra_tempo.width = LARGURA_BARRA * restante / tempo
+            # A contagem só começa depois da tela montada: se o tempo já tiver
+            # acabado (sessão retomada), o resultado é desenhado por cima dela
+            estado["contagem"] = temporizador.iniciar_contagem(tempo, atualizar_tempo, tempo_esgotado, intervalo, decorrido)
+            estado["prazo"] = time.time() + restante
+
+        if MODO_CONTAGEM == "cliente":
+            if decorrido:
+                page.update()
+            # O navegador anima a barra até zero ao longo do tempo restante
+            barra_tempo.animate = ft.animation.Animation(int(restante * 1000), ft.AnimationCurve.LINEAR)
+            barra_tempo.width = 0
+        else:
+            # Suaviza a barra entre uma atualização e outra
+            barra_tempo.animate = ft.animation.Animation(int(intervalo * 1000), ft.AnimationCurve.LINEAR)
+            barra_tempo.width = LARGURA_BARRA * restante / tempo
         page.update()
-        
-        estado["timer_rodando"] = True
-        threading.Thread(target=contagem_regressiva, daemon=True).start()
+        salvar_sessao()
 
-    def processar_resposta(resposta_usuario, time_out=False):
-        estado["timer_rodando"] = False
-        pergunta = estado["perguntas_selecionadas"][estado["indice_atual"]]
-        correta = pergunta['Resposta Correta']
-        
-        for btn in col_opcoes.controls:
+    def processar_resposta(resposta_usuario):
+        instante = time.monotonic()
+        contagem = estado["contagem"]
+
+        # Clique e expiração disputam a mesma contagem: só o primeiro vale
+        if contagem is None or not contagem.resolver():
+            return
+        # O prazo manda: clique processado depois dele conta como tempo esgotado
+        concluir_resposta(resposta_usuario, instante >= contagem.prazo, contagem, instante)
+
+    # Com a contagem já resolvida (por um clique ou pelo fim do tempo)
+    @metricas.cronometrar("processar_resposta")
+    def concluir_resposta(resposta_usuario, time_out, contagem, instante):
+        if time_out:
+            barra_tempo.width = 0
+        elif MODO_CONTAGEM == "cliente":
+            # Congela a barra (animada no navegador) onde ela está
+            barra_tempo.animate = ft.animation.Animation(0, ft.AnimationCurve.LINEAR)
+            barra_tempo.width = LARGURA_BARRA * (contagem.prazo - instante) / (contagem.prazo - contagem.inicio)
+
+        pergunta = pergunta_atual()
+        acertou = not time_out and resposta_usuario == pergunta.correta
+        nome = estado["participantes"][estado["vez_index"]]
+        if acertou:
+            estado["placar"][nome] += estado["pontos_rodada"]
+        if estado["modo_jogo"] == "Adaptativo":
+            estado["habilidades"][nome] = modelo_adaptativo().registrar(
+                pergunta, estado["habilidades"].get(nome, 0.0), acertou)
+        estado["resposta"] = {"valor": resposta_usuario, "tempo_esgotado": time_out}
+
+        exibir_resultado()
+        page.update()
+        antecipar_proxima()
+
+        estado["respostas"].append({
+            "id": pergunta.id,
+            "participante": estado["participantes"][estado["vez_index"]],
+            "acertou": acertou,
+            "tempo_esgotado": time_out,
+            "tempo_resposta": min(contagem.decorrido(instante), contagem.prazo - contagem.inicio),
+            "latencia_servidor": time.monotonic() - instante,
+        })
+        salvar_sessao()
+        if registro_historico:
+            r = estado["respostas"][-1]
+            registro_historico.registrar_resposta(estado["jogo"], r["id"], r["participante"], acertou, time_out,
+                                                  r["tempo_resposta"])
+
+    # Desenha o resultado da pergunta atual a partir do estado (também usado ao retomar)
+    def exibir_resultado():
+        pergunta = pergunta_atual()
+        correta = pergunta.correta
+        resposta_usuario = estado["resposta"]["valor"]
+        time_out = estado["resposta"]["tempo_esgotado"]
+
+        btn_revelar.visible = False
+        col_opcoes.visible = True
+        for btn in btn_opcoes:
             btn.disabled = True
-            if btn.text == correta:
+            if btn.data == correta:
                 btn.style = ft.ButtonStyle(bgcolor="green", color="white")
-            elif btn.text == resposta_usuario and not time_out:
+            elif btn.data == resposta_usuario and not time_out:
                 btn.style = ft.ButtonStyle(bgcolor="red", color="white")
         
+        acertou = not time_out and resposta_usuario == correta
         if time_out:
             txt_feedback.value = "TEMPO ESGOTADO! ⏰"
             txt_feedback.color = "red"
-        elif resposta_usuario == correta:
+        elif acertou:
             txt_feedback.value = f"CORRETO! +{estado['pontos_rodada']} pts 🎉"
             txt_feedback.color = "green"
-            estado["placar"][estado["participantes"][estado["vez_index"]]] += estado["pontos_rodada"]
         else:
             txt_feedback.value = "ERRADO ❌"
             txt_feedback.color = "red"
             
-        txt_explicacao.value = f"📖 {pergunta['Explicação']}"
+        txt_explicacao.value = f"📖 {pergunta.explicacao}"
         
-        total = len(estado["perguntas_selecionadas"])
+        total = estado["total_perguntas"]
         atual = estado["indice_atual"] + 1
         
         if atual == total - 1:
@@ -494,21 +820,49 @@ def main(page: ft.Page):
 
         btn_proxima.visible = True
         btn_proxima.color = "white" # CORREÇÃO: Garante texto branco
-        btn_proxima.on_click = lambda e: avancar_pergunta()
-        page.update()
+
+    # Enquanto a explicação está na tela, a miniatura da próxima pergunta é
+    # gerada em segundo plano e o navegador já a baixa (no Adaptativo, a
+    # próxima já é sorteada aqui: a habilidade de quem vai respondê-la não
+    # muda até lá)
+    def antecipar_proxima():
+        proxima = estado["indice_atual"] + 1
+        if proxima >= estado["total_perguntas"]:
+            return
+        if estado["modo_jogo"] == "Adaptativo" and not sortear_adaptativa(proxima):
+            return
+        pergunta = estado["banco"].perguntas[estado["perguntas"][proxima]]
+        estaticos.antecipar(pergunta.imagem, LARGURA_IMAGEM * DENSIDADE_TELA)
+        imagem = estaticos.miniatura(pergunta.imagem, LARGURA_IMAGEM * DENSIDADE_TELA, visitante)
+        if imagem is not None:
+            img_antecipada.src = imagem
+            img_antecipada.visible = True
+            img_antecipada.update()
 
     def avancar_pergunta():
         estado["indice_atual"] += 1
         estado["vez_index"] = (estado["vez_index"] + 1) % len(estado["participantes"])
         verificar_transicao_e_iniciar()
 
-    def mostrar_placar_final():
-        page.clean()
-        
+    # Jogo encerrado pelo botão antes da última pergunta mostra o placar, mas
+    # não entra no histórico como resultado (nem vitória) nem nos finalizados
+    def mostrar_placar_final(abandonado=False):
+        if abandonado:
+            metricas.contar("quiz_jogos_abandonados_total")
+        else:
+            metricas.contar("quiz_jogos_finalizados_total")
+        estado["tela"] = "placar"
+        salvar_sessao()
+        if registro_historico and not abandonado:
+            registro_historico.registrar_jogo(estado["jogo"], "local", estado["modo_jogo"], estado["placar"])
+        exibir_placar()
+
+    def exibir_placar():
         ranking = sorted(estado["placar"].items(), key=lambda x: x[1], reverse=True)
         max_score = ranking[0][1] if ranking else 0
         
-        lista_ranking = ft.Column()
+        lista_ranking.controls.clear()
+        lista_temporada.visible = False
         for i, (nome, pts) in enumerate(ranking):
             is_champion = (pts == max_score)
             cor = "gold" if is_champion else "black"
@@ -523,30 +877,635 @@ def main(page: ft.Page):
                 ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
             )
 
-        btn_reiniciar = ft.ElevatedButton("NOVO JOGO", bgcolor="blue", color="white", width=200, on_click=lambda e: reiniciar_app())
-        btn_sair = ft.ElevatedButton("ENCERRAR (IR P/ INÍCIO)", bgcolor="red", color="white", width=250, on_click=lambda e: mostrar_tela_abertura())
+        exibir_tela_jogo(tela_placar)
+        page.update()
+
+    def reiniciar_app():
+        descartar_sessao()
+        page.clean()
+        mostrar_tela_config()
+
+    def sair_para_abertura():
+        descartar_sessao()
+        mostrar_tela_abertura()
+
+    # ========================================================================
+    #                   SALAS MULTIJOGADOR (salas.py)
+    # ========================================================================
+    # O telão mostra a pergunta e o placar; cada equipe responde do celular.
+    # As telas só reagem aos eventos publicados pela sala.
 
+    sala_atual = {"sala": None, "token": None, "jogador": None, "fase": None}
+    lock_sala = threading.Lock()  # Clique do jogador x eventos da sala na mesma tela
+
+    def sair_da_sala():
+        sala, token, jogador = sala_atual["sala"], sala_atual["token"], sala_atual["jogador"]
+        sala_atual.update({"sala": None, "token": None, "jogador": None, "fase": None})
+        if sala is None:
+            return
+        if jogador is None:
+            sala.encerrar()  # Sem o telão o jogo não avança: encerra para os celulares
+        if token:
+            sala.cancelar(token)
+
+    page.on_close = lambda e: fechar_pagina()
+
+    tf_codigo_sala = ft.TextField(label="Código da sala", width=150, capitalization=ft.TextCapitalization.CHARACTERS)
+    tf_nome_equipe = ft.TextField(label="Nome da equipe", width=200)
+
+    def mostrar_tela_salas():
+        page.clean()
+        atualizar_livros()
+        header = ft.Row(
+            [
+                ft.IconButton(icon="arrow_back", icon_color=COR_PRIMARY, on_click=lambda e: mostrar_tela_abertura()),
+                ft.Text("Sala", size=25, weight=ft.FontWeight.BOLD, color=COR_PRIMARY),
+                ft.Container(width=40)
+            ],
+            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+        )
         page.add(ft.Container(
             content=ft.Column([
-                ft.Text("🏆 FIM DE JOGO 🏆", size=30, weight=ft.FontWeight.BOLD, color=COR_PRIMARY),
-                ft.Divider(),
-                lista_ranking,
+                header,
+                ft.Text("Entrar numa sala (celular)", weight=ft.FontWeight.BOLD),
+                ft.Row([tf_codigo_sala, tf_nome_equipe], alignment=ft.MainAxisAlignment.CENTER, wrap=True),
+                ft.ElevatedButton("ENTRAR", bgcolor="green", color="white", width=200, height=50, on_click=entrar_na_sala),
                 ft.Divider(),
-                btn_reiniciar,
-                ft.Container(height=10),
-                btn_sair
+                ft.Text("Abrir uma sala (telão)", weight=ft.FontWeight.BOLD),
+                ft.Row([tf_qtd_perguntas, tf_tempo], alignment=ft.MainAxisAlignment.CENTER),
+                ft.Text("Níveis:", size=14),
+                ft.Row([cb_facil, cb_medio, cb_dificil], alignment=ft.MainAxisAlignment.CENTER),
+                dd_tema,
+                row_livros,
+                ft.Text("Modo:", size=14),
+                rg_modo,
+                cb_rodizio,
+                ft.ElevatedButton("ABRIR SALA", bgcolor=COR_PRIMARY, color="white", width=200, height=50, on_click=abrir_sala),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            padding=30,
-            bgcolor="white",
-            border_radius=20
+            padding=20,
+            bgcolor=COR_CARD,
+            border_radius=20,
+            shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
         ))
 
-    def reiniciar_app():
+    # Barra de tempo das salas: anima no navegador; é recarregada (cheia e
+    # escondida) no resultado, para a próxima pergunta precisar de um só envio
+    cor_tempo_sala = ft.Container(bgcolor="green")
+    barra_tempo_sala = ft.Container(content=cor_tempo_sala, width=LARGURA_BARRA, height=6)
+    pb_tempo_sala = ft.Container(content=barra_tempo_sala, width=LARGURA_BARRA, height=6, bgcolor="#eeeeee",
+                                 alignment=ft.alignment.center_left, visible=False)
+
+    def iniciar_barra_sala(tempo):
+        cor_tempo_sala.bgcolor = "green"
+        pb_tempo_sala.visible = True
+        barra_tempo_sala.animate = ft.animation.Animation(tempo * 1000, ft.AnimationCurve.LINEAR)
+        barra_tempo_sala.width = 0
+
+    def recarregar_barra_sala():
+        pb_tempo_sala.visible = False
+        barra_tempo_sala.animate = ft.animation.Animation(0, ft.AnimationCurve.LINEAR)
+        barra_tempo_sala.width = LARGURA_BARRA
+
+    def linhas_ranking(ranking, limite=10):
+        linhas = []
+        for i, (nome, pts) in enumerate(ranking[:limite]):
+            prefixo = "🏆 " if i == 0 and pts > 0 else f"{i+1}º "
+            linhas.append(ft.Row([
+                ft.Text(f"{prefixo}{nome}", size=18, weight=ft.FontWeight.BOLD),
+                ft.Text(f"{pts} pts", size=18, weight=ft.FontWeight.BOLD)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN))
+        return linhas
+
+    # --- Telão (anfitrião) ---
+
+    txt_codigo_sala = ft.Text("", size=40, weight=ft.FontWeight.BOLD, color=COR_PRIMARY)
+    txt_telao_status = ft.Text("", size=16, color="grey", text_align=ft.TextAlign.CENTER)
+    txt_telao_jogadores = ft.Text("", size=14, text_align=ft.TextAlign.CENTER)
+    txt_telao_pergunta = ft.Text("", size=24, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER)
+    img_telao = ft.Image(width=LARGURA_IMAGEM_TELAO, fit=ft.ImageFit.CONTAIN, border_radius=10, visible=False)
+    img_telao_antecipada = ft.Image(width=1, height=1, opacity=0, visible=False)
+    txt_telao_opcoes = [ft.Text("", size=18) for _ in range(4)]
+    col_telao_ranking = ft.Column(width=340)
+    btn_telao = ft.ElevatedButton("COMEÇAR", bgcolor="green", color="white", width=250, height=50,
+                                  on_click=lambda e: avancar_sala())
+
+    def abrir_sala(e):
+        regras = ler_regras()
+        if regras is None:
+            return
+        niveis_sel, qtd_p, tempo, livros = regras
+        # Na sala todas as equipes respondem a mesma pergunta: não há uma
+        # habilidade só para acompanhar, e o Adaptativo vira Progressivo
+        modo = "Progressivo" if rg_modo.value == "Adaptativo" else rg_modo.value
+        _, perguntas = montar_jogo(niveis_sel, qtd_p, modo, livros)
+        sair_da_sala()
+        sala = salas.criar(perguntas, tempo, PONTOS)
+        sala_atual["sala"] = sala
+
+        txt_codigo_sala.value = f"SALA {sala.codigo}"
+        txt_telao_status.value = "Nos celulares: JOGAR EM SALA e digite o código"
+        txt_telao_jogadores.value = "Nenhuma equipe ainda"
+        txt_telao_pergunta.value = ""
+        img_telao.visible = False
+        for t in txt_telao_opcoes:
+            t.value = ""
+        col_telao_ranking.controls.clear()
+        btn_telao.text = "COMEÇAR"
+        btn_telao.visible = True
+        recarregar_barra_sala()
+
         page.clean()
-        mostrar_tela_config()
+        page.add(ft.Container(
+            content=ft.Column([
+                txt_codigo_sala,
+                txt_telao_status,
+                pb_tempo_sala,
+                img_telao,
+                txt_telao_pergunta,
+                ft.Column(txt_telao_opcoes, spacing=6),
+                txt_telao_jogadores,
+                col_telao_ranking,
+                btn_telao,
+                ft.TextButton("Encerrar sala", on_click=lambda e: encerrar_sala()),
+                img_telao_antecipada
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            padding=20, bgcolor=COR_CARD, border_radius=20, width=700,
+            shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
+        ))
+        sala_atual["token"] = sala.assinar(lambda evento, dados: ao_evento_telao(sala, evento, dados),
+                                           salas.EVENTOS_ANFITRIAO)
+
+    def avancar_sala():
+        sala = sala_atual["sala"]
+        if sala is None:
+            return
+        if sala.fase == "fim":
+            sair_da_sala()
+            mostrar_tela_abertura()
+            return
+        btn_telao.visible = False
+        btn_telao.update()
+        sala.proxima_pergunta(preparar_imagem_telao)
+
+    # Na fila da sala, depois que o telão recebeu a pergunta e antes da
+    # contagem: a miniatura gerada e entregue ao navegador do telão (em geral
+    # já foi, durante o resultado da anterior). Até ESPERA_IMAGEM, que é o
+    # quanto a sala inteira pode ficar parada por um telão que não responde.
+    def preparar_imagem_telao(pergunta):
+        largura = LARGURA_IMAGEM_TELAO * DENSIDADE_TELA
+        estaticos.gerar_miniatura(pergunta.imagem, largura)
+        estaticos.aguardar_miniatura(estaticos.miniatura(pergunta.imagem, largura, visitante), ESPERA_IMAGEM)
+
+    def encerrar_sala():
+        sair_da_sala()
+        mostrar_tela_abertura()
+
+    def ao_evento_telao(sala, evento, dados):
+        controle_lotacao.tocar(page)  # Sala andando não é telão ocioso
+        if registro_historico:
+            registrar_sala(sala, evento, dados)
+        if evento == "jogadores":
+            txt_telao_jogadores.value = f"{len(dados)} equipes: " + ", ".join(dados[:60]) + (" ..." if len(dados) > 60 else "")
+        elif evento == "pergunta":
+            pergunta = dados["pergunta"]
+            txt_telao_status.value = f"Pergunta {dados['indice']+1}/{dados['total']} - Nível: {pergunta.nome_nivel}"
+            txt_telao_pergunta.value = pergunta.texto
+            imagem = estaticos.miniatura(pergunta.imagem, LARGURA_IMAGEM_TELAO * DENSIDADE_TELA, visitante)
+            img_telao.src = imagem
+            img_telao.visible = imagem is not None
+            for t, i, L in zip(txt_telao_opcoes, dados["opcoes"], "ABCD"):
+                t.value = f"{L}) {pergunta.opcoes[i]}"
+                t.data = i
+                t.color = None
+                t.weight = None
+            txt_telao_jogadores.value = "0 responderam"
+            col_telao_ranking.controls.clear()
+            iniciar_barra_sala(dados["tempo"])
+        elif evento == "alerta":
+            cor_tempo_sala.bgcolor = "red"
+            cor_tempo_sala.update()
+            return
+        elif evento == "respostas":
+            respondidas, jogando = dados
+            txt_telao_jogadores.value = f"{respondidas}/{jogando} responderam"
+            txt_telao_jogadores.update()
+            return
+        elif evento == "resultado":
+            for t in txt_telao_opcoes:
+                if t.data == dados["correta"]:
+                    t.color = "green"
+                    t.weight = ft.FontWeight.BOLD
+            acertos = sum(1 for r in dados["respostas"].values() if r["acertou"])
+            txt_telao_jogadores.value = f"{acertos} acertaram · 📖 {dados['explicacao']}"
+            col_telao_ranking.controls[:] = linhas_ranking(dados["ranking"])
+            recarregar_barra_sala()
+            btn_telao.text = "VER PLACAR FINAL" if dados["ultima"] else "PRÓXIMA PERGUNTA"
+            btn_telao.visible = True
+            if not dados["ultima"]:
+                proxima = sala.perguntas[sala.indice + 1].imagem
+                estaticos.antecipar(proxima, LARGURA_IMAGEM_TELAO * DENSIDADE_TELA)
+                imagem = estaticos.miniatura(proxima, LARGURA_IMAGEM_TELAO * DENSIDADE_TELA, visitante)
+                if imagem is not None:
+                    img_telao_antecipada.src = imagem
+                    img_telao_antecipada.visible = True
+        elif evento == "fim":
+            txt_telao_status.value = "🏆 FIM DE JOGO 🏆"
+            txt_telao_pergunta.value = ""
+            img_telao.visible = False
+            for t in txt_telao_opcoes:
+                t.value = ""
+            txt_telao_jogadores.value = ""
+            col_telao_ranking.controls[:] = linhas_ranking(dados, limite=20)
+            recarregar_barra_sala()
+            btn_telao.text = "SAIR"
+            btn_telao.visible = True
+        page.update()
+
+    # O telão é quem leva a sala ao histórico (quem não respondeu conta como tempo esgotado)
+    def registrar_sala(sala, evento, dados):
+        if evento == "resultado":
+            pergunta = dados["pergunta"]
+            for id, j in list(sala.jogadores.items()):
+                r = dados["respostas"].get(id)
+                if r is None:
+                    registro_historico.registrar_resposta(sala.id, pergunta.id, j["nome"], False, True, sala.tempo)
+                else:
+                    registro_historico.registrar_resposta(sala.id, pergunta.id, j["nome"], r["acertou"], False, r["tempo"])
+        elif evento == "fim" and sala.indice >= 0:
+            registro_historico.registrar_jogo(sala.id, "sala", None, dict(dados))
+
+    # --- Celular (equipe) ---
+
+    txt_cel_equipe = ft.Text("", size=18, weight=ft.FontWeight.BOLD, color=COR_PRIMARY)
+    txt_cel_status = ft.Text("", size=18, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER)
+    txt_cel_pergunta = ft.Text("", size=16, text_align=ft.TextAlign.CENTER)
+    btn_cel_opcoes = [
+        ft.OutlinedButton(text=" ", width=300, height=50, visible=False, on_click=lambda e: responder_na_sala(e.control))
+        for _ in range(4)
+    ]
+    txt_cel_posicao = ft.Text("", size=16, color="grey")
+
+    def entrar_na_sala(e):
+        sala = salas.obter(tf_codigo_sala.value or "")
+        if sala is None:
+            page.show_snack_bar(ft.SnackBar(ft.Text("Sala não encontrada!")))
+            return
+        try:
+            jogador = sala.entrar(tf_nome_equipe.value or "", sessao["chave"])
+        except ValueError as erro:
+            page.show_snack_bar(ft.SnackBar(ft.Text(str(erro))))
+            return
+        sair_da_sala()
+        sala_atual.update({"sala": sala, "jogador": jogador, "fase": "espera"})
+
+        txt_cel_equipe.value = f"{sala.jogadores[jogador]['nome']} · SALA {sala.codigo}"
+        txt_cel_status.value = "Aguardando o telão começar..."
+        txt_cel_status.color = None
+        txt_cel_pergunta.value = ""
+        txt_cel_posicao.value = ""
+        for btn in btn_cel_opcoes:
+            btn.visible = False
+        recarregar_barra_sala()
+
+        page.clean()
+        page.add(ft.Container(
+            content=ft.Column([
+                txt_cel_equipe,
+                pb_tempo_sala,
+                txt_cel_status,
+                txt_cel_pergunta,
+                ft.Column(btn_cel_opcoes, spacing=10),
+                txt_cel_posicao,
+                ft.TextButton("Sair da sala", on_click=lambda e: (sair_da_sala(), mostrar_tela_abertura()))
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            padding=20, bgcolor=COR_CARD, border_radius=20, width=380,
+            shadow=ft.BoxShadow(blur_radius=10, color="#33000000")
+        ))
+        sala_atual["token"] = sala.assinar(ao_evento_celular, salas.EVENTOS_JOGADOR)
+
+    def responder_na_sala(btn):
+        sala, jogador = sala_atual["sala"], sala_atual["jogador"]
+        with lock_sala:
+            if sala is None or sala_atual["fase"] != "pergunta":
+                return
+            sala_atual["fase"] = "respondida"
+            for b in btn_cel_opcoes:
+                b.disabled = True
+            btn.style = ft.ButtonStyle(bgcolor=COR_PRIMARY, color="white")
+            txt_cel_status.value = "Resposta enviada! Aguarde..."
+            txt_cel_status.color = COR_PRIMARY
+            page.update()
+        # Pode disparar o resultado na hora (se esta foi a última resposta)
+        sala.responder(jogador, btn.data)
+
+    def ao_evento_celular(evento, dados):
+        controle_lotacao.tocar(page)
+        with lock_sala:
+            if evento == "pergunta":
+                sala_atual["fase"] = "pergunta"
+                pergunta = dados["pergunta"]
+                txt_cel_status.value = f"Pergunta {dados['indice']+1}/{dados['total']}"
+                txt_cel_status.color = CORES_NIVEL.get(pergunta.nome_nivel, "black")
+                txt_cel_pergunta.value = pergunta.texto
+                for btn, i in zip(btn_cel_opcoes, dados["opcoes"]):
+                    btn.text = pergunta.opcoes[i]
+                    btn.data = i
+                    btn.visible = True
+                    btn.disabled = False
+                    btn.style = None
+                iniciar_barra_sala(dados["tempo"])
+            elif evento == "alerta":
+                cor_tempo_sala.bgcolor = "red"
+                cor_tempo_sala.update()
+                return
+            elif evento == "resultado":
+                sala_atual["fase"] = "resultado"
+                minha = dados["respostas"].get(sala_atual["jogador"])
+                if minha is None:
+                    txt_cel_status.value = "TEMPO ESGOTADO! ⏰"
+                    txt_cel_status.color = "red"
+                elif minha["acertou"]:
+                    txt_cel_status.value = f"CORRETO! +{minha['ganhou']} pts 🎉"
+                    txt_cel_status.color = "green"
+                else:
+                    txt_cel_status.value = "ERRADO ❌"
+                    txt_cel_status.color = "red"
+                for btn in btn_cel_opcoes:
+                    btn.disabled = True
+                    if btn.data == dados["correta"]:
+                        btn.style = ft.ButtonStyle(bgcolor="green", color="white")
+                    elif minha and btn.data == minha["opcao"]:
+                        btn.style = ft.ButtonStyle(bgcolor="red", color="white")
+                txt_cel_posicao.value = posicao_no_ranking(dados["ranking"])
+                recarregar_barra_sala()
+            elif evento == "fim":
+                sala_atual["fase"] = "fim"
+                txt_cel_status.value = "🏆 FIM DE JOGO 🏆"
+                txt_cel_status.color = COR_PRIMARY
+                txt_cel_pergunta.value = ""
+                for btn in btn_cel_opcoes:
+                    btn.visible = False
+                txt_cel_posicao.value = posicao_no_ranking(dados)
+                recarregar_barra_sala()
+            page.update()
+
+    def posicao_no_ranking(ranking):
+        sala = sala_atual["sala"]
+        nome = sala.jogadores[sala_atual["jogador"]]["nome"] if sala else None
+        for i, (n, pts) in enumerate(ranking):
+            if n == nome:
+                return f"Você está em {i+1}º de {len(ranking)} · {pts} pts"
+        return ""
+
+    # ========================================================================
+    #                   VAGA RECOLHIDA OU ABA FECHADA (lotacao.py)
+    # ========================================================================
+    # O jogo já está no armazém de sessões: aqui só se para a contagem e se
+    # sai da sala. Chamado pela thread do recolhedor.
+
+    def recolher(motivo):
+        contagem = estado["contagem"]
+        if contagem:
+            contagem.resolver()  # Ao retomar, o tempo continua (ou esgota) pelo prazo gravado
+        estado["contagem"] = None
+        sair_da_sala()
+        if motivo == "ociosa":
+            mostrar_tela_pausa()
+
+    def fechar_pagina():
+        controle_lotacao.liberar(page)
+        recolher("fechada")
+
+    def mostrar_tela_pausa():
+        page.clean()
+        page.add(ft.Container(
+            content=ft.Column([
+                ft.Icon(name="pause_circle", color=COR_PRIMARY, size=60),
+                ft.Text("Sessão pausada", size=25, weight=ft.FontWeight.BOLD, color=COR_PRIMARY),
+                ft.Text("Ficou muito tempo sem jogar. O jogo foi guardado.", size=16, text_align=ft.TextAlign.CENTER),
+                ft.Container(height=20),
+                ft.ElevatedButton("CONTINUAR", bgcolor=COR_PRIMARY, color="white", width=250, height=50,
+                                  on_click=lambda e: main(page))
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            padding=30, bgcolor=COR_CARD, border_radius=20, width=380
+        ))
+
+    # ========================================================================
+    #                   PERSISTÊNCIA DA SESSÃO (sessoes.py)
+    # ========================================================================
+
+    CAMPOS_SESSAO = (
+        "indice_atual", "placar", "participantes", "vez_index", "tempo_limite", "respostas",
+        "pontos_rodada", "ultimo_nivel_mostrado", "modo_jogo", "tela", "opcoes", "prazo", "resposta", "jogo",
+        "total_perguntas", "niveis", "livros", "habilidades"
+    )
+
+    # A chave fica no navegador; o jogo, no armazém (que pode ser de outro processo).
+    # Começa com uma chave nova e troca pela do navegador quando ela chegar.
+    sessao = {"chave": uuid.uuid4().hex}
+
+    def salvar_sessao():
+        dados = {k: estado[k] for k in CAMPOS_SESSAO}
+        dados["perguntas"] = [estado["banco"].perguntas[i].id for i in estado["perguntas"]]
+        try:
+            armazem_sessoes.salvar(sessao["chave"], dados)
+        except Exception as e:
+            print(f"Erro ao salvar sessão: {e}")
+
+    def descartar_sessao():
+        try:
+            armazem_sessoes.remover(sessao["chave"])
+        except Exception as e:
+            print(f"Erro ao descartar sessão: {e}")
+
+    def retomar_sessao():
+        try:
+            dados = armazem_sessoes.carregar(sessao["chave"])
+        except Exception as e:
+            print(f"Erro ao carregar sessão: {e}")
+            return False
+        if not dados or dados.get("tela") not in ("transicao", "jogo", "placar"):
+            return False
+        if any(k not in dados for k in CAMPOS_SESSAO) or not all(isinstance(o, int) for o in dados["opcoes"]):
+            return False  # Gravada por uma versão anterior do jogo
+
+        # As perguntas são guardadas por ID; se alguma saiu do banco, o jogo não é retomado
+        banco = banco_do_tema(dados["livros"])
+        if any(i not in banco.posicao for i in dados["perguntas"]):
+            return False
+        estado.update({k: dados[k] for k in CAMPOS_SESSAO})
+        estado["banco"] = banco
+        estado["perguntas"] = array("I", (banco.posicao[i] for i in dados["perguntas"]))
+
+        if estado["tela"] == "placar":
+            exibir_tela_jogo(tela_placar)
+            exibir_placar()
+        elif estado["tela"] == "transicao":
+            mostrar_tela_transicao(estado["ultimo_nivel_mostrado"])
+        else:
+            exibir_tela_jogo(tela_jogo)
+            exibir_pergunta()
+            if estado["resposta"] is not None:
+                exibir_resultado()
+                page.update()
+                antecipar_proxima()
+            elif estado["prazo"] is not None:
+                # O tempo continua correndo de onde parou (ou esgota na hora)
+                acao_revelar_opcoes(decorrido=max(0.0, estado["tempo_limite"] - (estado["prazo"] - time.time())))
+        return True
+
+    # --- Rodízio: perguntas que este grupo (navegador) já viu ---
+    # Fica no armazém de sessões, numa chave própria: sobrevive ao "NOVO JOGO"
+    # (que descarta a partida) e a reconexões em outro worker.
+    rodizio = {"chave": None, "rodizio": None}
+
+    def rodizio_do_grupo():
+        chave = sessao["chave"] + SUFIXO_RODIZIO
+        if rodizio["chave"] != chave:
+            try:
+                dados = armazem_sessoes.carregar(chave)
+            except Exception as e:
+                print(f"Erro ao carregar rodízio: {e}")
+                dados = None
+            rodizio["chave"] = chave
+            rodizio["rodizio"] = banco_perguntas.Rodizio.de_texto(dados["usadas"]) if dados else banco_perguntas.Rodizio()
+        return rodizio["rodizio"]
+
+    def salvar_rodizio():
+        try:
+            armazem_sessoes.salvar(rodizio["chave"], {"usadas": rodizio["rodizio"].texto()})
+        except Exception as e:
+            print(f"Erro ao salvar rodízio: {e}")
+
+    # Jogo temático: sorteia da visão do banco com os livros escolhidos
+    def banco_do_tema(livros):
+        banco = banco_perguntas.obter()
+        return banco.tema(livros) if livros is not None else banco
+
+    # Devolve o banco sorteado (o inteiro ou a visão do tema) e as perguntas
+    def montar_jogo(niveis_sel, qtd_p, modo, livros=None):
+        banco = banco_do_tema(livros)
+        if not cb_rodizio.value:
+            return banco, banco_perguntas.montar_jogo(banco, niveis_sel, qtd_p, modo)
+        perguntas = banco_perguntas.montar_jogo(banco, niveis_sel, qtd_p, modo, rodizio_do_grupo())
+        salvar_rodizio()
+        return banco, perguntas
+
+    # --- Modo Adaptativo (adaptativo.py) ---
+
+    def aproveitamento_historico():
+        if not registro_historico:
+            return {}
+        try:
+            return registro_historico.aproveitamento_perguntas()
+        except Exception as e:
+            print(f"Erro ao ler aproveitamento das perguntas: {e}")
+            return {}
+
+    def modelo_adaptativo():
+        return adaptativo.modelo(estado["banco"], estado["niveis"], aproveitamento_historico)
+
+    def sortear_adaptativa(indice):
+        # A pergunta `indice` sai na medida da equipe que vai respondê-la (se
+        # já saiu, antecipada ou antes de a sessão ser retomada, fica a mesma)
+        if indice < len(estado["perguntas"]):
+            return True
+        banco = estado["banco"]
+        vez = (estado["vez_index"] + indice - estado["indice_atual"]) % len(estado["participantes"])
+        nome = estado["participantes"][vez]
+        rod = rodizio_do_grupo() if cb_rodizio.value else None
+        no_jogo = {banco.perguntas[i].id for i in estado["perguntas"]}
+        p = modelo_adaptativo().sortear(estado["habilidades"].get(nome, 0.0), no_jogo, rod)
+        if p is None:
+            return False
+        estado["perguntas"].append(banco.posicao[p.id])
+        if rod is not None:
+            rod.marcar(banco, p)
+            salvar_rodizio()
+        return True
+
+    # A leitura do client_storage espera a resposta do navegador, e essa resposta
+    # é entregue por uma thread do mesmo pool que roda main(). Esperá-la aqui
+    # dentro trava o pool quando muitos jogadores conectam juntos; por isso a
+    # Abertura aparece na hora e a chave é lida numa tarefa assíncrona. A
+    # retomada lê o armazém (SQLite, talvez) e vai para uma thread, fora do
+    # loop de eventos que atende todas as conexões.
+    async def identificar_sessao():
+        try:
+            chave = await page.client_storage.get_async(CHAVE_SESSAO)
+            if not chave:
+                await page.client_storage.set_async(CHAVE_SESSAO, sessao["chave"])
+            elif estado["tela"] is None:  # Ninguém começou outro jogo enquanto isso
+                sessao["chave"] = chave
+                await asyncio.to_thread(retomar_sessao)
+        except Exception as e:
+            print(f"Aviso: client_storage indisponível, sessão não poderá ser retomada: {e}")
 
-    # Inicia pela Abertura
     mostrar_tela_abertura()
+    page.run_task(identificar_sessao)
+
+# ========================================================================
+#                       INICIALIZAÇÃO DO SERVIDOR
+# ========================================================================
+
+@metricas.coletor
+def coletar_processo():
+    valores = [
+        ("quiz_sessoes_ativas", "gauge", "Sessões com navegador conectado", controle_lotacao.conectadas(), {}),
+        ("quiz_sessoes_vagas", "gauge", "Sessões ocupando vaga (inclui as aguardando reconexão)", controle_lotacao.ativas(), {}),
+        ("quiz_paginas_em_memoria", "gauge", "Páginas do Flet ainda vivas no processo", controle_lotacao.em_memoria(), {}),
+        ("quiz_sessoes_recusadas_total", "counter", "Sessões recusadas com o processo lotado", controle_lotacao.recusadas, {}),
+        ("quiz_banco_perguntas", "gauge", "Perguntas no banco vigente", len(banco_perguntas.obter()), {}),
+        ("quiz_banco_carga_segundos", "gauge", "Duração da última carga/recarga do banco", banco_perguntas.tempo_carga, {}),
+        ("quiz_contagens_ativas", "gauge", "Contagens regressivas no agendador", temporizador.agendador.ativas, {}),
+        ("quiz_threads", "gauge", "Threads vivas no processo", threading.active_count(), {}),
+    ]
+    miniaturas = estaticos.cache_miniaturas
+    if miniaturas is not None:
+        valores.append(("quiz_miniaturas_bytes", "gauge", "Bytes de miniaturas no cache", miniaturas.bytes, {}))
+        valores.append(("quiz_miniaturas_cache", "gauge", "Miniaturas no cache", miniaturas.entradas(), {}))
+        for resultado, n in (("acerto", miniaturas.acertos), ("falta", miniaturas.faltas), ("descartada", miniaturas.descartadas)):
+            valores.append(("quiz_miniaturas_total", "counter", "Pedidos de miniatura por resultado", n, {"resultado": resultado}))
+    n_salas, n_jogadores = salas.ativas()
+    valores.append(("quiz_salas_ativas", "gauge", "Salas multijogador abertas", n_salas, {}))
+    valores.append(("quiz_jogadores_em_salas", "gauge", "Equipes nas salas abertas", n_jogadores, {}))
+    if registro_historico:
+        valores.append(("quiz_historico_pendentes", "gauge", "Eventos na fila do histórico", registro_historico.pendentes(), {}))
+        valores.append(("quiz_historico_eventos_total", "counter", "Eventos do histórico", registro_historico.gravados, {"resultado": "gravado"}))
+        valores.append(("quiz_historico_eventos_total", "counter", "Eventos do histórico", registro_historico.descartados, {"resultado": "descartado"}))
+        valores.append(("quiz_historico_lotes_total", "counter", "Transações de gravação do histórico", registro_historico.lotes, {}))
+    for motivo, n in controle_lotacao.recolhidas.items():
+        valores.append(("quiz_sessoes_recolhidas_total", "counter", "Sessões recolhidas pelo recolhedor", n, {"motivo": motivo}))
+    for resultado, n in banco_perguntas.recargas.items():
+        valores.append(("quiz_banco_recargas_total", "counter", "Recargas a quente do banco", n, {"resultado": resultado}))
+    return valores
+
+armazem_sessoes = sessoes.criar(ARMAZEM_SESSOES)
+controle_lotacao = lotacao.criar(MAX_SESSOES, TEMPO_OCIOSA, TEMPO_RECONEXAO)
+# O chdir para a pasta do main.py só vem depois: o caminho é resolvido aqui
+registro_historico = historico.criar(
+    ARQUIVO_HISTORICO and os.path.join(os.path.dirname(os.path.abspath(__file__)), ARQUIVO_HISTORICO), TEMPORADA)
+
+if METRICAS_PORTA:
+    metricas.iniciar(int(METRICAS_PORTA))
+
+# Carrega o banco uma única vez, antes de aceitar conexões
+try:
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+except: pass
+banco_perguntas.carregar(ARQUIVO_PERGUNTAS)
+if INTERVALO_RECARGA > 0:
+    banco_perguntas.monitorar(ARQUIVO_PERGUNTAS, INTERVALO_RECARGA)
+
+# Variantes das imagens e bundle web pré-comprimido (refeitos se as fontes
+# mudaram); as miniaturas das perguntas são geradas sob demanda
+estaticos.carregar(PASTA_ASSETS, int(CACHE_IMAGENS_MB * 1024 * 1024))
+
+# O Flet guarda a página desconectada até o recolhedor liberar a vaga dela
+# (por padrão guardaria uma hora)
+os.environ.setdefault("FLET_SESSION_TIMEOUT", str(int(TEMPO_RECONEXAO + controle_lotacao.intervalo)))
 
+# O app do Flet é servido por trás da camada de estáticos (cache e compressão)
 port = int(os.environ.get("PORT", 8080))
-ft.app(target=main, view=ft.AppView.WEB_BROWSER, port=port, host="0.0.0.0", assets_dir=".")
+app = ft.app(target=main, export_asgi_app=True, assets_dir=PASTA_ASSETS)
+uvicorn.run(estaticos.Estaticos(app), host="0.0.0.0", port=port, log_level="warning")
@@ -0,0 +1,200 @@
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------------------------------------------------------
+#                 MÉTRICAS NO FORMATO TEXTO DO PROMETHEUS
+# ----------------------------------------------------------------------
+# Opcional: só liga com iniciar(porta). Desligado, contar/observar retornam
+# na primeira linha e cronometrar() devolve a própria função, então o
+# caminho quente não paga nada. Ligado, serve GET /metrics num servidor
+# HTTP local, separado da porta do jogo.
+#
+# Valores que já existem em outros módulos (tamanho do banco, contagens no
+# agendador...) são lidos na hora da coleta, por coletores registrados.
+
+ativo = False
+
+BALDES_TEMPO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BALDES_BYTES = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+# nome -> (tipo, ajuda, baldes)
+DEFINICOES = {
+    "quiz_jogos_iniciados_total": ("counter", "Jogos montados em processar_configuracao", None),
+    "quiz_jogos_finalizados_total": ("counter", "Jogos que chegaram ao placar final", None),
+    "quiz_jogos_abandonados_total": ("counter", "Jogos encerrados antes da última pergunta", None),
+    "quiz_perguntas_servidas_total": ("counter", "Perguntas exibidas, por nível", None),
+    "quiz_duracao_segundos": ("histogram", "Tempo de execução dos handlers do jogo", BALDES_TEMPO),
+    "quiz_page_updates_total": ("counter", "Chamadas a page.update()", None),
+    "quiz_mensagens_ws_total": ("counter", "Mensagens enviadas aos navegadores", None),
+    "quiz_mensagens_ws_bytes": ("histogram", "Tamanho das mensagens enviadas aos navegadores", BALDES_BYTES),
+}
+
+_lock = threading.Lock()
+_contadores = {}    # (nome, rótulos) -> valor
+_histogramas = {}   # (nome, rótulos) -> [contagens por balde..., soma, total]
+_coletores = []
+
+
+def _chave(nome, rotulos):
+    return (nome, tuple(sorted(rotulos.items())))
+
+
+def contar(nome, valor=1, **rotulos):
+    if not ativo:
+        return
+    chave = _chave(nome, rotulos)
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+
+def observar(nome, valor, **rotulos):
+    if not ativo:
+        return
+    baldes = DEFINICOES[nome][2]
+    chave = _chave(nome, rotulos)
+    with _lock:
+        h = _histogramas.get(chave)
+        if h is None:
+            h = _histogramas[chave] = [0] * (len(baldes) + 2)
+        for i, limite in enumerate(baldes):
+            if valor <= limite:
+                h[i] += 1
+        h[-2] += valor
+        h[-1] += 1
+
+
+def cronometrar(funcao):
+    def decorador(fn):
+        if not ativo:
+            return fn
+
+        @functools.wraps(fn)
+        def medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observar("quiz_duracao_segundos", time.perf_counter() - inicio, funcao=funcao)
+        return medido
+    return decorador
+
+
+# Um coletor devolve [(nome, tipo, ajuda, valor, rótulos)] lidos na hora do scrape
+def coletor(fn):
+    _coletores.append(fn)
+    return fn
+
+
+# ========================================================================
+#                       EXPOSIÇÃO
+# ========================================================================
+
+def _rotulos(pares, extra=()):
+    pares = tuple(pares) + tuple(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pares) + "}"
+
+
+def expor():
+    linhas = []
+    with _lock:
+        contadores = dict(_contadores)
+        histogramas = {k: list(v) for k, v in _histogramas.items()}
+
+    por_nome = {}
+    for (nome, rotulos), valor in contadores.items():
+        por_nome.setdefault(nome, []).append(f"{nome}{_rotulos(rotulos)} {valor}")
+    for (nome, rotulos), h in histogramas.items():
+        baldes = DEFINICOES[nome][2]
+        amostras = por_nome.setdefault(nome, [])
+        for limite, n in zip(baldes, h):
+            amostras.append(f"{nome}_bucket{_rotulos(rotulos, [('le', limite)])} {n}")
+        amostras.append(f"{nome}_bucket{_rotulos(rotulos, [('le', '+Inf')])} {h[-1]}")
+        amostras.append(f"{nome}_sum{_rotulos(rotulos)} {h[-2]}")
+        amostras.append(f"{nome}_count{_rotulos(rotulos)} {h[-1]}")
+
+    for nome in sorted(por_nome):
+        tipo, ajuda, _ = DEFINICOES.get(nome, ("untyped", nome, None))
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        linhas.extend(sorted(por_nome[nome]))
+
+    for fn in _coletores:
+        vistos = set()
+        for nome, tipo, ajuda, valor, rotulos in fn():
+            if nome not in vistos:
+                linhas.append(f"# HELP {nome} {ajuda}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+                vistos.add(nome)
+            linhas.append(f"{nome}{_rotulos(sorted(rotulos.items()))} {valor}")
+    return "\n".join(linhas) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = expor().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+# ========================================================================
+#                       INSTRUMENTAÇÃO DO FLET
+# ========================================================================
+
+def _instrumentar_flet():
+    # Conta page.update() e mede cada mensagem que sai para o WebSocket.
+    # Só é aplicado com as métricas ligadas.
+    import flet as ft
+
+    update_original = ft.Page.update
+
+    def update(self, *controls):
+        contar("quiz_page_updates_total")
+        return update_original(self, *controls)
+
+    ft.Page.update = update
+
+    try:
+        from flet_web.fastapi.flet_app import FletApp
+    except ImportError:
+        return
+
+    handle_original = FletApp.handle
+
+    # O Flet serializa cada mensagem uma vez só, antes da fila de envio; o
+    # tamanho é medido no texto que já vai para o WebSocket de cada conexão
+    async def handle(self, websocket):
+        send_text_original = websocket.send_text
+
+        async def send_text(texto):
+            contar("quiz_mensagens_ws_total")
+            observar("quiz_mensagens_ws_bytes", len(texto))
+            return await send_text_original(texto)
+
+        websocket.send_text = send_text
+        return await handle_original(self, websocket)
+
+    FletApp.handle = handle
+
+
+def iniciar(porta, host="127.0.0.1"):
+    global ativo
+    ativo = True
+    _instrumentar_flet()
+    servidor = ThreadingHTTPServer((host, porta), _Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    print(f"Métricas em http://{host}:{porta}/metrics")
+    return servidor
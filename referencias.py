@@ -0,0 +1,73 @@
+import re
+import unicodedata
+
+# ----------------------------------------------------------------------
+#            REFERÊNCIAS BÍBLICAS CITADAS NAS EXPLICAÇÕES
+# ----------------------------------------------------------------------
+# Quase toda Explicação termina com a passagem, ex.: "(Jonas 1:17)",
+# "(1 Samuel 10:1; 16:13)", "(Êxodo 7-12)". Um nome de livro só conta como
+# referência se vier seguido do capítulo, para "os livros Jó, Salmos e
+# Provérbios" não marcar a pergunta com os três livros.
+#
+# A comparação ignora acentos e maiúsculas ("Genesis 1" = "Gênesis 1").
+
+ANTIGO = "Antigo Testamento"
+NOVO = "Novo Testamento"
+
+# Ordem canônica; o segundo item são grafias alternativas
+LIVROS_AT = (
+    ("Gênesis", ()), ("Êxodo", ()), ("Levítico", ()), ("Números", ()), ("Deuteronômio", ()),
+    ("Josué", ()), ("Juízes", ()), ("Rute", ()), ("1 Samuel", ()), ("2 Samuel", ()),
+    ("1 Reis", ()), ("2 Reis", ()), ("1 Crônicas", ()), ("2 Crônicas", ()), ("Esdras", ()),
+    ("Neemias", ()), ("Ester", ()), ("Jó", ()), ("Salmos", ("Salmo",)), ("Provérbios", ()),
+    ("Eclesiastes", ()), ("Cantares", ("Cânticos", "Cântico dos Cânticos")), ("Isaías", ()),
+    ("Jeremias", ()), ("Lamentações", ()), ("Ezequiel", ()), ("Daniel", ()), ("Oseias", ("Oséias",)),
+    ("Joel", ()), ("Amós", ()), ("Obadias", ()), ("Jonas", ()), ("Miqueias", ("Miquéias",)),
+    ("Naum", ()), ("Habacuque", ()), ("Sofonias", ()), ("Ageu", ()), ("Zacarias", ()), ("Malaquias", ()),
+)
+LIVROS_NT = (
+    ("Mateus", ()), ("Marcos", ()), ("Lucas", ()), ("João", ()), ("Atos", ("Atos dos Apóstolos",)), ("Romanos", ()),
+    ("1 Coríntios", ()), ("2 Coríntios", ()), ("Gálatas", ()), ("Efésios", ()), ("Filipenses", ()),
+    ("Colossenses", ()), ("1 Tessalonicenses", ()), ("2 Tessalonicenses", ()), ("1 Timóteo", ()),
+    ("2 Timóteo", ()), ("Tito", ()), ("Filemom", ()), ("Hebreus", ()), ("Tiago", ()), ("1 Pedro", ()),
+    ("2 Pedro", ()), ("1 João", ()), ("2 João", ()), ("3 João", ()), ("Judas", ()), ("Apocalipse", ()),
+)
+
+TESTAMENTO = {nome: ANTIGO for nome, _ in LIVROS_AT}
+TESTAMENTO.update({nome: NOVO for nome, _ in LIVROS_NT})
+LIVROS = tuple(TESTAMENTO)  # ordem canônica
+POR_TESTAMENTO = {
+    ANTIGO: tuple(nome for nome, _ in LIVROS_AT),
+    NOVO: tuple(nome for nome, _ in LIVROS_NT),
+}
+
+
+def _normalizar(texto):
+    sem_acento = unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode("ascii")
+    return sem_acento.casefold()
+
+
+_grafias = {}  # grafia normalizada, sem espaços -> nome canônico
+for _nome, _alternativas in LIVROS_AT + LIVROS_NT:
+    for _grafia in (_nome, *_alternativas):
+        _grafias[_normalizar(_grafia).replace(" ", "")] = _nome
+
+# Candidato: [1-3] + palavra (+ "dos" palavra) seguido de número; o nome é
+# conferido num dicionário. Bem mais rápido que uma alternância com os 66
+# livros, o que pesa ao indexar dezenas de milhares de perguntas.
+_PADRAO = re.compile(r"\b((?:[1-3]\s*)?[a-z]+(?:\s+dos\s+[a-z]+)?)\s+\d")
+
+
+def livros_citados(texto):
+    # Livros com capítulo citado no texto, sem repetição, na ordem em que aparecem
+    if not texto:
+        return ()
+    vistos = {}
+    for m in _PADRAO.finditer(_normalizar(texto)):
+        candidato = m.group(1)
+        livro = _grafias.get("".join(candidato.split()))
+        if livro is None and " dos " in candidato:
+            livro = _grafias.get(candidato.rsplit(None, 1)[1])  # "livro dos Juízes 2"
+        if livro is not None:
+            vistos.setdefault(livro, None)
+    return tuple(vistos)
@@ -0,0 +1,299 @@
+import random
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import temporizador
+
+# ----------------------------------------------------------------------
+#                 SALAS MULTIJOGADOR (TELÃO + CELULARES)
+# ----------------------------------------------------------------------
+# Um anfitrião abre a sala no telão e recebe um código; cada equipe entra
+# pelo próprio celular com o código e um nome. Todos respondem ao mesmo
+# tempo e a pontuação depende de quanto tempo ainda restava.
+#
+# A sala é a única fonte da verdade: cada sessão do Flet (telão ou celular)
+# só assina os eventos que lhe interessam e redesenha a própria tela. Um
+# evento (nova pergunta, alerta do tempo, resultado) é montado UMA vez por
+# sala e entregue a todos os assinantes; a contagem regressiva também é uma
+# só por sala, no agendador compartilhado (temporizador.py), e não uma por
+# jogador.
+#
+# A entrega aos assinantes nunca roda na thread de quem mudou a sala (nem na
+# do agendador, no fim do tempo): cada sala tem uma fila de eventos, na
+# ordem em que o estado mudou, esvaziada por um pool pequeno de threads
+# emissoras. Um navegador lento atrasa só a própria sala. A contagem de uma
+# pergunta só começa depois que todos os assinantes a receberam e, na mesma
+# fila, depois do preparo pedido pelo anfitrião (a imagem pronta no telão).
+#
+# Uma equipe que cai volta com os mesmos pontos se entrar de novo com o
+# mesmo nome pela mesma sessão (a chave guardada no navegador); outra
+# sessão não pode usar um nome que já está na sala.
+#
+# As salas vivem no processo que as criou. Com vários workers, o
+# balanceador precisa mandar o mesmo código de sala sempre ao mesmo worker.
+
+ALFABETO_CODIGO = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # sem 0/O e 1/I
+TAMANHO_CODIGO = 4
+MAX_JOGADORES = 200
+LIMIAR_ALERTA = 0.3
+EMISSORES = 8  # Threads que entregam os eventos de todas as salas
+
+# Eventos publicados e o que vai em `dados`:
+#   "jogadores"  lista de nomes (entrou/saiu alguém)
+#   "pergunta"   índice, total, pergunta, opções (índices em pergunta.opcoes,
+#                na ordem sorteada), tempo
+#   "alerta"     (sem dados) pouco tempo restante
+#   "respostas"  quantos já responderam e quantos jogam
+#   "resultado"  pergunta, índice da correta, resultado de cada jogador, ranking
+#   "fim"        ranking final
+EVENTOS_ANFITRIAO = {"jogadores", "pergunta", "alerta", "respostas", "resultado", "fim"}
+EVENTOS_JOGADOR = {"pergunta", "alerta", "resultado", "fim"}
+
+
+class Sala:
+    def __init__(self, codigo, perguntas, tempo, pontos):
+        self.id = uuid.uuid4().hex        # o código se repete com o tempo; o id não
+        self.codigo = codigo
+        self.perguntas = tuple(perguntas)
+        self.tempo = tempo
+        self.pontos = pontos              # nível -> pontos de uma resposta certa
+        self.jogadores = {}               # id -> {"nome", "pontos"}
+        self.fase = "espera"              # espera | pergunta | resultado | fim
+        self.indice = -1
+        self.opcoes = []                  # índices das opções, na mesma ordem sorteada para todos
+        self.respostas = {}               # id -> {"opcao", "acertou", "ganhou", "tempo"}
+        self.contagem = None              # só existe depois que a pergunta foi entregue
+        self.criada = time.monotonic()
+        self._lock = threading.Lock()
+        self._assinantes = {}             # token -> (eventos, callback)
+        self._seq = 0
+        self._fila = deque()              # entregas pendentes, na ordem dos eventos
+        self._lock_fila = threading.Lock()
+        self._despachando = False
+
+    # --- Assinaturas ---
+
+    def assinar(self, callback, eventos):
+        with self._lock:
+            self._seq += 1
+            self._assinantes[self._seq] = (frozenset(eventos), callback)
+            return self._seq
+
+    def cancelar(self, token):
+        with self._lock:
+            self._assinantes.pop(token, None)
+            vazia = not self._assinantes
+        if vazia:
+            remover(self.codigo)
+
+    def _publicar(self, evento, dados=None):
+        # Chamado com self._lock na mão, logo depois de mudar o estado: a
+        # ordem da fila é a ordem das mudanças
+        self._despachar(lambda: self._entregar(evento, dados))
+
+    def _despachar(self, acao):
+        with self._lock_fila:
+            self._fila.append(acao)
+            if self._despachando:
+                return
+            self._despachando = True
+        _emissores.submit(self._esvaziar)
+
+    def _esvaziar(self):
+        # Uma thread emissora por vez em cada sala
+        while True:
+            with self._lock_fila:
+                if not self._fila:
+                    self._despachando = False
+                    return
+                acao = self._fila.popleft()
+            try:
+                acao()
+            except Exception:
+                traceback.print_exc()
+
+    def _entregar(self, evento, dados):
+        # Uma montagem do evento, N entregas. Quem falhar (navegador fechado)
+        # perde a assinatura sem atrasar os demais.
+        with self._lock:
+            alvos = [(t, cb) for t, (eventos, cb) in self._assinantes.items() if evento in eventos]
+        for token, callback in alvos:
+            try:
+                callback(evento, dados)
+            except Exception:
+                traceback.print_exc()
+                with self._lock:
+                    self._assinantes.pop(token, None)
+
+    # --- Jogadores ---
+
+    def entrar(self, nome, sessao):
+        # sessao: chave da sessão do navegador; só ela reconecta a equipe
+        nome = nome.strip()
+        with self._lock:
+            if not nome:
+                raise ValueError("Informe o nome da equipe")
+            if self.fase == "fim":
+                raise ValueError("Este jogo já terminou")
+            for id, j in self.jogadores.items():
+                if j["nome"].casefold() == nome.casefold():
+                    if j["sessao"] != sessao:
+                        raise ValueError("Já existe uma equipe com esse nome")
+                    return id  # Reconexão: continua com os mesmos pontos
+            if len(self.jogadores) >= MAX_JOGADORES:
+                raise ValueError("Sala cheia")
+            id = len(self.jogadores) + 1
+            self.jogadores[id] = {"nome": nome, "pontos": 0, "sessao": sessao}
+            self._publicar("jogadores", [j["nome"] for j in self.jogadores.values()])
+        return id
+
+    def _ranking(self):
+        return sorted(((j["nome"], j["pontos"]) for j in self.jogadores.values()), key=lambda x: -x[1])
+
+    def ranking(self):
+        with self._lock:
+            return self._ranking()
+
+    # --- Perguntas ---
+
+    def proxima_pergunta(self, preparar=None):
+        # preparar(pergunta): roda na fila da sala, depois da entrega e antes
+        # da contagem; deve ter um limite de espera (segura a sala inteira)
+        with self._lock:
+            if self.fase not in ("espera", "resultado"):
+                return
+            self.indice += 1
+            if self.indice >= len(self.perguntas):
+                self.fase = "fim"
+                self._publicar("fim", self._ranking())
+                return
+            pergunta = self.perguntas[self.indice]
+            self.opcoes = random.sample(range(len(pergunta.opcoes)), len(pergunta.opcoes))
+            self.respostas = {}
+            self.contagem = None
+            self.fase = "pergunta"
+            self._publicar("pergunta", {
+                "indice": self.indice,
+                "total": len(self.perguntas),
+                "pergunta": pergunta,
+                "opcoes": list(self.opcoes),
+                "tempo": self.tempo,
+            })
+            # Na mesma fila, depois da entrega: ninguém perde tempo esperando a vez
+            indice = self.indice
+            if preparar is not None:
+                self._despachar(lambda: preparar(pergunta))
+            self._despachar(lambda: self._iniciar_contagem(indice))
+
+    def _iniciar_contagem(self, indice):
+        # Uma contagem para a sala inteira; o único tick é o alerta
+        with self._lock:
+            if self.fase != "pergunta" or self.indice != indice:
+                return
+            contagem = self.contagem = temporizador.iniciar_contagem(
+                self.tempo, self._ao_alerta, self._ao_expirar, self.tempo * (1 - LIMIAR_ALERTA)
+            )
+            todas = len(self.respostas) >= len(self.jogadores)
+        if todas:  # Todos responderam enquanto a pergunta era entregue
+            self._encerrar_pergunta(contagem)
+
+    # Estes dois rodam na thread do agendador: só enfileiram
+    def _ao_alerta(self, contagem, fracao):
+        with self._lock:
+            if contagem is self.contagem and not contagem.resolvida:
+                self._publicar("alerta")
+
+    def _ao_expirar(self, contagem):
+        self._encerrar_pergunta(contagem)
+
+    def responder(self, id, opcao):
+        # opcao: índice em pergunta.opcoes
+        instante = time.monotonic()
+        with self._lock:
+            contagem = self.contagem
+            if self.fase != "pergunta" or id not in self.jogadores or id in self.respostas:
+                return None
+            if contagem is not None and instante >= contagem.prazo:
+                return None
+            # Sem contagem, a pergunta ainda está sendo entregue: o tempo não começou
+            fracao = contagem.fracao_restante() if contagem else 1.0
+            pergunta = self.perguntas[self.indice]
+            acertou = opcao == pergunta.correta
+            # Resposta certa vale os pontos do nível mais um bônus pelo tempo que sobrou
+            base = self.pontos.get(pergunta.nome_nivel, 5)
+            ganhou = base + round(base * fracao) if acertou else 0
+            r = self.respostas[id] = {"opcao": opcao, "acertou": acertou, "ganhou": ganhou,
+                                      "tempo": contagem.decorrido(instante) if contagem else 0.0}
+            respondidas, jogando = len(self.respostas), len(self.jogadores)
+            self._publicar("respostas", (respondidas, jogando))
+        if respondidas >= jogando and contagem is not None:
+            self._encerrar_pergunta(contagem)
+        return r
+
+    def _encerrar_pergunta(self, contagem):
+        # Tempo esgotado e "todos responderam" disputam a mesma contagem
+        if contagem is not self.contagem or not contagem.resolver():
+            return
+        with self._lock:
+            pergunta = self.perguntas[self.indice]
+            for id, r in self.respostas.items():
+                self.jogadores[id]["pontos"] += r["ganhou"]
+            self.fase = "resultado"
+            self._publicar("resultado", {
+                "pergunta": pergunta,
+                "correta": pergunta.correta,
+                "explicacao": pergunta.explicacao,
+                "respostas": dict(self.respostas),
+                "ultima": self.indice + 1 >= len(self.perguntas),
+                "ranking": self._ranking(),
+            })
+
+    def encerrar(self):
+        with self._lock:
+            if self.fase == "fim":
+                return
+            self.fase = "fim"
+            contagem = self.contagem
+            self._publicar("fim", self._ranking())
+        if contagem:
+            contagem.resolver()
+
+
+# ========================================================================
+#                       REGISTRO DE SALAS DO PROCESSO
+# ========================================================================
+
+_salas = {}
+_lock = threading.Lock()
+_emissores = ThreadPoolExecutor(EMISSORES, thread_name_prefix="emissor-salas")
+
+
+def criar(perguntas, tempo, pontos):
+    with _lock:
+        while True:
+            codigo = "".join(random.choice(ALFABETO_CODIGO) for _ in range(TAMANHO_CODIGO))
+            if codigo not in _salas:
+                break
+        sala = _salas[codigo] = Sala(codigo, perguntas, tempo, pontos)
+    return sala
+
+
+def obter(codigo):
+    return _salas.get(codigo.strip().upper())
+
+
+def remover(codigo):
+    with _lock:
+        sala = _salas.pop(codigo, None)
+    if sala and sala.contagem:
+        sala.contagem.resolver()
+
+
+def ativas():
+    with _lock:
+        salas = list(_salas.values())
+    return len(salas), sum(len(s.jogadores) for s in salas)
@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ----------------------------------------------------------------------
+#                 ESTADO DAS SESSÕES FORA DO PROCESSO
+# ----------------------------------------------------------------------
+# O jogo de cada navegador é gravado num armazém, indexado por uma chave
+# guardada no próprio navegador (client_storage). Se a conexão cair e o
+# jogador voltar (mesmo processo ou outro worker atrás do balanceador),
+# a partida continua de onde parou: placar, pergunta atual e tempo restante.
+#
+# Armazéns disponíveis (QUIZ_SESSOES):
+#   "memoria"            -> dicionário no processo (padrão; só um worker)
+#   "sqlite:caminho.db"  -> arquivo SQLite em modo WAL, compartilhável entre
+#                           vários processos na mesma máquina
+#
+# O estado é sempre gravado como JSON, mesmo na memória, para que os dois
+# armazéns se comportem igual (nada de referências compartilhadas).
+
+VALIDADE_PADRAO = 3 * 3600     # Sessões sem gravação há mais tempo que isso são descartadas
+INTERVALO_LIMPEZA = 600
+MAX_GUARDADAS = 20000          # Na memória, as gravadas há mais tempo saem primeiro além disso
+
+
+class ArmazemMemoria:
+    def __init__(self, validade=VALIDADE_PADRAO, maximo=MAX_GUARDADAS):
+        self.validade = validade
+        self.maximo = maximo
+        self._dados = {}  # chave -> (instante da gravação, JSON), da gravação mais antiga à mais nova
+        self._lock = threading.Lock()
+        self._ultima_limpeza = time.time()
+
+    def carregar(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+        if item is None or time.time() - item[0] > self.validade:
+            return None
+        return json.loads(item[1])
+
+    def salvar(self, chave, estado):
+        dados = json.dumps(estado, ensure_ascii=False)
+        agora = time.time()
+        with self._lock:
+            self._dados.pop(chave, None)  # volta para o fim da ordem
+            self._dados[chave] = (agora, dados)
+            while len(self._dados) > self.maximo:
+                del self._dados[next(iter(self._dados))]
+            if agora - self._ultima_limpeza > INTERVALO_LIMPEZA:
+                self._ultima_limpeza = agora
+                for k in [k for k, (t, _) in self._dados.items() if agora - t > self.validade]:
+                    del self._dados[k]
+
+    def remover(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+
+class ArmazemSQLite:
+    def __init__(self, caminho, validade=VALIDADE_PADRAO):
+        self.validade = validade
+        self._lock = threading.Lock()
+        self._ultima_limpeza = 0.0
+        # Autocommit: cada gravação é uma transação curta; WAL deixa leitores e
+        # o escritor de outros processos trabalharem ao mesmo tempo
+        self._conexao = sqlite3.connect(caminho, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS sessoes ("
+            " chave TEXT PRIMARY KEY, atualizado REAL NOT NULL, dados TEXT NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS sessoes_atualizado ON sessoes (atualizado)")
+
+    def carregar(self, chave):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT dados FROM sessoes WHERE chave = ? AND atualizado >= ?",
+                (chave, time.time() - self.validade)
+            ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def salvar(self, chave, estado):
+        dados = json.dumps(estado, ensure_ascii=False)
+        agora = time.time()
+        with self._lock:
+            self._conexao.execute(
+                "INSERT INTO sessoes (chave, atualizado, dados) VALUES (?, ?, ?)"
+                " ON CONFLICT (chave) DO UPDATE SET atualizado = excluded.atualizado, dados = excluded.dados",
+                (chave, agora, dados)
+            )
+            if agora - self._ultima_limpeza > INTERVALO_LIMPEZA:
+                self._ultima_limpeza = agora
+                self._conexao.execute("DELETE FROM sessoes WHERE atualizado < ?", (agora - self.validade,))
+
+    def remover(self, chave):
+        with self._lock:
+            self._conexao.execute("DELETE FROM sessoes WHERE chave = ?", (chave,))
+
+
+def criar(config="memoria", validade=VALIDADE_PADRAO):
+    if config == "memoria":
+        return ArmazemMemoria(validade)
+    if config.startswith("sqlite:"):
+        caminho = config[len("sqlite:"):] or "sessoes.db"
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        return ArmazemSQLite(caminho, validade)
+    raise ValueError(f"Armazém de sessões desconhecido: {config}")
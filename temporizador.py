@@ -0,0 +1,138 @@
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+# ----------------------------------------------------------------------
+#               AGENDADOR ÚNICO DAS CONTAGENS REGRESSIVAS
+# ----------------------------------------------------------------------
+# Uma só thread dirige a contagem de TODAS as sessões. Cada contagem tem um
+# prazo no relógio monotônico; os ticks são alinhados ao início (não acumulam
+# atraso) e a thread dorme até o próximo evento de qualquer sessão. O custo
+# por sessão é uma entrada no heap, e o número de threads não muda com a
+# quantidade de jogos em andamento.
+#
+# Os callbacks rodam na própria thread do agendador: devem ser curtos (no
+# modo web, page.update() só enfileira a mensagem para o WebSocket). Eles
+# recebem a própria contagem, para não confundir a pergunta atual com uma
+# anterior. O que for pesado (gravar em disco, avisar muitos assinantes) sai
+# daqui para outra thread: um callback lento atrasa todas as contagens.
+#
+# Resposta e expiração disputam a mesma contagem: resolver() é atômico e só
+# devolve True uma vez, então um clique no último instante nunca é contado
+# junto com o "tempo esgotado".
+
+
+class Contagem:
+    __slots__ = ("inicio", "prazo", "intervalo", "ao_tick", "ao_expirar", "cancelada", "resolvida", "_lock")
+
+    def __init__(self, duracao, intervalo, ao_tick, ao_expirar, decorrido=0.0):
+        # decorrido > 0 retoma uma contagem que começou antes (ex.: em outro processo)
+        self.inicio = time.monotonic() - decorrido
+        self.prazo = self.inicio + duracao
+        self.intervalo = intervalo
+        self.ao_tick = ao_tick
+        self.ao_expirar = ao_expirar
+        self.cancelada = False
+        self.resolvida = False
+        self._lock = threading.Lock()
+
+    def decorrido(self, instante=None):
+        return (instante if instante is not None else time.monotonic()) - self.inicio
+
+    def restante(self):
+        return max(0.0, self.prazo - time.monotonic())
+
+    def fracao_restante(self):
+        duracao = self.prazo - self.inicio
+        return self.restante() / duracao if duracao > 0 else 0.0
+
+    def cancelar(self):
+        # Cancelamento preguiçoso: a entrada sai do heap no próximo tick. Os
+        # callbacks saem já, para o heap não segurar a sessão (e a página) até lá.
+        self.cancelada = True
+        self.ao_tick = self.ao_expirar = None
+
+    def resolver(self):
+        with self._lock:
+            if self.resolvida:
+                return False
+            self.resolvida = True
+            self.cancelar()
+            return True
+
+
+class Agendador:
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.ativas = 0
+
+    def _garantir_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name="agendador-contagens", daemon=True)
+            self._thread.start()
+
+    def iniciar(self, duracao, ao_tick=None, ao_expirar=None, intervalo=0.1, decorrido=0.0):
+        contagem = Contagem(duracao, intervalo, ao_tick, ao_expirar, decorrido)
+        primeiro = contagem.inicio + (intervalo if ao_tick else duracao)
+        with self._cond:
+            self._garantir_thread()
+            self.ativas += 1
+            heapq.heappush(self._heap, (min(primeiro, contagem.prazo), next(self._seq), contagem))
+            self._cond.notify()
+        return contagem
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    quando, _, contagem = self._heap[0]
+                    if contagem.cancelada:
+                        heapq.heappop(self._heap)
+                        self.ativas -= 1
+                        continue
+                    espera = quando - time.monotonic()
+                    if espera <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(espera)
+
+                expirou = quando >= contagem.prazo
+                if expirou:
+                    self.ativas -= 1
+                else:
+                    # Próximo tick alinhado ao início, nunca depois do prazo
+                    passos = int((time.monotonic() - contagem.inicio) / contagem.intervalo) + 1
+                    proximo = min(contagem.inicio + passos * contagem.intervalo, contagem.prazo)
+                    heapq.heappush(self._heap, (proximo, next(self._seq), contagem))
+
+            self._disparar(contagem, expirou)
+
+    def _disparar(self, contagem, expirou):
+        # Lidos uma vez: cancelar() em outra thread pode zerá-los a qualquer momento
+        ao_expirar, ao_tick = contagem.ao_expirar, contagem.ao_tick
+        try:
+            if expirou:
+                contagem.cancelada = True
+                if ao_expirar:
+                    ao_expirar(contagem)
+            elif ao_tick and not contagem.cancelada:
+                ao_tick(contagem, contagem.fracao_restante())
+        except Exception:
+            # Uma sessão com problema (ex.: navegador fechado) não derruba as outras
+            contagem.cancelada = True
+            traceback.print_exc()
+
+
+agendador = Agendador()
+
+
+def iniciar_contagem(duracao, ao_tick=None, ao_expirar=None, intervalo=0.1, decorrido=0.0):
+    return agendador.iniciar(duracao, ao_tick, ao_expirar, intervalo, decorrido)
@@ -0,0 +1,67 @@
+import random
+
+import adaptativo
+import banco_perguntas
+
+
+def banco_facil(n):
+    perguntas = [banco_perguntas.Pergunta(i, f"Pergunta {i}", 0, ("A", "B", "C", "D"), 0) for i in range(1, n + 1)]
+    return banco_perguntas.Banco(perguntas, indexar_livros=False)
+
+
+def test_arvore_fenwick_prefixos_e_atualizacao():
+    pesos = [random.Random(1).uniform(0, 5) for _ in range(37)]
+    arvore = adaptativo.ArvoreFenwick(pesos)
+    for i in range(len(pesos) + 1):
+        assert abs(arvore.prefixo(i) - sum(pesos[:i])) < 1e-9
+    arvore.atualizar(10, 7.5)
+    pesos[10] = 7.5
+    assert abs(arvore.total() - sum(pesos)) < 1e-9
+    for i in range(len(pesos)):
+        assert arvore.localizar(sum(pesos[:i]) + pesos[i] / 2) == i
+
+
+def test_arvore_fenwick_sorteia_so_na_faixa_e_pelo_peso():
+    arvore = adaptativo.ArvoreFenwick([1.0, 0.0, 3.0, 5.0, 1.0])
+    contagem = [0] * 5
+    for _ in range(4000):
+        contagem[arvore.sortear(1, 3)] += 1
+    assert contagem == [0, 0, 4000, 0, 0]
+    assert adaptativo.ArvoreFenwick([0.0, 0.0]).sortear(0, 2) is None
+
+
+def test_rodizio_nao_repete_enquanto_houver_livres():
+    banco = banco_facil(125)
+    modelo = adaptativo.Modelo(banco, ['FÁCIL'], {})
+    rodizio = banco_perguntas.Rodizio()
+    vistas = []
+    for _ in range(10):  # jogos de 10 perguntas: 100 sorteios
+        no_jogo = set()
+        for _ in range(10):
+            p = modelo.sortear(random.gauss(0, 1), no_jogo, rodizio)
+            no_jogo.add(p.id)
+            rodizio.marcar(banco, p)
+            vistas.append(p.id)
+    assert len(set(vistas)) == 100
+
+    # Mais três jogos esgotam o nível e o ciclo recomeça
+    for _ in range(3):
+        no_jogo = set()
+        for _ in range(10):
+            p = modelo.sortear(0.0, no_jogo, rodizio)
+            assert p is not None and p.id not in no_jogo
+            no_jogo.add(p.id)
+            rodizio.marcar(banco, p)
+            vistas.append(p.id)
+    assert set(vistas[:125]) == set(range(1, 126))
+
+
+def test_registrar_move_a_habilidade_e_tira_peso():
+    banco = banco_facil(10)
+    modelo = adaptativo.Modelo(banco, ['FÁCIL'], {})
+    p = banco.perguntas[0]
+    i = modelo.posicao[p.id]
+    peso = modelo.arvore.pesos[i]
+    assert modelo.registrar(p, 0.0, True) > 0.0
+    assert modelo.registrar(p, 0.0, False) < 0.0
+    assert modelo.arvore.pesos[i] < peso
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import banco_perguntas
+import importacao
+
+
+def linha(id, texto="Quem construiu a arca?", nivel="FÁCIL"):
+    return {
+        'ID': id, 'Pergunta': texto, 'Nível': nivel,
+        'Opção A': "Noé", 'Opção B': "Moisés", 'Opção C': "Davi", 'Opção D': "Jonas",
+        'Resposta Correta': "Noé", 'Explicação': "Gênesis 6:14", 'Imagem': None,
+    }
+
+
+def planilha(pasta, linhas):
+    caminho = str(pasta / "perguntas.xlsx")
+    gravador = importacao._GravadorXlsx(caminho)
+    gravador.escrever(banco_perguntas.COLUNAS)
+    for registro in linhas:
+        gravador.escrever([registro[c] for c in banco_perguntas.COLUNAS])
+    gravador.fechar()
+    return caminho
+
+
+def test_pergunta_sem_id_numerico_e_ignorada():
+    assert banco_perguntas._pergunta(linha(None)) is None
+    assert banco_perguntas._pergunta(linha("Q12")) is None
+    assert banco_perguntas._pergunta(linha("12")).id == 12
+
+
+def test_linha_ruim_nao_derruba_o_banco(tmp_path):
+    caminho = planilha(tmp_path, [linha(1), linha(None, "Sem ID"), linha("Q12", "ID com letra"), linha(2, "Outra")])
+    perguntas = banco_perguntas._ler_compilado(banco_perguntas.compilar(caminho))
+    assert [p.id for p in perguntas] == [1, 2]
+
+
+def banco_sintetico(por_nivel=20):
+    perguntas = [
+        banco_perguntas.Pergunta(n * por_nivel + i + 1, f"Pergunta {n}-{i}", n, ("A", "B", "C", "D"), 0)
+        for n in range(len(banco_perguntas.NIVEIS)) for i in range(por_nivel)
+    ]
+    return banco_perguntas.Banco(perguntas, indexar_livros=False)
+
+
+def test_ids_repetidos_ou_fora_da_faixa_sao_recusados_na_carga(tmp_path, capsys):
+    caminho = planilha(tmp_path, [linha(1), linha(1, "Repetida"), linha(-3, "Negativa"),
+                                  linha(banco_perguntas.MAX_ID + 1, "Enorme"), linha(2, "Outra")])
+    perguntas = banco_perguntas._ler_compilado(banco_perguntas.compilar(caminho))
+    assert [(p.id, p.texto) for p in perguntas] == [(1, "Quem construiu a arca?"), (2, "Outra")]
+    saida = capsys.readouterr().out
+    assert "ID repetido: 1" in saida and "fora de" in saida
+
+
+def test_rodizio_nao_repete_ate_esgotar_o_nivel_e_recomeca():
+    banco = banco_sintetico()
+    rodizio = banco_perguntas.Rodizio()
+    vistas = []
+    for _ in range(4):
+        vistas += [p.id for p in rodizio.sortear(banco, 'FÁCIL', 5)]
+    assert sorted(vistas) == list(range(1, 21))
+    assert rodizio.restantes(banco, 'FÁCIL') == 0
+
+    # Ciclo novo: as que sobraram do anterior entram e as recém-vistas não repetem
+    proximas = [p.id for p in rodizio.sortear(banco, 'FÁCIL', 7)]
+    assert len(set(proximas)) == 7
+    assert rodizio.restantes(banco, 'FÁCIL') == 13
+
+
+def test_rodizio_sobrevive_ao_texto():
+    banco = banco_sintetico()
+    rodizio = banco_perguntas.Rodizio()
+    usadas = {p.id for p in rodizio.sortear(banco, 'MÉDIO', 15)}
+    copia = banco_perguntas.Rodizio.de_texto(rodizio.texto())
+    assert {p.id for p in copia.sortear(banco, 'MÉDIO', 5)}.isdisjoint(usadas)
+
+
+def test_quantidade_nao_positiva_nao_trava():
+    banco = banco_sintetico()
+    for qtd in (0, -1):
+        assert banco_perguntas.Rodizio().sortear(banco, 'FÁCIL', qtd) == []
+        for modo in ("Progressivo", "Aleatório"):
+            assert banco_perguntas.montar_jogo(banco, ['FÁCIL', 'MÉDIO'], qtd, modo, banco_perguntas.Rodizio()) == []
+            assert banco_perguntas.montar_jogo(banco, ['FÁCIL'], qtd, modo) == []
+
+
+def test_marcar_fora_do_sorteio_conta_no_nivel():
+    banco = banco_sintetico()
+    rodizio = banco_perguntas.Rodizio()
+    for p in banco.por_nivel['DIFÍCIL'][:19]:
+        rodizio.marcar(banco, p)
+    assert [p.id for p in rodizio.sortear(banco, 'DIFÍCIL', 1)] == [60]
+    # Nível esgotado: marcar uma já vista recomeça o ciclo
+    rodizio.marcar(banco, banco.por_nivel['DIFÍCIL'][0])
+    assert rodizio.restantes(banco, 'DIFÍCIL') == 19
+
+
+def test_tema_pedido_ao_mesmo_tempo_e_uma_visao_so(monkeypatch):
+    perguntas = [banco_perguntas.Pergunta(i + 1, f"Pergunta {i}", i % len(banco_perguntas.NIVEIS),
+                                          ("A", "B", "C", "D"), 0, "Gênesis 1:1" if i % 2 else "Êxodo 3:14")
+                 for i in range(2000)]
+    banco = banco_perguntas.Banco(perguntas)
+
+    class VisaoLenta(banco_perguntas.Banco):
+        # Montar a visão demora: sem lock, as outras threads montariam a sua
+        __slots__ = ()
+
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(banco_perguntas, "Banco", VisaoLenta)
+    barreira = threading.Barrier(8)
+    visoes = []
+
+    def pedir():
+        barreira.wait()
+        visoes.append(banco.tema(["Gênesis"]))
+
+    threads = [threading.Thread(target=pedir) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(v) for v in visoes}) == 1
+    assert len(visoes[0].perguntas) == 1000
@@ -0,0 +1,123 @@
+import io
+
+import pytest
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+import estaticos
+
+
+async def app_flet(scope, receive, send):
+    await PlainTextResponse("flet")(scope, receive, send)
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    (tmp_path / "gerados").mkdir()
+    (tmp_path / "gerados" / "foto-300.abc.webp").write_bytes(b"webp")
+    (tmp_path / "gerados" / "foto-300.abc.jpg").write_bytes(b"jpeg")
+    variantes = {"image/webp": "gerados/foto-300.abc.webp", "image/jpeg": "gerados/foto-300.abc.jpg",
+                 "image/avif": "gerados/foto-300.abc.avif"}  # o AVIF sumiu do disco
+    monkeypatch.setattr(estaticos, "_pasta", str(tmp_path))
+    monkeypatch.setattr(estaticos, "_manifesto", {"imagens": {}, "variantes": {"gerados/foto-300.abc.jpg": variantes},
+                                                  "apelidos": {}, "comprimidos": {}})
+    return TestClient(estaticos.Estaticos(app_flet))
+
+
+def test_variante_negociada_pelo_accept_com_cache_imutavel(cliente):
+    r = cliente.get("/gerados/foto-300.abc.jpg", headers={"accept": "image/webp,*/*"})
+    assert r.content == b"webp"
+    assert r.headers["cache-control"] == estaticos.CACHE_IMUTAVEL
+    r = cliente.get("/gerados/foto-300.abc.jpg", headers={"accept": "image/jpeg"})
+    assert r.content == b"jpeg"
+
+
+def test_arquivo_apagado_depois_do_manifesto_da_404(cliente):
+    r = cliente.get("/gerados/foto-300.abc.jpg", headers={"accept": "image/avif"})
+    assert r.status_code == 404
+
+
+def test_demais_caminhos_vao_para_o_flet_com_revalidacao(cliente):
+    r = cliente.get("/index.html")
+    assert r.text == "flet"
+    assert r.headers["cache-control"] == estaticos.CACHE_REVALIDAR
+
+
+def test_q_invalido_no_accept_nao_derruba_o_pedido(cliente):
+    assert not estaticos._aceita("br;q=x, gzip", "br")
+    assert estaticos._aceita("br;q=x, gzip", "gzip")
+    r = cliente.get("/gerados/foto-300.abc.jpg", headers={"accept": "image/webp;q=abc, image/jpeg"})
+    assert r.status_code == 200 and r.content == b"jpeg"
+
+
+# Miniaturas das perguntas por endereço com hash, não embutidas
+def test_miniatura_por_endereco_com_hash(cliente, tmp_path, monkeypatch):
+    from PIL import Image
+    pasta = tmp_path / estaticos.PASTA_PERGUNTAS
+    pasta.mkdir()
+    Image.new("RGB", (2000, 1000), "red").save(pasta / "arca.jpg")
+    monkeypatch.setattr(estaticos, "cache_miniaturas", estaticos.Miniaturas(str(pasta)))
+
+    endereco = estaticos.miniatura("arca.jpg", 400)
+    assert endereco.startswith(estaticos.PASTA_MINIATURAS + "/") and endereco.endswith(".webp")
+    assert estaticos.miniatura("arca.jpg", 400) == endereco
+    assert estaticos.miniatura("arca.jpg", 800) != endereco
+    assert estaticos.miniatura("../segredo.txt", 400) is None
+    assert estaticos.miniatura("nao_existe.jpg", 400) is None
+
+    r = cliente.get("/" + endereco)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/webp"
+    assert r.headers["cache-control"] == estaticos.CACHE_IMUTAVEL
+    assert max(Image.open(io.BytesIO(r.content)).size) == 400
+    pasta_miniaturas = estaticos.PASTA_MINIATURAS
+    for invalido in (f"{pasta_miniaturas}/desconhecida.webp", f"{pasta_miniaturas}/400/arca.jpg.0123456789abcdef.webp",
+                     f"{pasta_miniaturas}/x/arca.jpg.webp", endereco.replace("/400/", "/800/"),
+                     endereco.replace("arca", "../arca")):
+        assert cliente.get("/" + invalido).status_code == 404
+
+
+# O endereço se confere pelo arquivo: outro worker (outro cache) também serve
+def test_miniatura_servida_por_outro_worker(cliente, tmp_path, monkeypatch):
+    from PIL import Image
+    pasta = tmp_path / estaticos.PASTA_PERGUNTAS
+    (pasta / "sub pasta").mkdir(parents=True)
+    Image.new("RGB", (300, 200), "red").save(pasta / "sub pasta" / "arca ç.jpg")
+    endereco = estaticos.Miniaturas(str(pasta)).endereco("sub pasta/arca ç.jpg", 100)
+    monkeypatch.setattr(estaticos, "cache_miniaturas", estaticos.Miniaturas(str(pasta)))
+    r = cliente.get("/" + endereco)
+    assert r.status_code == 200 and max(Image.open(io.BytesIO(r.content)).size) == 100
+
+
+# Só a entrega ao navegador daquele visitante libera a espera
+def test_espera_pela_entrega_ao_visitante(cliente, tmp_path, monkeypatch):
+    from PIL import Image
+    pasta = tmp_path / estaticos.PASTA_PERGUNTAS
+    pasta.mkdir()
+    Image.new("RGB", (300, 200), "red").save(pasta / "arca.jpg")
+    monkeypatch.setattr(estaticos, "cache_miniaturas", estaticos.Miniaturas(str(pasta)))
+    endereco = estaticos.miniatura("arca.jpg", 100, "ana")
+    assert endereco.endswith("?v=ana")
+    assert estaticos.aguardar_miniatura(estaticos.miniatura("arca.jpg", 100), 0)  # sem visitante
+    assert not estaticos.aguardar_miniatura(endereco, 0.05)
+    assert cliente.get("/" + estaticos.miniatura("arca.jpg", 100, "bia")).status_code == 200
+    assert not estaticos.aguardar_miniatura(endereco, 0.05)
+    assert cliente.get("/" + endereco).status_code == 200
+    assert estaticos.aguardar_miniatura(endereco, 0)
+
+
+# O endereço antigo não serve o conteúdo novo com cache imutável
+def test_arquivo_alterado_troca_o_endereco(cliente, tmp_path, monkeypatch):
+    from PIL import Image
+    pasta = tmp_path / estaticos.PASTA_PERGUNTAS
+    pasta.mkdir()
+    Image.new("RGB", (100, 100), "red").save(pasta / "arca.png")
+    monkeypatch.setattr(estaticos, "cache_miniaturas", estaticos.Miniaturas(str(pasta)))
+    antigo = estaticos.miniatura("arca.png", 50)
+    assert cliente.get("/" + antigo).status_code == 200
+
+    Image.new("RGB", (120, 100), "blue").save(pasta / "arca.png")
+    novo = estaticos.miniatura("arca.png", 50)
+    assert novo != antigo
+    assert cliente.get("/" + antigo).status_code == 404
+    assert cliente.get("/" + novo).status_code == 200
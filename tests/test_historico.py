@@ -0,0 +1,34 @@
+import historico
+
+
+def gravar(tmp_path, jogos):
+    h = historico.Historico(str(tmp_path / "historico.db"), "2026")
+    for jogo, placar in jogos:
+        for nome, pontos in placar.items():
+            h.registrar_resposta(jogo, 1, nome, pontos > 0, False, 3.0)
+        h.registrar_jogo(jogo, "local", "Aleatório", placar)
+    h.fechar()
+    return h
+
+
+# Nomes padrão não se somam entre grupos diferentes
+def test_nomes_padrao_ficam_fora_do_ranking(tmp_path):
+    h = gravar(tmp_path, [("j1", {"Equipe 1": 30, "Leões": 10}), ("j2", {"equipe 1": 50, "Jogador 2": 0})])
+    assert [r["nome"] for r in h.ranking()] == ["Leões"]
+    resultados = h._consultar("SELECT jogo, nome, pontos FROM resultados ORDER BY jogo, nome", ())
+    assert ("j1", "Equipe 1", 30) in resultados and ("j2", "equipe 1", 50) in resultados
+
+
+# Jogar sozinho não conta vitória
+def test_vitoria_so_com_duas_equipes(tmp_path):
+    h = gravar(tmp_path, [("j1", {"Ana": 40}), ("j2", {"Ana": 20, "Bia": 10}), ("j2", {"Ana": 20, "Bia": 10})])
+    ranking = {r["nome"]: r for r in h.ranking()}
+    assert ranking["Ana"]["jogos"] == 2 and ranking["Ana"]["vitorias"] == 1
+    assert ranking["Ana"]["pontos"] == 60
+    assert ranking["Bia"]["vitorias"] == 0
+
+
+def test_nome_padrao():
+    assert historico.nome_padrao("Equipe 3")
+    assert historico.nome_padrao(" jogador 12 ")
+    assert not historico.nome_padrao("Equipe Azul")
@@ -0,0 +1,100 @@
+import csv
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+import banco_perguntas
+import importacao
+import leitor_xlsx
+
+from test_banco_perguntas import linha, planilha
+
+
+def planilha_compartilhada(pasta, linhas):
+    # Texto em sharedStrings.xml, como o Excel grava
+    caminho = str(pasta / "excel.xlsx")
+    indices = {}
+    with zipfile.ZipFile(caminho, "w") as zf:
+        for nome, conteudo in importacao._XLSX_FIXOS.items():
+            zf.writestr(nome, conteudo)
+        celulas = []
+        for n, valores in enumerate(linhas, start=1):
+            refs = "".join(f'<c r="{chr(65 + i)}{n}" t="s"><v>{indices.setdefault(v, len(indices))}</v></c>'
+                           for i, v in enumerate(valores))
+            celulas.append(f'<row r="{n}">{refs}</row>')
+        zf.writestr("xl/worksheets/sheet1.xml",
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    f'<sheetData>{"".join(celulas)}</sheetData></worksheet>')
+        zf.writestr("xl/sharedStrings.xml",
+                    '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    f'{"".join(f"<si><t>{escape(t)}</t></si>" for t in indices)}</sst>')
+    return caminho
+
+
+# Strings compartilhadas acima do limite vão para o disco
+def test_strings_compartilhadas_em_disco_leem_igual(tmp_path, monkeypatch):
+    linhas = [["ID", "Pergunta"]] + [[f"{i}", f"Pergunta número {i}?"] for i in range(1, 200)]
+    caminho = planilha_compartilhada(tmp_path, linhas)
+    na_memoria = list(leitor_xlsx.ler_linhas(caminho))
+    monkeypatch.setattr(leitor_xlsx, "LIMITE_STRINGS", 100)
+    monkeypatch.setattr(leitor_xlsx, "LOTE_STRINGS", 7)
+    em_disco = list(leitor_xlsx.ler_linhas(caminho))
+    assert na_memoria == em_disco == linhas
+
+
+# Duplicadas exatas são descartadas; semelhantes, só apontadas
+def test_importar_descarta_duplicadas_e_aponta_semelhantes(tmp_path):
+    fonte = planilha(tmp_path, [
+        linha(1, "Quem construiu a arca de madeira para o dilúvio?"),
+        linha(2, "QUEM construiu a arca de madeira, para o dilúvio ?"),
+        linha(3, "Quem construiu a arca de madeira para o grande dilúvio?"),
+        linha(4, "Quantos dias choveu sobre a terra?"),
+        linha(5, "Resposta fora das opções") | {'Resposta Correta': "Abraão"},
+    ])
+    destino, relatorio = str(tmp_path / "banco.xlsx"), str(tmp_path / "relatorio.csv")
+    resumo = importacao.importar([fonte], destino, relatorio)
+    assert resumo["lidas"] == 5
+    assert (resumo["duplicadas"], resumo["semelhantes"], resumo["invalidas"]) == (1, 1, 1)
+    assert [p.id for p in banco_perguntas._ler_compilado(banco_perguntas.compilar(destino))] == [1, 3, 4]
+    with open(relatorio, encoding="utf-8-sig", newline="") as arq:
+        problemas = {r["ID"]: r["Problema"] for r in csv.DictReader(arq)}
+    assert problemas == {"2": "duplicada", "3": "semelhante", "5": "inválida"}
+
+
+# IDs repetidos entre fontes ganham um número novo
+def test_importar_renumera_id_ja_usado(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    fontes = [planilha(tmp_path / "a", [linha(1)]), planilha(tmp_path / "b", [linha(1, "Quantos dias choveu?")])]
+    destino = str(tmp_path / "banco.xlsx")
+    resumo = importacao.importar(fontes, destino)
+    assert resumo["importadas"] == 2 and resumo["ids_novos"] == 1
+    ids = [p.id for p in banco_perguntas._ler_compilado(banco_perguntas.compilar(destino))]
+    assert len(set(ids)) == 2 and 1 in ids
+
+
+# O teto de IDs é o do carregador: nada importado é recusado na carga
+def test_ids_novos_respeitam_o_teto_do_banco(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco_perguntas, "MAX_ID", 5)
+    fonte = planilha(tmp_path, [
+        linha(5, "Quem construiu a arca?"),
+        linha(None, "Quantos dias choveu?"),
+        linha(99, "Quem foi engolido pelo peixe?"),
+        linha(2, "Quem matou Golias?"),
+    ])
+    destino = str(tmp_path / "banco.xlsx")
+    resumo = importacao.importar([fonte], destino)
+    # Passado o 5, os novos ocupam os menores livres (o 2 da última linha já
+    # tinha sido dado ao 99 e ela também ganha um novo)
+    assert resumo["importadas"] == 4 and resumo["ids_novos"] == 3
+    ids = [p.id for p in banco_perguntas._ler_compilado(banco_perguntas.compilar(destino))]
+    assert ids == [5, 1, 2, 3]
+
+
+def test_ids_esgotados_falham_na_importacao(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco_perguntas, "MAX_ID", 2)
+    fonte = planilha(tmp_path, [linha(None, f"Pergunta número {i}?") for i in range(3)])
+    with pytest.raises(ValueError, match="IDs esgotados"):
+        importacao.importar([fonte], str(tmp_path / "banco.xlsx"))
+    assert not (tmp_path / "banco.xlsx").exists()
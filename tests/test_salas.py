@@ -0,0 +1,131 @@
+import threading
+import time
+
+import banco_perguntas
+import salas
+
+PONTOS = {'FÁCIL': 5, 'MÉDIO': 10, 'DIFÍCIL': 15}
+
+
+def perguntas(n=2):
+    return [banco_perguntas.Pergunta(i, f"Pergunta {i}", 0, ("A", "B", "C", "D"), 1) for i in range(1, n + 1)]
+
+
+class Eventos:
+    # Assinante que guarda o que recebeu; `atraso` simula um navegador lento
+    def __init__(self, sala, eventos, atraso=0.0):
+        self.sala = sala
+        self.recebidos = []
+        self.atraso = atraso
+        self._cond = threading.Condition()
+        sala.assinar(self, eventos)
+
+    def __call__(self, evento, dados):
+        time.sleep(self.atraso)
+        with self._cond:
+            self.recebidos.append((evento, dados, self.sala.contagem))
+            self._cond.notify_all()
+
+    def aguardar(self, evento, limite=5):
+        with self._cond:
+            assert self._cond.wait_for(lambda: any(e == evento for e, _, _ in self.recebidos), limite), evento
+            return [d for e, d, _ in self.recebidos if e == evento][-1]
+
+    def nomes(self):
+        return [e for e, _, _ in self.recebidos]
+
+
+def aguardar_contagem(sala, limite=5):
+    fim = time.monotonic() + limite
+    while sala.contagem is None:
+        assert time.monotonic() < fim
+        time.sleep(0.005)
+    return sala.contagem
+
+
+def test_pontuacao_e_resultado_quando_todos_respondem():
+    sala = salas.criar(perguntas(), 10, PONTOS)
+    try:
+        telao = Eventos(sala, salas.EVENTOS_ANFITRIAO)
+        a, b = sala.entrar("Leões", "sessao-a"), sala.entrar("Águias", "sessao-b")
+        sala.proxima_pergunta()
+        aguardar_contagem(sala)
+        certa = sala.responder(a, 1)
+        errada = sala.responder(b, 0)
+        assert certa["acertou"] and 5 < certa["ganhou"] <= 10  # nível + bônus pelo tempo
+        assert errada == {"opcao": 0, "acertou": False, "ganhou": 0, "tempo": errada["tempo"]}
+        assert sala.responder(a, 1) is None  # uma resposta por pergunta
+
+        resultado = telao.aguardar("resultado")
+        assert resultado["ranking"] == [("Leões", certa["ganhou"]), ("Águias", 0)]
+        assert telao.nomes().index("pergunta") < telao.nomes().index("resultado")
+    finally:
+        salas.remover(sala.codigo)
+
+
+def test_contagem_so_comeca_depois_da_entrega_da_pergunta():
+    sala = salas.criar(perguntas(), 10, PONTOS)
+    try:
+        lentos = [Eventos(sala, salas.EVENTOS_JOGADOR, atraso=0.1) for _ in range(3)]
+        sala.entrar("Leões", "sessao-a")
+        antes = time.monotonic()
+        sala.proxima_pergunta()
+        contagem = aguardar_contagem(sala)
+        assert contagem.inicio - antes >= 0.3
+        for assinante in lentos:
+            assert [c for e, _, c in assinante.recebidos if e == "pergunta"] == [None]
+    finally:
+        salas.remover(sala.codigo)
+
+
+# A imagem pronta no telão vem antes da contagem, na fila da sala
+def test_contagem_espera_o_preparo_do_anfitriao():
+    sala = salas.criar(perguntas(), 10, PONTOS)
+    try:
+        telao = Eventos(sala, salas.EVENTOS_ANFITRIAO)
+        preparadas = []
+
+        def preparar(pergunta):
+            assert telao.aguardar("pergunta")["pergunta"] is pergunta
+            time.sleep(0.2)
+            preparadas.append((pergunta.id, sala.contagem))
+
+        antes = time.monotonic()
+        sala.proxima_pergunta(preparar)
+        contagem = aguardar_contagem(sala)
+        assert preparadas == [(1, None)]
+        assert contagem.inicio - antes >= 0.2
+    finally:
+        salas.remover(sala.codigo)
+
+
+def test_fim_do_tempo_nao_espera_os_navegadores():
+    sala = salas.criar(perguntas(), 0.05, PONTOS)
+    try:
+        sala.entrar("Leões", "sessao-a")
+        lento = Eventos(sala, salas.EVENTOS_JOGADOR, atraso=0.2)
+        sala.proxima_pergunta()
+        contagem = aguardar_contagem(sala)
+        inicio = time.monotonic()
+        while not contagem.resolvida:
+            time.sleep(0.005)
+        # O agendador só enfileira o resultado: expirou no prazo, sem esperar a entrega
+        assert time.monotonic() - inicio < 0.15
+        assert lento.aguardar("resultado")["respostas"] == {}
+    finally:
+        salas.remover(sala.codigo)
+
+
+def test_nome_da_equipe_so_reconecta_pela_mesma_sessao():
+    sala = salas.criar(perguntas(), 10, PONTOS)
+    try:
+        id = sala.entrar("Leões", "sessao-a")
+        assert sala.entrar(" leões ", "sessao-a") == id
+        try:
+            sala.entrar("LEÕES", "sessao-b")
+        except ValueError as erro:
+            assert "Já existe" in str(erro)
+        else:
+            raise AssertionError("outra sessão assumiu a equipe")
+    finally:
+        salas.remover(sala.codigo)
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import temporizador
+
+
+# Uma thread só, ticks alinhados ao início e expiração no prazo
+def test_agendador_tica_e_expira_no_prazo():
+    agendador = temporizador.Agendador()
+    ticks, expirou = [], threading.Event()
+    contagem = agendador.iniciar(0.3, lambda c, fracao: ticks.append(fracao), lambda c: expirou.set(), 0.1)
+    assert expirou.wait(2)
+    assert time.monotonic() >= contagem.prazo
+    assert 1 <= len(ticks) <= 2 and ticks == sorted(ticks, reverse=True) and ticks[-1] > 0
+    assert agendador.ativas == 0
+
+
+# Contagem cancelada não chama mais ninguém
+def test_cancelada_nao_dispara():
+    agendador = temporizador.Agendador()
+    chamadas = []
+    contagem = agendador.iniciar(0.1, lambda c, f: chamadas.append("tick"), lambda c: chamadas.append("fim"), 0.02)
+    contagem.cancelar()
+    time.sleep(0.3)
+    assert chamadas == []
+    assert agendador.ativas == 0
+
+
+# Clique e fim do tempo disputam a contagem: só um resolve
+def test_resolver_vale_uma_vez_entre_threads():
+    contagem = temporizador.Contagem(10, 1, None, None)
+    barreira = threading.Barrier(8)
+    vencedores = []
+
+    def disputar():
+        barreira.wait()
+        if contagem.resolver():
+            vencedores.append(threading.current_thread().name)
+
+    threads = [threading.Thread(target=disputar) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(vencedores) == 1
+    assert contagem.resolvida and contagem.cancelada
+
+
+# Resolvida pelo clique, a expiração não chega ao callback
+def test_resolvida_antes_do_prazo_nao_expira():
+    agendador = temporizador.Agendador()
+    expirou = threading.Event()
+    contagem = agendador.iniciar(0.1, None, lambda c: expirou.set())
+    assert contagem.resolver()
+    assert not expirou.wait(0.3)
+    assert not contagem.resolver()
+
+
+# Retomada: decorrido recua o início e mantém o prazo
+def test_decorrido_retoma_do_ponto():
+    contagem = temporizador.Contagem(30, 1, None, None, decorrido=20)
+    assert 9 < contagem.restante() <= 10
+    assert abs(contagem.fracao_restante() - 1 / 3) < 0.01